@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import ast
+import gc
 import sys
 
 from functools import partial
@@ -18,7 +19,7 @@ from pydoctor import epydoc2stan, model, node2stan, extensions, linker
 from pydoctor.epydoc.markup._pyval_repr import colorize_inline_pyval
 from pydoctor.astutils import (is_none_literal, is_typing_annotation, is_using_annotations, is_using_typing_final, node2dottedname, node2fullname, 
                                is__name__equals__main__, unstring_annotation, iterassign, extract_docstring_linenum, infer_type, get_parents,
-                               get_docstring_node, NodeVisitor, Parentage, Str)
+                               get_docstring_node, NodeVisitor, Parentage, Str, unparent_statements)
 
 
 def parseFile(path: Path) -> ast.Module:
@@ -28,9 +29,25 @@ def parseFile(path: Path) -> ast.Module:
     return _parse(src, filename=str(path))
 
 if sys.version_info >= (3,8):
-    _parse = partial(ast.parse, type_comments=True)
+    _ast_parse = partial(ast.parse, type_comments=True)
 else:
-    _parse = ast.parse
+    _ast_parse = ast.parse
+
+def _parse(source: Union[str, bytes], filename: str = '<unknown>') -> ast.Module:
+    """
+    Like L{ast.parse}, but the cyclic garbage collector is paused while parsing.
+
+    Parsing allocates a lot of container objects, which would trigger many 
+    garbage collections, each of them walking the whole model built so far. 
+    The freshly parsed tree does not contain reference cycles yet, so there is nothing to collect.
+    """
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _ast_parse(source, filename)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
 
 
 def _maybeAttribute(cls: model.Class, name: str) -> bool:
@@ -407,6 +424,8 @@ class ModuleVistor(NodeVisitor):
                         )
                     # Must be a Module since the exports is set to an empty list if it's not.
                     assert isinstance(current, model.Module)
+                    # Moving the object alters the origin module as well.
+                    self.system._recordDependency(ob.fullName(), mutual=True)
                     ob.reparent(current, as_name)
                     return True
         return False
@@ -697,6 +716,8 @@ class ModuleVistor(NodeVisitor):
             # Don't return yet: we might have to warn about the value too.
             obj = None
         else:
+            # The docstring of the target object is altered.
+            self.system._recordDependency(full_name, mutual=True)
             obj = self.system.objForFullName(full_name)
             if obj is None:
                 warn("Unable to figure out target for __doc__ assignment: "
@@ -1171,6 +1192,8 @@ class ASTBuilder:
         vis.extensions.add(*self.system._astbuilder_visitors)
         vis.extensions.attach_visitor(vis)
         vis.walkabout(mod_ast)
+        # The parents are only needed while processing the module.
+        unparent_statements(mod_ast)
 
     def parseFile(self, path: Path, ctx: model.Module) -> Optional[ast.Module]:
         try:
@@ -1289,4 +1312,5 @@ MODULE_VARIABLES_META_PARSERS: Mapping[str, Callable[[ast.Assign, model.Module],
 
 def setup_pydoctor_extension(r:extensions.ExtRegistrar) -> None:
     r.register_astbuilder_visitor(TypeAliasVisitorExt)
+    r.register_post_processor(model.collapseImportAliases, priority=300)
     r.register_post_processor(model.defaultPostProcess, priority=200)
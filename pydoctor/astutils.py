@@ -540,3 +540,15 @@ def get_parents(node:ast.AST) -> Iterator[ast.AST]:
             yield from _yield_parents(p)
     yield from _yield_parents(getattr(node, 'parent', None))
 
+def unparent_statements(node: ast.AST) -> None:
+    """
+    Remove the C{.parent} attribute set by L{Parentage} from the nodes whose parent is not an expression.
+
+    The expressions kept in the model (attribute values, annotations, decorators, etc)
+    would otherwise keep the whole module tree alive through their parents.
+    The parents within expressions are kept, the colorizer uses them to place parenthesis.
+    """
+    for n in ast.walk(node):
+        if not isinstance(getattr(n, 'parent', None), (ast.expr, ast.keyword, ast.comprehension)):
+            n.__dict__.pop('parent', None)
+
@@ -1,17 +1,19 @@
 """The entry point."""
 from __future__ import annotations
 
-from typing import  Sequence
+from typing import  Dict, Optional, Sequence
+import importlib.machinery
 import datetime
 import os
 import sys
+import time
 from pathlib import Path
 
 from pydoctor.options import Options, BUILDTIME_FORMAT
 from pydoctor.utils import error
 from pydoctor import model
 from pydoctor.templatewriter import IWriter, TemplateLookup, TemplateError
-from pydoctor.sphinx import SphinxInventoryWriter, prepareCache
+from pydoctor.sphinx import SphinxInventory, SphinxInventoryWriter, prepareCache
 
 # In newer Python versions, use importlib.resources from the standard library.
 # On older versions, a compatibility package must be installed from PyPI.
@@ -20,19 +22,24 @@ if sys.version_info < (3, 9):
 else:
     import importlib.resources as importlib_resources
 
-def get_system(options: model.Options) -> model.System:
+def get_system(options: model.Options, intersphinx: Optional[SphinxInventory] = None) -> model.System:
     """
     Get a system with the defined options. Load packages and modules.
-    """
-    cache = prepareCache(clearCache=options.clear_intersphinx_cache,
-                         enableCache=options.enable_intersphinx_cache,
-                         cachePath=options.intersphinx_cache_path,
-                         maxAge=options.intersphinx_cache_max_age)
 
+    @param intersphinx: The intersphinx inventories of a previous build with the same 
+        options, used instead of fetching them again.
+    """
     # step 1: make/find the system
     system = options.systemclass(options)
-    system.fetchIntersphinxInventories(cache)
-    cache.close() # Fixes ResourceWarning: unclosed <ssl.SSLSocket>
+    if intersphinx is None:
+        cache = prepareCache(clearCache=options.clear_intersphinx_cache,
+                             enableCache=options.enable_intersphinx_cache,
+                             cachePath=options.intersphinx_cache_path,
+                             maxAge=options.intersphinx_cache_max_age)
+        system.fetchIntersphinxInventories(cache)
+        cache.close() # Fixes ResourceWarning: unclosed <ssl.SSLSocket>
+    else:
+        system.intersphinx = intersphinx
 
     # TODO: load buildtime with default factory and converter in model.Options
     # Support source date epoch:
@@ -52,6 +59,17 @@ def get_system(options: model.Options) -> model.System:
         except ValueError as e:
             error(str(e))
     
+    if options.loadmodel:
+        # Skip the processing of the modules entirely.
+        from pydoctor import snapshot
+        try:
+            snapshot.load_model(system, Path(options.loadmodel))
+        except Exception as e:
+            error(f'Could not load the model from {options.loadmodel}: {e}')
+        if system.options.projectname is not None:
+            system.projectname = system.options.projectname
+        return system
+
     # step 1.5: create the builder
 
     builderT = system.systemBuilder
@@ -79,9 +97,41 @@ def get_system(options: model.Options) -> model.System:
         system.projectname = system.options.projectname
 
     builder.buildModules()
+    system.msg('visibility', ', '.join(f'{n} {p.name.lower()}' 
+        for p, n in system.privacy_counts.items()) + ' objects', thresh=1)
+
+    if options.savemodel:
+        from pydoctor import snapshot
+        try:
+            snapshot.save_model(system, Path(options.savemodel))
+        except Exception as e:
+            error(f'Could not save the model to {options.savemodel}: {e}')
 
     return system
 
+def get_template_lookup(options: model.Options) -> TemplateLookup:
+    """
+    Get the templates to render the HTML pages with, according to the theme and template directories options.
+    """
+    # Always init the writer with the 'base' set of templates at least.
+    template_lookup = TemplateLookup(
+                        importlib_resources.files('pydoctor.themes') / 'base')
+    
+    # Handle theme selection, 'classic' by default.
+    if options.theme != 'base':
+        template_lookup.add_templatedir(
+            importlib_resources.files('pydoctor.themes') / options.theme)
+
+    # Handle custom HTML templates
+    if options.templatedir:
+        try:
+            for t in options.templatedir:
+                template_lookup.add_templatedir(Path(t))
+        except TemplateError  as e:
+            error(str(e))
+    
+    return template_lookup
+
 def make(system: model.System) -> None:
     """
     Produce the html/intersphinx output, as configured in the system's options. 
@@ -97,23 +147,7 @@ def make(system: model.System) -> None:
             options.htmlwriter.__name__))
 
         writer: IWriter
-        
-        # Always init the writer with the 'base' set of templates at least.
-        template_lookup = TemplateLookup(
-                            importlib_resources.files('pydoctor.themes') / 'base')
-        
-        # Handle theme selection, 'classic' by default.
-        if system.options.theme != 'base':
-            template_lookup.add_templatedir(
-                importlib_resources.files('pydoctor.themes') / system.options.theme)
-
-        # Handle custom HTML templates
-        if system.options.templatedir:
-            try:
-                for t in system.options.templatedir:
-                    template_lookup.add_templatedir(Path(t))
-            except TemplateError  as e:
-                error(str(e))
+        template_lookup = get_template_lookup(options)
 
         build_directory = Path(options.htmloutput)
 
@@ -146,6 +180,92 @@ def make(system: model.System) -> None:
             basepath=options.htmloutput,
             )
 
+WATCH_INTERVAL = 1.0
+"""
+Seconds to wait between two checks of the source files, with C{--watch}.
+"""
+
+def _sources_state(options: model.Options) -> Dict[str, int]:
+    """
+    Get the modification time of the module files in the source paths.
+
+    The HTML output directory and the incremental build cache are not 
+    watched, even if they are inside of a source path.
+    """
+    from pydoctor.snapshot import cache_directory
+
+    suffixes = list(importlib.machinery.SOURCE_SUFFIXES)
+    if options.introspect_c_modules:
+        suffixes += importlib.machinery.EXTENSION_SUFFIXES
+    excluded = {os.path.abspath(options.htmloutput), str(cache_directory(options).absolute())}
+    state: Dict[str, int] = {}
+    for path in options.sourcepath:
+        if path.is_file():
+            state[str(path)] = path.stat().st_mtime_ns
+            continue
+        for dirpath, dirnames, filenames in os.walk(path):
+            dirnames[:] = [d for d in dirnames if not d.startswith('.') and d != '__pycache__' 
+                           and os.path.abspath(os.path.join(dirpath, d)) not in excluded]
+            for name in filenames:
+                if name.startswith('.') or not name.endswith(tuple(suffixes)):
+                    continue
+                filename = os.path.join(dirpath, name)
+                try:
+                    state[filename] = os.stat(filename).st_mtime_ns
+                except OSError:
+                    # The file has been removed in the meantime.
+                    pass
+    return state
+
+def watch(system: model.System) -> model.System:
+    """
+    Watch the source paths and produce the output again each time a file changes,
+    until interrupted with C{KeyboardInterrupt}.
+
+    The builds are incremental: only the modules affected by the changes
+    are processed again and only the outdated pages are written.
+
+    @returns: The system of the last build.
+    """
+    options = system.options
+    state = _sources_state(options)
+    system.msg('watch', 'watching the source paths for changes, press Ctrl+C to stop', thresh=0)
+    try:
+        while True:
+            time.sleep(WATCH_INTERVAL)
+            new_state = _sources_state(options)
+            if new_state == state:
+                continue
+            state = new_state
+            system.msg('watch', 'sources changed, building again', thresh=0)
+            # The intersphinx inventories are not fetched again.
+            system = get_system(options, system.intersphinx)
+            make(system)
+            system.msg('watch', 'build done, watching the source paths for changes', thresh=0)
+    except KeyboardInterrupt:
+        pass
+    return system
+
+def serve(system: model.System) -> None:
+    """
+    Serve the HTML pages over HTTP, rendering them on demand,
+    until interrupted with C{KeyboardInterrupt}.
+    """
+    from pydoctor.templatewriter.server import PageRenderer, make_server
+
+    port = system.options.serve
+    assert port is not None
+    renderer = PageRenderer(system, get_template_lookup(system.options))
+    try:
+        with make_server(renderer, port) as server:
+            system.msg('serve', f'serving the documentation at http://localhost:{server.server_port}/, '
+                       'press Ctrl+C to stop', thresh=0)
+            server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        renderer.close()
+
 def main(args: Sequence[str] = sys.argv[1:]) -> int:
     """
     This is the console_scripts entry point for pydoctor CLI.
@@ -159,14 +279,21 @@ def main(args: Sequence[str] = sys.argv[1:]) -> int:
     try:
 
         # Check that we're actually going to accomplish something here
-        if not options.sourcepath:
+        if not options.sourcepath and not options.loadmodel:
             error("No source paths given.")
 
         # Build model
         system = get_system(options)
         
         # Produce output (HMTL, json, ect)
-        make(system)
+        if options.serve is not None:
+            serve(system)
+        else:
+            make(system)
+
+        # Keep building as the sources change
+        if options.watch:
+            system = watch(system)
 
         # Print summary of docstring syntax errors
         docstring_syntax_errors = system.parse_errors['docstring']
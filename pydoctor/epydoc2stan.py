@@ -568,9 +568,10 @@ def reportErrors(obj: model.Documentable, errs: Sequence[ParseError], section:st
     if not errs:
         return
 
-    errors = obj.system.parse_errors[section]
-
-    if obj.fullName() not in errors:
+    with obj.system._lock:
+        errors = obj.system.parse_errors[section]
+        if obj.fullName() in errors:
+            return
         errors.add(obj.fullName())
 
         for err in errs:
@@ -656,10 +657,12 @@ def ensure_parsed_docstring(obj: model.Documentable) -> Optional[model.Documenta
         source = obj.parent
 
     if parsed_doc is None and doc is not None:
-        # The parsed_docstring has not been initialized yet
+        # The parsed_docstring has not been initialized yet, 
+        # make sure it's parsed only once if several threads need it.
         assert source is not None
-        parsed_doc = parse_docstring(obj, doc, source)
-        obj.parsed_docstring = parsed_doc
+        with obj.system._lock:
+            if obj.parsed_docstring is None:
+                obj.parsed_docstring = parse_docstring(obj, doc, source)
 
     if obj.parsed_docstring is not None:
         return source
@@ -699,14 +702,17 @@ def _get_parsed_summary(obj: model.Documentable) -> Tuple[Optional[model.Documen
     if obj.parsed_summary is not None:
         return (source, obj.parsed_summary)
 
-    if source is None:
-        summary_parsed_doc: ParsedDocstring = ParsedStanOnly(format_undocumented(obj))
-    else:
-        # Tell mypy that if we found a docstring, we also have its source.
-        assert obj.parsed_docstring is not None
-        summary_parsed_doc = obj.parsed_docstring.get_summary()
-
-    obj.parsed_summary = summary_parsed_doc
+    with obj.system._lock:
+        # Another thread might have set it in the meantime (getattr() keeps mypy from assuming it did not).
+        summary_parsed_doc: Optional[ParsedDocstring] = getattr(obj, 'parsed_summary')
+        if summary_parsed_doc is None:
+            if source is None:
+                summary_parsed_doc = ParsedStanOnly(format_undocumented(obj))
+            else:
+                # Tell mypy that if we found a docstring, we also have its source.
+                assert obj.parsed_docstring is not None
+                summary_parsed_doc = obj.parsed_docstring.get_summary()
+            obj.parsed_summary = summary_parsed_doc
 
     return (source, summary_parsed_doc)
 
@@ -290,6 +290,9 @@ class ZopeInterfaceModuleVisitor(extensions.ModuleVisitorExt):
                 thresh=-1)
             return
         clsname = astbuilder.node2fullname(node.args[0], parent)
+        if clsname is not None:
+            # The interfaces of the target class are altered.
+            self.visitor.system._recordDependency(clsname, mutual=True)
         cls = None if clsname is None else self.visitor.system.allobjects.get(clsname)
         if not isinstance(cls, ZopeInterfaceClass):
             if clsname is None:
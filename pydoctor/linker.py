@@ -4,10 +4,11 @@ This module provides implementations of epydoc's L{DocstringLinker} class.
 from __future__ import annotations
 
 import contextlib
+import threading
 from twisted.web.template import Tag, tags
 from typing import  (
-     TYPE_CHECKING, Iterable, Iterator, 
-     Optional, Union
+     TYPE_CHECKING, Any, Callable, Collection, Dict, Iterable, Iterator, 
+     Optional, Set, Union
 )
 
 from pydoctor.epydoc.markup import DocstringLinker
@@ -54,20 +55,41 @@ def intersphinx_link(label:"Flattenable", url:str) -> Tag:
     """
     return tags.a(label, href=url, class_='intersphinx-link')
 
+class _LinkerContext(threading.local):
+    """
+    The context of a linker set by L{_EpydocLinker.switch_context}, 
+    each thread switches the context independently.
+    """
+    switched = False
+    page_object: Optional['model.Documentable'] = None
+    reporting_obj: Optional['model.Documentable'] = None
+
 class _EpydocLinker(DocstringLinker):
     """
     This linker implements the xref lookup logic.
     """
 
     def __init__(self, obj: 'model.Documentable') -> None:
-        self.reporting_obj:Optional['model.Documentable'] = obj
+        self._init_obj = obj
+        self._context = _LinkerContext()
+
+        self.dependencies: Set[str] = set()
         """
-        Object used for reporting link not found errors. Changed when the linker L{switch_context}.
+        Full names of the objects this linker looked at to resolve names, whether they could be resolved or not.
+        The empty string stands for the lookup in all modules of the system. 
+        Used to figure out which pages needs to be rendered again by incremental builds.
         """
-        
-        self._init_obj = obj
-        self._page_object: Optional['model.Documentable'] = obj.page_object
     
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        # Thread-local objects can't be pickled.
+        del state['_context']
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._context = _LinkerContext()
+
     @property
     def obj(self) -> 'model.Documentable':
         """
@@ -75,6 +97,19 @@ class _EpydocLinker(DocstringLinker):
         """
         return self._init_obj
     
+    @property
+    def reporting_obj(self) -> Optional['model.Documentable']:
+        """
+        Object used for reporting link not found errors. Changed when the linker L{switch_context}.
+        """
+        context = self._context
+        return context.reporting_obj if context.switched else self._init_obj
+
+    @property
+    def _page_object(self) -> Optional['model.Documentable']:
+        context = self._context
+        return context.page_object if context.switched else self._init_obj.page_object
+
     @property
     def page_url(self) -> str:
         """
@@ -89,22 +124,27 @@ class _EpydocLinker(DocstringLinker):
     @contextlib.contextmanager
     def switch_context(self, ob:Optional['model.Documentable']) -> Iterator[None]:
         
-        old_page_object = self._page_object
-        old_reporting_object = self.reporting_obj
+        context = self._context
+        old = (context.switched, context.page_object, context.reporting_obj)
 
-        self._page_object = None if ob is None else ob.page_object
-        self.reporting_obj = ob
-        
-        yield
-        
-        self._page_object = old_page_object
-        self.reporting_obj = old_reporting_object
+        context.switched = True
+        context.page_object = None if ob is None else ob.page_object
+        context.reporting_obj = ob
+        try:
+            yield
+        finally:
+            context.switched, context.page_object, context.reporting_obj = old
 
     def look_for_name(self,
             name: str,
             candidates: Iterable['model.Documentable'],
-            lineno: int
+            lineno: int,
+            report: Optional[Callable[[str], None]] = None,
             ) -> Optional['model.Documentable']:
+        """
+        @param report: Called with the warning when the name is ambiguous, 
+            instead of reporting it on the L{reporting_obj}.
+        """
         part0 = name.split('.')[0]
         potential_targets = []
         for src in candidates:
@@ -115,12 +155,14 @@ class _EpydocLinker(DocstringLinker):
                 potential_targets.append(target)
         if len(potential_targets) == 1:
             return potential_targets[0]
-        elif len(potential_targets) > 1 and self.reporting_obj:
-            self.reporting_obj.report(
-                "ambiguous ref to %s, could be %s" % (
+        elif len(potential_targets) > 1:
+            message = "ambiguous ref to %s, could be %s" % (
                     name,
-                    ', '.join(ob.fullName() for ob in potential_targets)),
-                'resolve_identifier_xref', lineno)
+                    ', '.join(ob.fullName() for ob in potential_targets))
+            if report is not None:
+                report(message)
+            elif self.reporting_obj:
+                self.reporting_obj.report(message, 'resolve_identifier_xref', lineno)
         return None
 
     def look_for_intersphinx(self, name: str) -> Optional[str]:
@@ -134,6 +176,7 @@ class _EpydocLinker(DocstringLinker):
     def link_to(self, identifier: str, label: "Flattenable") -> Tag:
         fullID = self.obj.expandName(identifier)
 
+        self.dependencies.add(fullID)
         target = self.obj.system.objForFullName(fullID)
         if target is not None:
             return taglink(target, self.page_url, label)
@@ -181,6 +224,7 @@ class _EpydocLinker(DocstringLinker):
         # to reduce the chance of a false positive.
 
         # Check if 'identifier' is the fullName of an object.
+        self.dependencies.add(identifier)
         target = self.obj.system.objForFullName(identifier)
         if target is not None:
             return target
@@ -197,15 +241,72 @@ class _EpydocLinker(DocstringLinker):
             return target_url
 
         # Since there was no global match, go look for the name in the
-        # context where it was used.
+        # context where it was used. The same unresolvable names tend to be used
+        # over and over, so the failed lookups are cached by scope once the
+        # system is post-processed.
+        self.dependencies.add(self.obj.fullName())
+        scope = self._lookup_scope()
+        key = (scope, identifier)
+        cache = self.obj.system._unresolvedXrefCache
+        messages: Collection[str]
+        dependencies: Collection[str]
+        if cache is not None and key in cache:
+            messages, dependencies = cache[key]
+            target = None
+        else:
+            messages, dependencies = [], set()
+            target = self._look_in_context(scope, identifier, lineno, 
+                                           messages.append, dependencies.add)
+            if target is None and cache is not None:
+                cache[key] = (tuple(messages), frozenset(dependencies))
+        self.dependencies.update(dependencies)
+        if self.reporting_obj:
+            for message in messages:
+                self.reporting_obj.report(message, 'resolve_identifier_xref', lineno)
+        if target is not None:
+            return target
 
+        message = f'Cannot find link target for "{fullID}"'
+        if identifier != fullID:
+            message = f'{message}, resolved from "{identifier}"'
+        root_idx = fullID.find('.')
+        if root_idx != -1 and fullID[:root_idx] not in self.obj.system.root_names:
+            message += ' (you can link to external docs with --intersphinx)'
+        if self.reporting_obj:
+            self.reporting_obj.report(message, 'resolve_identifier_xref', lineno)
+        raise LookupError(identifier)
+
+    def _lookup_scope(self) -> 'model.Documentable':
+        # Workaround cyclic import issue.
+        from pydoctor import model
+        obj = self.obj
+        # Functions and attributes without members look up names like their parent.
+        if isinstance(obj, model.Inheritable) and not obj.contents:
+            return obj.parent
+        return obj
+
+    def _look_in_context(self,
+            scope: 'model.Documentable',
+            identifier: str,
+            lineno: int,
+            report: Callable[[str], None],
+            depend: Callable[[str], None],
+            ) -> Optional['model.Documentable']:
+        """
+        Look for C{identifier} in the context of C{scope}, its parents and uncles, then in all modules.
+
+        @param report: Called with the warnings.
+        @param depend: Called with the full names of the objects looked at.
+        """
         # Check if 'identifier' refers to an object by Python name resolution
         # in our context. Walk up the object tree and see if 'identifier' refers
         # to an object by Python name resolution in each context.
-        src: Optional['model.Documentable'] = self.obj
+        src: Optional['model.Documentable'] = scope
         while src is not None:
+            depend(src.fullName())
             target = src.resolveName(identifier)
             if target is not None:
+                depend(target.fullName())
                 return target
             src = src.parent
 
@@ -213,31 +314,26 @@ class _EpydocLinker(DocstringLinker):
         # object in an "uncle" object.  (So if p.m1 has a class C, the
         # docstring for p.m2 can say L{C} to refer to the class in m1).
         # If at any level 'identifier' refers to more than one object, complain.
-        src = self.obj
+        src = scope
         while src is not None:
-            target = self.look_for_name(identifier, src.contents.values(), lineno)
+            for o in src.contents.values():
+                depend(o.fullName())
+            target = self.look_for_name(identifier, src.contents.values(), lineno, report)
             if target is not None:
+                depend(target.fullName())
                 return target
             src = src.parent
 
         # Examine every module and package in the system and see if 'identifier'
         # names an object in each one.  Again, if more than one object is
-        # found, complain.
+        # found, complain. Only the modules that have a member named like the
+        # first part of 'identifier' can match, so these are looked up in an index.
+        depend('')
         target = self.look_for_name(
-            # System.objectsOfType now supports passing the type as string.
-            identifier, self.obj.system.objectsOfType('pydoctor.model.Module'), lineno)
+            identifier, scope.system._modulesWithMember(identifier.split('.')[0]), lineno, report)
         if target is not None:
-            return target
-
-        message = f'Cannot find link target for "{fullID}"'
-        if identifier != fullID:
-            message = f'{message}, resolved from "{identifier}"'
-        root_idx = fullID.find('.')
-        if root_idx != -1 and fullID[:root_idx] not in self.obj.system.root_names:
-            message += ' (you can link to external docs with --intersphinx)'
-        if self.reporting_obj:
-            self.reporting_obj.report(message, 'resolve_identifier_xref', lineno)
-        raise LookupError(identifier)
+            depend(target.fullName())
+        return target
 
 class _AnnotationLinker(DocstringLinker):
     """
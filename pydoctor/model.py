@@ -12,16 +12,20 @@ import ast
 import attr
 from collections import defaultdict
 import datetime
+import heapq
 import importlib
+import itertools
+import operator
 import platform
 import sys
 import textwrap
+import threading
 import types
 from enum import Enum
 from inspect import signature, Signature
 from pathlib import Path
 from typing import (
-    TYPE_CHECKING, Any, Collection, Dict, Iterator, List, Mapping, Callable, 
+    TYPE_CHECKING, Any, Collection, Dict, FrozenSet, Iterable, Iterator, List, Mapping, Callable, 
     Optional, Sequence, Set, Tuple, Type, TypeVar, Union, cast, overload
 )
 from urllib.parse import quote
@@ -243,12 +247,33 @@ class Documentable:
         else:
             return f'{page_url}#{quote(self.name)}'
 
+    _fullName: Optional[str] = None
+
     def fullName(self) -> str:
-        parent = self.parent
-        if parent is None:
-            return self.name
-        else:
-            return f'{parent.fullName()}.{self.name}'
+        """
+        The dotted name of this object, from the root module.
+
+        It is computed once, since it's requested all the time, then L{reparent} and
+        L{System.handleDuplicate} invalidate it. Code that changes the C{name} or C{parent}
+        of an object by other means must call L{_invalidate_fullName}.
+        """
+        fullName = self._fullName
+        if fullName is None:
+            parent = self.parent
+            if parent is None:
+                fullName = self.name
+            else:
+                fullName = f'{parent.fullName()}.{self.name}'
+            self._fullName = fullName
+        return fullName
+
+    def _invalidate_fullName(self) -> None:
+        """
+        Forget the cached full name of this object and its members.
+        """
+        self._fullName = None
+        for o in self.contents.values():
+            o._invalidate_fullName()
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__} {self.fullName()!r}"
@@ -274,6 +299,8 @@ class Documentable:
         old_name = self.name
         self.parent = self.parentMod = new_parent
         self.name = new_name
+        self._invalidate_fullName()
+        self.system._clearNameCaches()
         self._handle_reparenting_post()
         del old_parent.contents[old_name]
         old_parent._localNameToFullName_map[old_name] = self.fullName()
@@ -281,12 +308,12 @@ class Documentable:
         self._handle_reparenting_post()
 
     def _handle_reparenting_pre(self) -> None:
-        del self.system.allobjects[self.fullName()]
+        self.system._delObject(self.fullName())
         for o in self.contents.values():
             o._handle_reparenting_pre()
 
     def _handle_reparenting_post(self) -> None:
-        self.system.allobjects[self.fullName()] = self
+        self.system._setObject(self.fullName(), self)
         for o in self.contents.values():
             o._handle_reparenting_post()
     
@@ -322,7 +349,24 @@ class Documentable:
 
         In the context of mod2.E, expandName("RenamedExternal") should be
         "external_location.External" and expandName("renamed_mod.Local")
-        should be "mod1.Local". """
+        should be "mod1.Local".
+
+        Once the system is post-processed, the results are cached per scope,
+        see L{System.postProcess}. """
+        cache = self.system._expandNameCache
+        if cache is None:
+            return self._expandName(name)
+        # Functions and attributes resolve names exactly like their parent,
+        # so they share its cache entries.
+        scope = self.parent if isinstance(self, Inheritable) and self.parent else self
+        key = (scope, name)
+        try:
+            return cache[key]
+        except KeyError:
+            full_name = cache[key] = self._expandName(name)
+            return full_name
+
+    def _expandName(self, name: str) -> str:
         parts = name.split('.')
         obj: Documentable = self
         for i, p in enumerate(parts):
@@ -351,9 +395,18 @@ class Documentable:
         this context, if any is known to pydoctor."""
         return self.system.objForFullName(self.expandName(name))
 
+    _visibility: Optional[Tuple[object, PrivacyClass, bool]] = None
+    """
+    The privacy class and visibility of this object, computed by L{System.computeVisibility}, 
+    along with the token of the state of the system they've been computed for.
+    """
+
     @property
     def privacyClass(self) -> PrivacyClass:
         """How visible this object should be."""
+        visibility = self._visibility
+        if visibility is not None and visibility[0] is self.system._treeToken:
+            return visibility[1]
         return self.system.privacyClass(self)
 
     @property
@@ -362,6 +415,9 @@ class Documentable:
 
         This is just a simple helper which defers to self.privacyClass.
         """
+        visibility = self._visibility
+        if visibility is not None and visibility[0] is self.system._treeToken:
+            return visibility[2]
         isVisible = self.privacyClass is not PrivacyClass.HIDDEN
         # If a module/package/class is hidden, all it's members are hidden as well.
         if isVisible and self.parent:
@@ -424,8 +480,10 @@ class Documentable:
         """
         if self._linker is not None:
             return self._linker
-        self._linker = linker._EpydocLinker(self)
-        return self._linker
+        with self.system._lock:
+            if self._linker is None:
+                self._linker = linker._EpydocLinker(self)
+            return self._linker
 
 
 class CanContainImportsDocumentable(Documentable):
@@ -479,6 +537,15 @@ class Module(CanContainImportsDocumentable):
 
         self._docformat: Optional[str] = None
 
+        self._dependencies: Set[str] = set()
+        """Full names of the modules whose analysis has been used while processing this module.
+
+        Used to figure out which modules needs to be processed again when
+        building the system incrementally, see L{pydoctor.snapshot}.
+        """
+        self._messages: List[Tuple[str, str, int, int, bool, bool, bool]] = []
+        """Arguments of the L{System.msg} calls issued while processing this module."""
+
     def _localNameToFullName(self, name: str) -> str:
         if name in self.contents:
             o: Documentable = self.contents[name]
@@ -553,12 +620,16 @@ def is_exception(cls: 'Class') -> bool:
             return True
     return False
 
-def compute_mro(cls:'Class') -> Sequence[Union['Class', str]]:
+def compute_mro(cls:'Class', 
+                cache: Optional[Dict[Union['Class', str], List[Union['Class', str]]]] = None
+                ) -> Sequence[Union['Class', str]]:
     """
     Compute the method resolution order for this class.
     This function will also set the 
     C{_finalbaseobjects} and C{_finalbases} attributes on 
     this class and all it's superclasses.
+
+    @param cache: The method resolution orders computed already, see L{mro.mro}.
     """
     def init_finalbaseobjects(o: 'Class', path:Optional[List['Class']]=None) -> None:
         if not path:
@@ -609,7 +680,7 @@ def compute_mro(cls:'Class') -> Sequence[Union['Class', str]]:
         return list(localbases(o))
 
     init_finalbaseobjects(cls)
-    return mro.mro(cls, getbases)
+    return list(mro.mro(cls, getbases, cache))
 
 def _find_dunder_constructor(cls:'Class') -> Optional['Function']:
     """
@@ -637,6 +708,7 @@ class Class(CanContainImportsDocumentable):
     _finalbaseobjects: Optional[List[Optional['Class']]] = None 
     _finalbases: Optional[List[str]] = None
     _mro: Optional[Sequence[Union['Class', str]]] = None
+    _members: Optional[Tuple[object, Mapping[str, Sequence[Documentable]]]] = None
 
     def setup(self) -> None:
         super().setup()
@@ -654,12 +726,15 @@ class Class(CanContainImportsDocumentable):
         self._initialbases: List[str] = []
         self._initialbaseobjects: List[Optional['Class']] = []
     
-    def _init_mro(self) -> None:
+    def _init_mro(self, 
+                  cache: Optional[Dict[Union['Class', str], List[Union['Class', str]]]] = None) -> None:
         """
         Compute the correct value of the method resolution order returned by L{mro()}.
+
+        @param cache: See L{compute_mro}.
         """
         try:
-            self._mro = compute_mro(self)
+            self._mro = compute_mro(self, cache)
         except ValueError as e:
             self.report(str(e), 'mro')
             self._mro = list(self.allbases(True))
@@ -785,12 +860,48 @@ class Class(CanContainImportsDocumentable):
 
         @return: the object with the given name, or L{None} if there isn't one
         """
+        table = self._member_table(cached_only=True)
+        if table is not None:
+            definitions = table.get(name)
+            return definitions[0] if definitions else None
         for base in self.mro():
             obj: Optional[Documentable] = base.contents.get(name)
             if obj is not None:
                 return obj
         return None
 
+    @overload
+    def _member_table(self, cached_only: 'Literal[True]') -> Optional[Mapping[str, Sequence[Documentable]]]:...
+    @overload
+    def _member_table(self, cached_only: 'Literal[False]'=False) -> Mapping[str, Sequence[Documentable]]:...
+    def _member_table(self, cached_only: bool = False) -> Optional[Mapping[str, Sequence[Documentable]]]:
+        """
+        Get the definitions of the members of this class and its bases, by name, in method resolution order: 
+        the first definition is the one that is resolved, the next ones are the definitions it overrides.
+
+        The table is computed once the system is post-processed and kept until the tree of objects changes.
+        Before that, it's computed on each call.
+
+        @param cached_only: Return L{None} instead of computing a table that cannot be kept.
+        """
+        cached = self._members
+        token = self.system._treeToken
+        if cached is not None and cached[0] is token:
+            return cached[1]
+        cacheable = self.system._expandNameCache is not None
+        if cached_only and not cacheable:
+            return None
+        table: Dict[str, List[Documentable]] = {}
+        for base in self.mro():
+            for name, o in base.contents.items():
+                try:
+                    table[name].append(o)
+                except KeyError:
+                    table[name] = [o]
+        if cacheable:
+            self._members = (token, table)
+        return table
+
     def _localNameToFullName(self, name: str) -> str:
         if name in self.contents:
             o: Documentable = self.contents[name]
@@ -826,6 +937,12 @@ class Inheritable(Documentable):
         yield self
         if not isinstance(self.parent, Class):
             return
+        table = self.parent._member_table(cached_only=True)
+        if table is not None:
+            for o in table.get(self.name, ()):
+                if o.parent is not self.parent:
+                    yield o
+            return
         for b in self.parent.mro(include_self=False):
             if self.name in b.contents:
                 yield b.contents[self.name]
@@ -871,9 +988,13 @@ class Attribute(Inheritable):
     None value means the value is not initialized at the current point of the the process. 
     """
 
+class _MessageCapture(threading.local):
+    messages: Optional[List[Tuple[str, str, int, int, bool, bool, bool]]] = None
+
 # Work around the attributes of the same name within the System class.
 _ModuleT = Module
 _PackageT = Package
+_ClassT = Class
 
 T = TypeVar('T')
 
@@ -963,6 +1084,20 @@ class System:
         self.verboselevel = 0
         self.needsnl = False
         self.once_msgs: Set[Tuple[str, str]] = set()
+        self._messageCapture = _MessageCapture()
+        """
+        When the C{messages} attribute of this thread-local object is not L{None}, 
+        the arguments of the L{msg} calls made by the thread are appended to it 
+        instead of being reported, such that they can be reported later, or by another process. 
+        See L{pydoctor.templatewriter.writer.TemplateWriter}.
+        """
+        self._lock = threading.RLock()
+        """
+        Guards the state that is populated lazily while rendering (the parsed docstrings, 
+        the docstring linkers, the messages and the parse errors), such that the pages can be 
+        rendered by several threads. The caches that only ever store the same value for 
+        a given key, like the privacy classes by full name, don't need it.
+        """
 
         # We're using the id() of the modules as key, and not the fullName becaue modules can
         # be reparented, generating KeyError.
@@ -977,6 +1112,32 @@ class System:
         # We use the fullName of the objets as the dict key in order to bind a full name to a privacy, not an object to a privacy.
         # this way, we are sure the objects' privacy stay true even if we reparent them manually.
         self._privacyClassCache: Dict[str, PrivacyClass] = {}
+        # Replaced whenever the tree of objects changes, to discard what's been computed from it: 
+        # the visibility computed by computeVisibility() and the member tables of the classes.
+        self._treeToken = object()
+        self.privacy_counts: Dict[PrivacyClass, int] = {}
+        """
+        The number of documented objects of each privacy class, see L{computeVisibility}.
+        """
+        # The --privacy rules compiled with qnmatch.compile_rules(), along with the rules list they've been compiled from.
+        self._privacyMatcher: Optional[Tuple[List[Tuple[PrivacyClass, str]], 
+                                             Callable[[str], Optional[PrivacyClass]]]] = None
+
+        # The objects of allobjects by concrete type, with a number that tells the order in which 
+        # they have been added. This index is maintained by _setObject() and _delObject().
+        self._objectsByType: Dict[Type[Documentable], Dict[str, Tuple[int, Documentable]]] = {}
+        self._objectsCounter = itertools.count()
+
+        # Results of Documentable.expandName() by (scope, name), None until the system is post-processed.
+        self._expandNameCache: Optional[Dict[Tuple[Documentable, str], str]] = None
+        # Modules by the names of their members, built on demand once the system is post-processed.
+        self._modulesByMemberName: Optional[Dict[str, List[_ModuleT]]] = None
+        # Visible subclasses overriding each member of a class, built on demand once the system is post-processed.
+        self._overridingSubclassesIndex: Optional[Dict[_ClassT, Dict[str, List[_ClassT]]]] = None
+        # Warnings and dependencies of the cross-references that could not be resolved, by (scope, identifier), 
+        # None until the system is post-processed. See linker._EpydocLinker._resolve_identifier_xref().
+        self._unresolvedXrefCache: Optional[Dict[Tuple[Documentable, str], 
+                                                 Tuple[Tuple[str, ...], FrozenSet[str]]]] = None
         
         # workaround cyclic import issue
         from pydoctor import extensions
@@ -1022,18 +1183,21 @@ class System:
         return {obj.name for obj in self.rootobjects}
 
     def progress(self, section: str, i: int, n: Optional[int], msg: str) -> None:
+        if self._messageCapture.messages is not None:
+            return
         if n is None:
             d = str(i)
         else:
             d = f'{i}/{n}'
         if self.options.verbosity == 0 and sys.stdout.isatty():
-            print('\r'+d, msg, end='')
-            sys.stdout.flush()
-            if d == n:
-                self.needsnl = False
-                print()
-            else:
-                self.needsnl = True
+            with self._lock:
+                print('\r'+d, msg, end='')
+                sys.stdout.flush()
+                if d == n:
+                    self.needsnl = False
+                    print()
+                else:
+                    self.needsnl = True
 
     def msg(self,
             section: str,
@@ -1055,32 +1219,79 @@ class System:
             Using negative thresh will count this message as a violation and will fail the build if option C{-W} is passed.
         @param topthresh: The maximum verbosity level of the system for this message to actually be printed.
         """
-        if once:
-            if (section, msg) in self.once_msgs:
-                return
-            else:
-                self.once_msgs.add((section, msg))
-
-        if thresh < 0:
-            # Apidoc build messages are generated using negative threshold
-            # and we have separate reporting for them,
-            # on top of the logging system.
-            self.violations += 1
-
-        if thresh <= self.options.verbosity <= topthresh:
-            if self.needsnl and wantsnl:
-                print()
-            print(msg, end='')
-            if nonl:
-                self.needsnl = True
-                sys.stdout.flush()
-            else:
-                self.needsnl = False
-                print('')
+        if self.processing_modules:
+            # Keep track of the messages issued while processing a module
+            # such that they can be repeated by incremental builds.
+            mod = self.allobjects.get(self.processing_modules[-1])
+            if isinstance(mod, Module):
+                mod._messages.append((section, msg, thresh, topthresh, nonl, wantsnl, once))
+
+        captured = self._messageCapture.messages
+        if captured is not None:
+            captured.append((section, msg, thresh, topthresh, nonl, wantsnl, once))
+            return
+
+        with self._lock:
+            if once:
+                if (section, msg) in self.once_msgs:
+                    return
+                else:
+                    self.once_msgs.add((section, msg))
+
+            if thresh < 0:
+                # Apidoc build messages are generated using negative threshold
+                # and we have separate reporting for them,
+                # on top of the logging system.
+                self.violations += 1
+
+            if thresh <= self.options.verbosity <= topthresh:
+                if self.needsnl and wantsnl:
+                    print()
+                print(msg, end='')
+                if nonl:
+                    self.needsnl = True
+                    sys.stdout.flush()
+                else:
+                    self.needsnl = False
+                    print('')
 
     def objForFullName(self, fullName: str) -> Optional[Documentable]:
+        if self.processing_modules:
+            self._recordDependency(fullName)
         return self.allobjects.get(fullName)
 
+    def _recordDependency(self, fullName: str, mutual: bool = False) -> None:
+        """
+        Record that the module currently being processed relies on the
+        module that defines C{fullName}.
+
+        If the name can't be found, the dependency is recorded on the
+        closest module containing it, such that adding the name later
+        on is noticed.
+
+        @param mutual: Also record the reverse dependency. This is needed when
+            processing the current module alters objects of the other module.
+        """
+        if not self.processing_modules:
+            return
+        current = self.allobjects.get(self.processing_modules[-1])
+        if not isinstance(current, Module):
+            return
+        name = fullName
+        while True:
+            ob = self.allobjects.get(name)
+            if ob is not None:
+                break
+            name, _, _ = name.rpartition('.')
+            if not name:
+                return
+        mod = ob.module
+        if mod is current:
+            return
+        current._dependencies.add(mod.fullName())
+        if mutual:
+            mod._dependencies.add(current.fullName())
+
     def find_object(self, full_name: str) -> Optional[Documentable]:
         """Look up an object using a potentially outdated full name.
 
@@ -1116,9 +1327,67 @@ class System:
             cls = utils.findClassFromDottedName(cls, 'objectsOfType', 
                 base_class=cast(Type['DocumentableT'], Documentable))
         assert isinstance(cls, type)
-        for o in self.allobjects.values():
-            if isinstance(o, cls):
-                yield o
+        buckets = [b.values() for t, b in self._objectsByType.items() if issubclass(t, cls)]
+        if len(buckets) == 1:
+            entries: Iterable[Tuple[int, Documentable]] = buckets[0]
+        else:
+            # Restore the order of allobjects.
+            entries = heapq.merge(*buckets, key=operator.itemgetter(0))
+        for _, o in entries:
+            yield cast('DocumentableT', o)
+
+    def _modulesWithMember(self, name: str) -> Iterable[_ModuleT]:
+        """
+        Iterate over the modules and packages that have a member called C{name}, 
+        in the order of L{objectsOfType}.
+        """
+        if self._expandNameCache is None:
+            # The system is not post-processed yet, the modules can still change.
+            return (m for m in self.objectsOfType(Module) if name in m.contents)
+        index = self._modulesByMemberName
+        if index is None:
+            index = defaultdict(list)
+            for m in self.objectsOfType(Module):
+                for member in m.contents:
+                    index[member].append(m)
+            # Only published once complete, since other threads might use it.
+            self._modulesByMemberName = index
+        return index.get(name, ())
+
+    def _overridingSubclasses(self, cls: _ClassT, name: str) -> Sequence[_ClassT]:
+        """
+        Get the visible subclasses of C{cls} that override the member called C{name}, 
+        without going through the subclasses of a subclass that already overrides it.
+
+        Once the system is post-processed, the index of all overrides is built in one pass, 
+        in a time proportional to the number of overrides.
+        """
+        index = self._overridingSubclassesIndex
+        if index is None:
+            index = self._buildOverridingSubclassesIndex()
+            if self._expandNameCache is not None:
+                self._overridingSubclassesIndex = index
+        return index.get(cls, {}).get(name, ())
+
+    def _buildOverridingSubclassesIndex(self) -> Dict[_ClassT, Dict[str, List[_ClassT]]]:
+        index: Dict[_ClassT, Dict[str, List[_ClassT]]] = {}
+        for klass in self.objectsOfType(Class):
+            if not klass.isVisible:
+                continue
+            for name in klass.contents:
+                # Walk up the bases until the ones that define the member, 
+                # stopping at the bases that don't have such member at all.
+                seen: Set[_ClassT] = set()
+                stack = [b for b in klass.baseobjects if b is not None]
+                while stack:
+                    base = stack.pop()
+                    if base in seen or name not in base._member_table():
+                        continue
+                    seen.add(base)
+                    index.setdefault(base, {}).setdefault(name, []).append(klass)
+                    if base.isVisible and name not in base.contents:
+                        stack.extend(b for b in base.baseobjects if b is not None)
+        return index
 
     def privacyClass(self, ob: Documentable) -> PrivacyClass:
         ob_fullName = ob.fullName()
@@ -1138,17 +1407,12 @@ class System:
         
         # Precedence order: CLI arguments order
         # Check exact matches first, then qnmatch
-        _found_exact_match = False
-        for priv, match in reversed(self.options.privacy):
-            if ob_fullName == match:
-                privacy = priv
-                _found_exact_match = True
-                break
-        if not _found_exact_match:
-            for priv, match in reversed(self.options.privacy):
-                if qnmatch.qnmatch(ob_fullName, match):
-                    privacy = priv
-                    break
+        rules = self.options.privacy
+        if self._privacyMatcher is None or self._privacyMatcher[0] is not rules:
+            self._privacyMatcher = (rules, qnmatch.compile_rules(rules))
+        matched_privacy = self._privacyMatcher[1](ob_fullName)
+        if matched_privacy is not None:
+            privacy = matched_privacy
 
         # Store in cache
         self._privacyClassCache[ob_fullName] = privacy
@@ -1178,9 +1442,82 @@ class System:
         else:
             raise ValueError(f'Top-level object is not a module: {obj!r}')
 
-        first = self.allobjects.setdefault(obj.fullName(), obj)
-        if obj is not first:
+        first = self.allobjects.get(obj.fullName())
+        if first is None:
+            self._setObject(obj.fullName(), obj)
+        elif obj is not first:
             self.handleDuplicate(obj)
+        self._clearNameCaches()
+
+    def _setObject(self, full_name: str, obj: Documentable) -> None:
+        """
+        Set C{allobjects[full_name]} to C{obj} and index it by type for L{objectsOfType}.
+        """
+        prev = self.allobjects.get(full_name)
+        if prev is not None and type(prev) is type(obj):
+            # Keep the position of the object, like the allobjects dict.
+            index, _ = self._objectsByType[type(obj)][full_name]
+        else:
+            if prev is not None:
+                del self._objectsByType[type(prev)][full_name]
+            index = next(self._objectsCounter)
+        self.allobjects[full_name] = obj
+        self._objectsByType.setdefault(type(obj), {})[full_name] = (index, obj)
+
+    def _delObject(self, full_name: str) -> None:
+        """
+        Delete C{allobjects[full_name]} and its index entry.
+        """
+        obj = self.allobjects.pop(full_name)
+        del self._objectsByType[type(obj)][full_name]
+
+    def _clearNameCaches(self) -> None:
+        """
+        Forget the cached results of L{Documentable.expandName}, the unresolved cross-references
+        and the indexes of L{_modulesWithMember} and L{_overridingSubclasses}, called whenever the tree of objects changes.
+        """
+        if self._expandNameCache is not None:
+            self._expandNameCache.clear()
+        if self._unresolvedXrefCache is not None:
+            self._unresolvedXrefCache.clear()
+        self._modulesByMemberName = None
+        self._overridingSubclassesIndex = None
+        self._treeChanged()
+
+    def computeVisibility(self) -> None:
+        """
+        Compute the privacy class and visibility of all objects in one sweep, 
+        such that L{Documentable.privacyClass} and L{Documentable.isVisible} become simple lookups.
+
+        This is done once the system is post-processed. The results are discarded 
+        as soon as the tree of objects changes. The number of objects of each
+        privacy class is stored in L{privacy_counts}.
+        """
+        token = self._treeToken
+        counts = self.privacy_counts = dict.fromkeys(PrivacyClass, 0)
+        stack: List[Tuple[Documentable, bool]] = [(o, True) for o in self.rootobjects]
+        while stack:
+            ob, parent_visible = stack.pop()
+            ob._visibility = None
+            privacy = ob.privacyClass
+            visible = parent_visible and privacy is not PrivacyClass.HIDDEN
+            ob._visibility = (token, privacy, visible)
+            counts[privacy] += 1
+            stack.extend((o, visible) for o in ob.contents.values())
+
+    def _treeChanged(self) -> None:
+        self._treeToken = object()
+
+    def _resetNameCaches(self, enable: bool) -> None:
+        """
+        Forget the cached name lookups, and enable caching them or not. 
+        They can be cached only once the system is post-processed.
+        """
+        self._expandNameCache = {} if enable else None
+        self._unresolvedXrefCache = {} if enable else None
+        self._modulesByMemberName = None
+        self._overridingSubclassesIndex = None
+        self._treeChanged()
 
     # if we assume:
     #
@@ -1373,7 +1710,7 @@ class System:
             break
     
     def _remove(self, o: Documentable) -> None:
-        del self.allobjects[o.fullName()]
+        self._delObject(o.fullName())
         oc = list(o.contents.values())
         for c in oc:
             self._remove(c)
@@ -1401,15 +1738,18 @@ class System:
         obj.report(f"duplicate {str(prev)}", thresh=1)
         self._remove(prev)
         prev.name = obj.name + ' ' + str(i)
+        prev._invalidate_fullName()
+        self._clearNameCaches()
         def readd(o: Documentable) -> None:
-            self.allobjects[o.fullName()] = o
+            self._setObject(o.fullName(), o)
             for c in o.contents.values():
                 readd(c)
         readd(prev)
-        self.allobjects[fullName] = obj
+        self._setObject(fullName, obj)
 
 
     def getProcessedModule(self, modname: str) -> Optional[_ModuleT]:
+        self._recordDependency(modname)
         mod = self.allobjects.get(modname)
         if mod is None:
             return None
@@ -1425,6 +1765,8 @@ class System:
     def processModule(self, mod: _ModuleT) -> None:
         assert mod.state is ProcessingState.UNPROCESSED
         assert mod in self.unprocessed_modules
+        # Names can't be cached while the modules are being processed.
+        self._resetNameCaches(enable=False)
         mod.state = ProcessingState.PROCESSING
         self.unprocessed_modules.remove(mod)
         if mod.source_path is None:
@@ -1459,10 +1801,21 @@ class System:
 
 
     def process(self) -> None:
+        if self.options.incremental:
+            # Workaround cyclic import issue.
+            from pydoctor import snapshot
+            snapshot.processIncrementally(self)
+        else:
+            self.processModules()
+        self.postProcess()
+
+    def processModules(self) -> None:
+        """
+        Process all modules that are still unprocessed.
+        """
         while self.unprocessed_modules:
             mod = next(iter(self.unprocessed_modules))
             self.processModule(mod)
-        self.postProcess()
 
 
     def postProcess(self) -> None:
@@ -1472,9 +1825,16 @@ class System:
         without the risk of drawing incorrect conclusions because modules
         were not fully processed yet.
 
+        Once all post-processors have run, the results of
+        L{Documentable.expandName} and the unresolved cross-references are cached, 
+        and the visibility of the objects is computed, see L{computeVisibility}.
+
         @See: L{extensions.PriorityProcessor}.
         """
+        self._resetNameCaches(enable=False)
         self._post_processor.apply_processors()
+        self._resetNameCaches(enable=True)
+        self.computeVisibility()
 
     def fetchIntersphinxInventories(self, cache: CacheT) -> None:
         """
@@ -1484,9 +1844,11 @@ class System:
             self.intersphinx.update(cache, url)
 
 def defaultPostProcess(system:'System') -> None:
+    # The MROs of the bases are re-used to compute the MROs of their subclasses.
+    mros: Dict[Union[Class, str], List[Union[Class, str]]] = {}
     for cls in system.objectsOfType(Class):
         # Initiate the MROs
-        cls._init_mro()
+        cls._init_mro(mros)
         # Lookup of constructors
         cls._init_constructors()
 
@@ -1502,6 +1864,39 @@ def defaultPostProcess(system:'System') -> None:
     for attrib in system.objectsOfType(Attribute):
        _inherits_instance_variable_kind(attrib)
 
+def collapseImportAliases(system: 'System') -> None:
+    """
+    Rewrite the names imported by each module and class to the final target
+    of the chain of re-exports, when the intermediate names are only imports.
+
+    For instance, if module C{c} does C{from a import X} and module C{a}
+    does C{from b import X}, C{X} is expanded to C{b.X} in the context of C{c}.
+    """
+    for ob in system.objectsOfType(CanContainImportsDocumentable):
+        imports = ob._localNameToFullName_map
+        for name, full_name in imports.items():
+            imports[name] = _resolveImportAlias(system, full_name)
+
+def _resolveImportAlias(system: 'System', full_name: str) -> str:
+    seen: Set[str] = set()
+    while full_name not in system.allobjects and full_name not in seen:
+        seen.add(full_name)
+        parts = full_name.split('.')
+        # Find the innermost documented object containing the name.
+        for i in range(len(parts) - 1, 0, -1):
+            container = system.allobjects.get('.'.join(parts[:i]))
+            if container is not None:
+                break
+        else:
+            break
+        if not isinstance(container, CanContainImportsDocumentable):
+            break
+        target = container._localNameToFullName_map.get(parts[i])
+        if target is None:
+            break
+        full_name = '.'.join([target, *parts[i + 1:]])
+    return full_name
+
 def _inherits_instance_variable_kind(attr: Attribute) -> None:
     """
     If any of the inherited members of a class variable is an instance variable,
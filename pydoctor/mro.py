@@ -25,112 +25,71 @@ C3 linearization algorithm.
 """
 from __future__ import annotations
 
-from collections import deque
-from itertools import islice
-from typing import Callable, List, Tuple, Optional, TypeVar
+from typing import Callable, Dict, List, Optional, TypeVar
 
 T = TypeVar('T')
 
-class Dependency(deque):
-    @property
-    def head(self) -> Optional[T]:
-        try:
-            return self[0]
-        except IndexError:
-            return None
-
-    @property
-    def tail(self) -> islice: 
-        """
-        Return islice object, which is suffice for iteration or calling `in`
-        """
-        try:
-            return islice(self, 1, self.__len__())
-        except (ValueError, IndexError):
-            return islice([], 0, 0)
-
-
-class DependencyList:
+def _merge(*lists: List[T]) -> List[T]:
     """
-    A class represents list of linearizations (dependencies)
-    The last element of DependencyList is a list of parents.
-    It's needed  to the merge process preserves the local
-    precedence order of direct parent classes.
-    """
-    def __init__(self, *lists: Tuple[List[T]]) -> None:
-        self._lists = [Dependency(i) for i in lists]
-
-    def __contains__(self, item: T) -> bool:
-        """
-        Return True if any linearization's tail contains an item
-        """
-        return any([item in l.tail for l in self._lists])
-
-    def __len__(self):
-        size = len(self._lists)
-        return (size - 1) if size else 0
-
-    def __repr__(self):
-        return self._lists.__repr__()
-
-    @property
-    def heads(self) -> List[Optional[T]]:
-        return [h.head for h in self._lists]
-
-    @property
-    def tails(self) -> 'DependencyList':
-        """
-        Return self so that __contains__ could be called
-        Used for readability reasons only
-        """
-        return self
-
-    @property
-    def exhausted(self) -> bool:
-        """
-        Return True if all elements of the lists are exhausted
-        """
-        return all(map(lambda x: len(x) == 0, self._lists))
-
-    def remove(self, item: Optional[T]) -> None:
-        """
-        Remove an item from the lists
-        Once an item removed from heads, the leftmost elements of the tails
-        get promoted to become the new heads.
-        """
-        for i in self._lists:
-            if i and i.head == item:
-                i.popleft()
-
-
-def _merge(*lists) -> list:
-    result: List[Optional[T]] = []
-    linearizations = DependencyList(*lists)
+    Merge the linearizations. 
+    
+    The last list is the list of parents, it's needed such that the merge 
+    process preserves the local precedence order of direct parent classes.
 
+    Instead of scanning the tails of all lists for each candidate, this keeps the index of 
+    the head of each list and counts the occurrences of each item in the tails.
+    """
+    heads = [0] * len(lists)
+    in_tails: Dict[T, int] = {}
+    for l in lists:
+        for item in l[1:]:
+            in_tails[item] = in_tails.get(item, 0) + 1
+    
+    result: List[T] = []
     while True:
-        if linearizations.exhausted:
-            return result
-
-        for head in linearizations.heads:
-            if head and (head not in linearizations.tails):
-                result.append(head)
-                linearizations.remove(head)
-
-                # Once candidate is found, continue iteration
-                # from the first element of the list
-                break
+        exhausted = True
+        for l, i in zip(lists, heads):
+            if i < len(l):
+                exhausted = False
+                head = l[i]
+                if not in_tails.get(head):
+                    break
         else:
+            if exhausted:
+                return result
             # Loop never broke, no linearization could possibly be found
             raise ValueError('Cannot compute linearization of the class inheritance hierarchy')
 
+        result.append(head)
+        # Once an item removed from heads, the leftmost elements of the tails
+        # get promoted to become the new heads.
+        for n, l in enumerate(lists):
+            i = heads[n]
+            if i < len(l) and l[i] == head:
+                heads[n] = i = i + 1
+                if i < len(l):
+                    in_tails[l[i]] -= 1
+
 
-def mro(cls: T, getbases: Callable[[T], List[T]]) -> List[T]:
+def mro(cls: T, getbases: Callable[[T], List[T]], 
+        cache: Optional[Dict[T, List[T]]] = None) -> List[T]:
     """
     Return a list of classes in order corresponding to Python's MRO.
+
+    @param cache: The linearizations computed already, it's updated with 
+        the linearizations of C{cls} and all its bases. 
+        Share it between calls to compute the linearizations of each class only once.
     """
+    if cache is None:
+        cache = {}
+    try:
+        return cache[cls]
+    except KeyError:
+        pass
+    
+    bases = getbases(cls)
     result = [cls]
-
-    if not getbases(cls):
-        return result
-    else:
-        return result + _merge(*[mro(kls, getbases) for kls in getbases(cls)], getbases(cls))
+    if bases:
+        result += _merge(*[mro(kls, getbases, cache) for kls in bases], bases)
+    cache[cls] = result
+    return result
@@ -3,9 +3,10 @@ Helper function to convert L{docutils} nodes to Stan tree.
 """
 from __future__ import annotations
 
+import os
 import re
 import optparse
-from typing import Any, Callable, ClassVar, Iterable, List, Optional, Union, TYPE_CHECKING
+from typing import Any, Callable, ClassVar, Dict, Iterable, List, Optional, Union, TYPE_CHECKING
 from docutils.writers import html4css1
 from docutils import nodes, frontend, __version_info__ as docutils_version_info
 
@@ -35,14 +36,147 @@ def node2stan(node: Union[nodes.Node, Iterable[nodes.Node]], docstring_linker: '
     @note:  Any L{nodes.Node} can be passed to that function, the only requirement is 
         that the node's L{nodes.Node.document} attribute is set to a valid L{nodes.document} object.
     """
-    html = []
-    if isinstance(node, nodes.Node):
-        html += node2html(node, docstring_linker)
-    else:
-        for child in node:
-            html += node2html(child, docstring_linker)
-    return html2stan(''.join(html))
+    body: List[Union[str, _Stan]] = []
+    for child in ([node] if isinstance(node, nodes.Node) else node):
+        document = child.document
+        assert document is not None
+        visitor = StanTranslator(document, docstring_linker)
+        child.walkabout(visitor)
+        body += visitor.body
+    return body2stan(body)
+
+class _NotStan(Exception):
+    """
+    Raised when some part of the body of a L{StanTranslator} must be parsed as HTML.
+    """
+
+class _StartTag(str):
+    """
+    The HTML of a start tag emitted by the L{StanTranslator}, along with the L{Tag} it stands for.
+    """
+    tag: Tag
+    empty: bool
+    suffix: str
+
+    def __new__(cls, html: str, tag: Tag, empty: bool, suffix: str) -> _StartTag:
+        self = super().__new__(cls, html)
+        self.tag = tag
+        self.empty = empty
+        self.suffix = suffix
+        return self
+
+class _Stan:
+    """
+    A stan tree emitted by the L{StanTranslator} in place of its HTML.
+    """
+    __slots__ = ('stan',)
+
+    def __init__(self, stan: "Flattenable"):
+        self.stan = stan
+
+    def __str__(self) -> str:
+        return flatten(self.stan)
+
+# The characters that XMLString would not parse as is, the text that contains some goes through html2stan().
+_RE_NOT_XML_TEXT = re.compile('[\x00-\x08\x0b-\x1f\ud800-\udfff\ufffe\uffff]')
+_RE_ENTITY = re.compile(r'&([^&;\s]*);?')
+_ENTITIES = {'amp': '&', 'lt': '<', 'gt': '>', 'quot': '"', 'apos': "'"}
+_RE_START_TAG = re.compile(r'<(\w+)((?: [^\s="<>]+="[^"<>]*")*)( /)?>(\n?)')
+_RE_ATTRIBUTE = re.compile(r' ([^\s="<>]+)="([^"<>]*)"')
+_RE_END_TAG = re.compile(r'(\n*)</(\w+)>(\n*)')
+_RE_PRE_SPAN = re.compile(r'<span class="pre">([^<]*)</span>')
+
+def _entity(match: re.Match[str]) -> str:
+    ref = match.group(1)
+    if not match.group().endswith(';'):
+        raise _NotStan()
+    if ref in _ENTITIES:
+        return _ENTITIES[ref]
+    try:
+        if ref.startswith('#x'):
+            char = chr(int(ref[2:], 16))
+        elif ref.startswith('#'):
+            char = chr(int(ref[1:]))
+        else:
+            raise _NotStan()
+    except (ValueError, OverflowError):
+        raise _NotStan()
+    if _RE_NOT_XML_TEXT.match(char):
+        raise _NotStan()
+    return char
+
+def _pre_span(item: Union[str, _Stan]) -> Union[str, _Stan]:
+    """
+    Get the stan of a C{<span class="pre">} tag emitted by the L{HTMLTranslator} for a literal.
+    Any other item is returned as is.
+    """
+    if isinstance(item, str):
+        match = _RE_PRE_SPAN.fullmatch(item)
+        if match is not None:
+            try:
+                return _Stan(Tag('span', attributes={'class': 'pre'}, children=[_unescape(match.group(1))]))
+            except _NotStan:
+                pass
+    return item
+
+def _unescape(html: str) -> str:
+    """
+    Get the text of an HTML string without markup, like XMLString would parse it.
+
+    @raises _NotStan: If the string is not text or if it is not parsed as is.
+    """
+    if '<' in html or _RE_NOT_XML_TEXT.search(html):
+        raise _NotStan()
+    if '&' in html:
+        return _RE_ENTITY.sub(_entity, html)
+    return html
+
+def body2stan(body: Iterable[Union[str, _Stan]]) -> Tag:
+    """
+    Build the Stan tree of the body of a L{StanTranslator}.
 
+    The start tags and the stan emitted by the translator are used as is, the strings 
+    in between are either end tags or text. When some other HTML was emitted, like by 
+    a visitor method that concatenates its tags, the whole body is parsed with L{html2stan}. 
+
+    @return: The body as a tree with a transparent root node.
+    """
+    body = list(body)
+    root = Tag('')
+    stack = [root]
+    children = root.children
+    try:
+        for item in body:
+            if isinstance(item, _StartTag):
+                tag = item.tag
+                children.append(tag)
+                if not item.empty:
+                    stack.append(tag)
+                    children = tag.children
+                if item.suffix:
+                    children.append(item.suffix)
+            elif isinstance(item, _Stan):
+                children.append(item.stan)
+            elif '<' in item:
+                match = _RE_END_TAG.fullmatch(item)
+                if match is None:
+                    raise _NotStan()
+                before, tagname, after = match.groups()
+                if len(stack) == 1 or stack[-1].tagName != tagname:
+                    raise _NotStan()
+                if before:
+                    children.append(before)
+                stack.pop()
+                children = stack[-1].children
+                if after:
+                    children.append(after)
+            elif item:
+                children.append(_unescape(item))
+        if len(stack) > 1:
+            raise _NotStan()
+    except _NotStan:
+        return html2stan(''.join(map(str, body)))
+    return root
 
 def gettext(node: Union[nodes.Node, List[nodes.Node]]) -> List[str]:
     """Return the text inside the node(s)."""
@@ -85,7 +219,7 @@ class HTMLTranslator(html4css1.HTMLTranslator):
                 settings = frontend.get_default_settings(html4css1.Writer()) # type:ignore[attr-defined]
             else:
                 settings = frontend.OptionParser([html4css1.Writer()]).get_default_values()
-            
+
             # Save default settings as class attribute not to re-compute it all the times
             self.__class__.settings = settings
         
@@ -123,9 +257,19 @@ class HTMLTranslator(html4css1.HTMLTranslator):
         if target.endswith('()'):
             target = target[:len(target)-2]
 
-        self.body.append(flatten(link_func(target, label)))
+        self._append_stan(node, link_func(target, label))
         raise nodes.SkipNode()
 
+    def _append_stan(self, node: nodes.Node, stan: "Flattenable") -> None:
+        """
+        Append the HTML of the stan tree standing for C{node} to the body.
+        """
+        self.body.append(flatten(stan))
+
+    def stylesheet_call(self, path: Union[str, 'os.PathLike[str]'], adjust_path: Optional[bool] = None) -> str:
+        # Only the body is used, do not read the stylesheet each time a translator is created.
+        return ''
+
     def should_be_compact_paragraph(self, node: nodes.Node) -> bool:
         if self.document.children == [node]:
             return True
@@ -138,7 +282,8 @@ class HTMLTranslator(html4css1.HTMLTranslator):
     def depart_document(self, node: nodes.Node) -> None:
         pass
 
-    def starttag(self, node: nodes.Node, tagname: str, suffix: str = '\n', **attributes: Any) -> str:
+    def starttag(self, node: Union[nodes.Element, Dict[str, Any]], tagname: str, suffix: str = '\n', 
+                 empty: bool = False, **attributes: Any) -> str:
         """
         This modified version of starttag makes a few changes to HTML
         tags, to prevent them from conflicting with epydoc.  In particular:
@@ -183,14 +328,14 @@ class HTMLTranslator(html4css1.HTMLTranslator):
             attributes['class'] = ' '.join([attributes.get('class',''),
                                             'heading']).strip()
 
-        return super().starttag(node, tagname, suffix, **attributes)  # type: ignore[no-any-return]
+        return super().starttag(node, tagname, suffix, empty, **attributes)  # type: ignore[no-any-return]
 
     def visit_doctest_block(self, node: nodes.Node) -> None:
         pysrc = node[0].astext()
         if node.get('codeblock'):
-            self.body.append(flatten(colorize_codeblock(pysrc)))
+            self._append_stan(node, colorize_codeblock(pysrc))
         else:
-            self.body.append(flatten(colorize_doctest(pysrc)))
+            self._append_stan(node, colorize_doctest(pysrc))
         raise nodes.SkipNode()
 
 
@@ -275,8 +420,52 @@ class HTMLTranslator(html4css1.HTMLTranslator):
     def depart_seealso(self, node: nodes.Node) -> None:
         self.depart_admonition(node)
 
-    def visit_versionmodified(self, node: nodes.Node) -> None:
+    def visit_versionmodified(self, node: nodes.Element) -> None:
         self.body.append(self.starttag(node, 'div', CLASS=node['type']))
 
     def depart_versionmodified(self, node: nodes.Node) -> None:
         self.body.append('</div>\n')
+
+class StanTranslator(HTMLTranslator):
+    """
+    Pydoctor's translator of docutils nodes to Stan.
+
+    It works like the L{HTMLTranslator}, except that the start tags and the stan trees are 
+    appended to the body as objects from which L{body2stan} builds the tree, instead 
+    of serializing the whole docstring as HTML and parsing it back.
+    """
+
+    body: List[Union[str, _Stan]] # type:ignore[assignment]
+
+    def starttag(self, node: Union[nodes.Element, Dict[str, Any]], tagname: str, suffix: str = '\n', 
+                 empty: bool = False, **attributes: Any) -> str:
+        html = super().starttag(node, tagname, suffix, empty, **attributes)
+        match = _RE_START_TAG.fullmatch(html)
+        if match is None:
+            # Additional ids are given as <span> tags, leave it to html2stan(). 
+            return html
+        tagname, attrs, empty_tag, suffix = match.groups()
+        try:
+            tag = Tag(tagname, attributes={name:_unescape(value) 
+                                           for name, value in _RE_ATTRIBUTE.findall(attrs)})
+        except _NotStan:
+            return html
+        return _StartTag(html, tag, bool(empty_tag), suffix)
+
+    def _append_stan(self, node: nodes.Node, stan: "Flattenable") -> None:
+        if _RE_NOT_XML_TEXT.search(node.astext()):
+            # Keep what html2stan() does with these characters.
+            super()._append_stan(node, stan)
+        else:
+            self.body.append(_Stan(stan))
+
+    def visit_literal(self, node: nodes.literal) -> None:
+        # The <span> tags of the literal are emitted as HTML by docutils, turn them into stan.
+        start = len(self.body)
+        try:
+            super().visit_literal(node)
+        finally:
+            self.body[start:] = map(_pre_span, self.body[start:])
+
+    def visit_wbr(self, node: nodes.Node) -> None:
+        self.body.append(_Stan(Tag('wbr')))
@@ -233,11 +233,55 @@ def get_parser() -> ArgumentParser:
     parser.add_argument(
         '--no-sidebar', default=False, action='store_true', dest='nosidebar',
         help=("Do not generate the sidebar at all."))
+    parser.add_argument(
+        '--sidebar-js', default=False, action='store_true', dest='sidebarjs',
+        help=("Write the sidebar listing of each module once, in a script rendering it in the browser, "
+              "instead of repeating the listing of the parent module or package in the sidebar of every page."))
     
     parser.add_argument(
         '--system-class', dest='systemclass', default=DEFAULT_SYSTEM,
         help=("A dotted name of the class to use to make a system."))
 
+    parser.add_argument(
+        '--incremental', default=False, action='store_true', dest='incremental',
+        help=("Keep a snapshot of the processed modules in the incremental build cache "
+              "and only re-process the modules whose sources changed since the previous build "
+              "(and the modules that depend on them). "
+              "Only the pages whose content might have changed are written again, "
+              "the other pages keep the build time of the build that wrote them "
+              "and the warnings issued while rendering them are not reported again."))
+    parser.add_argument(
+        '--incremental-cache-path', dest='incremental_cache_path', default=None, metavar='PATH',
+        help=("Where to store the state of the incremental builds. "
+              "(default: a directory specific to the HTML output directory, inside the user cache directory)"))
+    parser.add_argument(
+        '--watch', default=False, action='store_true', dest='watch',
+        help=("After the first build, keep watching the source paths and build the documentation again "
+              "each time a Python module changes, until interrupted with Ctrl+C. Implies --incremental."))
+    parser.add_argument(
+        '--serve', nargs='?', type=int, const=8000, default=None, dest='serve', metavar='PORT',
+        help=("Instead of writing the HTML output, serve the documentation on http://localhost:PORT/ "
+              "and render the pages when they are requested, until interrupted with Ctrl+C. "
+              "(default port: 8000)"))
+    parser.add_argument(
+        '--jobs', '-j', type=int, default=1, dest='jobs', metavar='N',
+        help=("Render the HTML pages in N worker processes forked once the model is built. "
+              "The warnings are reported by the main process, like when rendering the pages in a single process. "
+              "Threads are used instead on free-threaded Python builds, on platforms that cannot fork processes "
+              "and with --incremental. "
+              "(default: 1)"))
+
+    parser.add_argument(
+        '--save-model', dest='savemodel', metavar='PATH', default=None,
+        help=("Save the processed model to the given file, such that it can be "
+              "rendered again with --load-model without processing the sources."))
+    parser.add_argument(
+        '--load-model', dest='loadmodel', metavar='PATH', default=None,
+        help=("Load the model saved with --save-model instead of processing the sources: "
+              "source paths and options that alter how the sources are processed are ignored. "
+              "The model must have been saved by the same versions of pydoctor and Python, "
+              "with the same system class and extensions."))
+
     parser.add_argument(
         '--cls-member-order', dest='cls_member_order', default="alphabetical", choices=["alphabetical", "source"],
         help=("Presentation order of class members. (default: alphabetical)"))
@@ -373,8 +417,16 @@ class Options:
     sidebarexpanddepth:     int                                     = attr.ib()
     sidebartocdepth:        int                                     = attr.ib()
     nosidebar:              int                                     = attr.ib()
+    sidebarjs:              bool                                    = attr.ib()
     cls_member_order:       'Literal["alphabetical", "source"]'     = attr.ib()
     mod_member_order:       'Literal["alphabetical", "source"]'     = attr.ib()
+    incremental:            bool                                    = attr.ib()
+    incremental_cache_path: Optional[str]                           = attr.ib()
+    watch:                  bool                                    = attr.ib()
+    serve:                  Optional[int]                           = attr.ib()
+    jobs:                   int                                     = attr.ib()
+    savemodel:              Optional[str]                           = attr.ib()
+    loadmodel:              Optional[str]                           = attr.ib()
 
     def __attrs_post_init__(self) -> None:
         # do some validations...
@@ -385,6 +437,8 @@ class Options:
         if self.sidebartocdepth < 0:
             error("Invalid --sidebar-toc-depth value" + 'The value of --sidebar-toc-depth option should be greater or equal to 0, '
                                 'to suppress sidebar generation all together: use --no-sidebar')
+        if self.jobs < 1:
+            error("Invalid --jobs value: the number of worker processes should be greater or equal to 1.")
             
     # HIGH LEVEL FACTORY METHODS
 
@@ -407,6 +461,10 @@ class Options:
             else:
                 argsdict['makehtml'] = False
         
+        # --watch implies --incremental
+        if args.watch:
+            argsdict['incremental'] = True
+
         # auto-detect source link template if the default value is used.
         if args.htmlsourcetemplate == cls.HTML_SOURCE_TEMPLATE_DEFAULT:
             argsdict['htmlsourcetemplate'] = _get_viewsource_template(args.htmlsourcebase)
@@ -13,7 +13,9 @@ from __future__ import annotations
 
 import functools
 import re
-from typing import Any, Callable
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar('T')
 
 @functools.lru_cache(maxsize=256, typed=True)
 def _compile_pattern(pat: str) -> Callable[[str], Any]:
@@ -26,6 +28,59 @@ def qnmatch(name:str, pattern:str) -> bool:
     match = _compile_pattern(pattern)
     return match(name) is not None
 
+_GLOB_CHARS = re.compile(r'[*?\[]')
+
+def compile_rules(rules: Sequence[Tuple[T, str]]) -> Callable[[str], Optional[T]]:
+    """
+    Compile a list of C{(value, pattern)} rules into a single matcher. 
+
+    The matcher returns the value of the rule that matches a given name, or C{None}. 
+    Rules whose pattern is exactly the name take precedence, then the last rules take
+    precedence over the first ones.
+
+    This is equivalent to calling L{qnmatch} for each rule, but much faster with many rules: 
+    literal patterns, and patterns like C{pkg.mod.**} or C{pkg.mod.*} are looked up by name segments,
+    the remaining patterns are tested in a single regular expression.
+    """
+    # Values are indexes in the rules list: the highest index takes precedence.
+    exact: Dict[str, int] = {}
+    descendants: Dict[str, int] = {}
+    children: Dict[str, int] = {}
+    others: List[int] = []
+    for i, (_, pattern) in enumerate(rules):
+        exact[pattern] = i
+        parent, _, last = pattern.rpartition('.')
+        if parent and last in ('*', '**') and not _GLOB_CHARS.search(parent):
+            (descendants if last == '**' else children)[parent] = i
+        elif _GLOB_CHARS.search(pattern):
+            others.append(i)
+        # else, the pattern can only match exactly.
+    
+    # The first alternative that matches is the one of the rule with the highest precedence.
+    # Each alternative is a capturing group, translate() does not create any other groups.
+    others.reverse()
+    match = re.compile('|'.join(f'({translate(rules[i][1])})' for i in others)).match if others else None
+    
+    def matcher(name: str) -> Optional[T]:
+        if name in exact:
+            return rules[exact[name]][0]
+        best = -1
+        if match is not None:
+            m = match(name)
+            if m is not None:
+                assert m.lastindex is not None
+                best = others[m.lastindex - 1]
+        if children:
+            best = max(best, children.get(name.rpartition('.')[0], -1))
+        if descendants:
+            dot = name.find('.')
+            while dot != -1:
+                best = max(best, descendants.get(name[:dot], -1))
+                dot = name.find('.', dot + 1)
+        return rules[best][0] if best != -1 else None
+    
+    return matcher
+
 # Barely changed from https://github.com/python/cpython/blob/3.8/Lib/fnmatch.py
 # Not using python3.9+ version because implementation is significantly more complex.
 def translate(pat:str) -> str:
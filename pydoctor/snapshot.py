@@ -0,0 +1,416 @@
+"""
+Snapshots of the processed modules, used to build the system incrementally.
+
+After all modules have been processed (but before the post-processing), the
+L{System} state is pickled in the incremental build cache, together with a digest
+of each module source and the dependencies between modules recorded while processing them.
+The cache is kept outside of the HTML output directory, see L{cache_directory}.
+
+The next build loads the snapshot and only processes again the modules whose sources changed,
+as well as the modules that depend on them (transitively).
+The other modules are taken as is from the snapshot.
+
+The snapshot is discarded and all modules are processed whenever the set of modules,
+the pydoctor version or an option that alters the processing changed.
+
+The same machinery is used to save the post-processed system with C{--save-model}
+and load it back with C{--load-model}, see L{save_model} and L{load_model}.
+"""
+from __future__ import annotations
+
+from contextlib import contextmanager
+import copyreg
+from functools import partial
+import gc
+import hashlib
+import pickle
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, IO, Iterable, Iterator, List, Mapping, Optional, Set, Tuple, TYPE_CHECKING
+
+import appdirs
+from docutils import nodes
+from docutils.utils import Reporter
+
+from pydoctor import __version__
+
+if TYPE_CHECKING:
+    from pydoctor import model
+
+USER_INCREMENTAL_CACHE = Path(appdirs.user_cache_dir('pydoctor')) / 'incremental'
+"""
+Default parent directory of the incremental build caches, one for each HTML output directory.
+"""
+
+SNAPSHOT_FILENAME = 'model.pickle'
+
+_SNAPSHOT_FORMAT = 1
+
+# The documentables graph is deeply nested, pickle needs more than the default recursion limit.
+_RECURSION_LIMIT = 100000
+
+def _system() -> 'model.System':
+    """
+    Placeholder for the system in pickles, resolved by L{_SystemUnpickler}.
+    """
+    raise pickle.UnpicklingError('the system can only be unpickled with a _SystemUnpickler')
+
+def _documentable(name: str) -> 'model.Documentable':
+    """
+    Placeholder to create instances of the dynamically created model classes
+    in pickles, resolved by L{_SystemUnpickler}.
+    """
+    raise pickle.UnpicklingError('documentables can only be unpickled with a _SystemUnpickler')
+
+def _docutils_document(source: str, report_level: int, halt_level: int) -> nodes.document:
+    """
+    Create the docutils documents in pickles, with a silent reporter.
+
+    The parsed docstrings hold docutils documents, which are pickled without their reporter,
+    but the reporter is still used while rendering the docstrings.
+    """
+    document: nodes.document = nodes.document.__new__(nodes.document)
+    document.reporter = Reporter(source, report_level, halt_level, stream='')
+    return document
+
+class _SystemPickler(pickle.Pickler):
+    """
+    Pickle documentables with references to the system and the
+    dynamically created model classes instead of their values.
+    """
+    def __init__(self, file: IO[bytes], system: 'model.System') -> None:
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        # The dispatch table is only looked up for the exact type of the objects,
+        # this is much faster than persistent_id() which is called for every object.
+        table: Dict[type, Callable[[Any], Any]] = dict(copyreg.dispatch_table)
+        table[type(system)] = lambda _: (_system, ())
+        for (name, _), klass in system._factory._class_cache.items():
+            table[klass] = partial(self._reduce_documentable, name)
+        table[nodes.document] = self._reduce_document
+        self.dispatch_table = table
+
+    @staticmethod
+    def _reduce_documentable(name: str, ob: 'model.Documentable') -> Any:
+        return (_documentable, (name,), ob.__dict__)
+
+    @staticmethod
+    def _reduce_document(document: nodes.document) -> Any:
+        # Like nodes.document.__getstate__(), but the state does not include the reporter,
+        # such that the one created by _docutils_document() is kept.
+        state = dict(vars(document), transformer=None)
+        del state['reporter']
+        reporter = document.reporter
+        return (_docutils_document, (reporter.source, reporter.report_level, reporter.halt_level), state)
+
+class _SystemUnpickler(pickle.Unpickler):
+    """
+    Counterpart of L{_SystemPickler}: references are resolved against another system.
+    """
+    def __init__(self, file: IO[bytes], system: 'model.System') -> None:
+        super().__init__(file)
+        self.system = system
+
+    def find_class(self, module: str, name: str) -> Any:
+        if module == __name__:
+            if name == '_system':
+                return lambda: self.system
+            if name == '_documentable':
+                return lambda classname: object.__new__(self.system._factory.get_class(classname))
+        return super().find_class(module, name)
+
+@contextmanager
+def _pickling() -> Iterator[None]:
+    """
+    Like for L{ast.parse}, the cyclic garbage collector slows down (un)pickling a lot,
+    since it creates a large number of objects, so it's paused.
+    """
+    old = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(old, _RECURSION_LIMIT))
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+        sys.setrecursionlimit(old)
+
+def cache_directory(options: 'model.Options') -> Path:
+    """
+    Where the incremental build state is stored for the given options: C{--incremental-cache-path}
+    or a directory of L{USER_INCREMENTAL_CACHE} specific to the HTML output directory.
+
+    The state is not stored in the HTML output directory, such that it's not published with
+    the documentation, and such that the pickles loaded are not part of the published files.
+    """
+    if options.incremental_cache_path:
+        return Path(options.incremental_cache_path)
+    output = str(Path(options.htmloutput).resolve())
+    return USER_INCREMENTAL_CACHE / hashlib.sha256(output.encode('utf-8')).hexdigest()[:16]
+
+def snapshot_path(options: 'model.Options') -> Path:
+    """
+    Where the snapshot is stored for the given options.
+    """
+    return cache_directory(options) / SNAPSHOT_FILENAME
+
+def fingerprint(system: 'model.System') -> Tuple[Any, ...]:
+    """
+    Everything, but the modules sources, that influences the modules processing.
+    A snapshot created with a different fingerprint can't be used.
+    """
+    options = system.options
+    return (_SNAPSHOT_FORMAT, __version__, sys.version_info[:2],
+            f'{type(system).__module__}.{type(system).__qualname__}',
+            tuple(system.extensions), tuple(system.custom_extensions),
+            str(options.projectbasedirectory), options.prependedpackage,
+            options.docformat, options.processtypes,
+            options.htmlsourcebase, options.htmlsourcetemplate,
+            options.pyvalreprlinelen, options.pyvalreprmaxlines,)
+
+def _module_digest(mod: 'model.Module') -> str:
+    assert mod.source_path is not None
+    return hashlib.sha256(mod.source_path.read_bytes()).hexdigest()
+
+def discovered_modules(system: 'model.System') -> Optional[List[Tuple[str, str, str, str]]]:
+    """
+    Describe the modules that have been added to the system but not processed yet,
+    as a list of C{(fullName, class name, source path, digest)}.
+
+    @returns: C{None} if some modules can't be handled by incremental builds: C-extensions
+        and modules created from strings.
+    """
+    modules = []
+    for mod in system.unprocessed_modules:
+        if mod._is_c_module or mod.source_path is None or mod._py_string is not None:
+            return None
+        try:
+            digest = _module_digest(mod)
+        except OSError:
+            return None
+        modules.append((mod.fullName(), type(mod).__name__, str(mod.source_path), digest))
+    return modules
+
+def _dump(system: 'model.System', path: Path, header: Dict[str, Any], payload: Dict[str, Any]) -> None:
+    """
+    Atomically write the header, pickled as is, and the payload, pickled with a L{_SystemPickler}.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp')
+    try:
+        with tmp.open('wb') as f, _pickling():
+            pickle.dump(header, f, pickle.HIGHEST_PROTOCOL)
+            _SystemPickler(f, system).dump(payload)
+        tmp.replace(path)
+    except BaseException:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        raise
+
+def save(system: 'model.System', path: Path, modules: List[Tuple[str, str, str, str]]) -> None:
+    """
+    Save the snapshot of a system which modules have all been processed,
+    but that is not post-processed yet.
+
+    @param modules: The value returned by L{discovered_modules} before processing the modules.
+    """
+    assert not system.unprocessed_modules
+    header = {'fingerprint': fingerprint(system), 'modules': modules}
+    payload = {'allobjects': system.allobjects,
+               'parse_errors': {k:set(v) for k,v in system.parse_errors.items()}}
+    try:
+        _dump(system, path, header, payload)
+    except Exception as e:
+        system.msg('incremental', f'could not save the snapshot of the system to {path}: {e}')
+
+def load(system: 'model.System', path: Path,
+         modules: List[Tuple[str, str, str, str]]) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    Load the snapshot header and payload if the snapshot can be used with the given system.
+
+    @returns: C{None} if the snapshot does not exist or can't be used.
+    """
+    if not path.is_file():
+        return None
+    try:
+        with path.open('rb') as f, _pickling():
+            header = pickle.load(f)
+            if header['fingerprint'] != fingerprint(system):
+                system.msg('incremental', 'options or pydoctor version changed since the previous build, processing all modules')
+                return None
+            if [m[:3] for m in header['modules']] != [m[:3] for m in modules]:
+                system.msg('incremental', 'modules have been added or removed since the previous build, processing all modules')
+                return None
+            payload = _SystemUnpickler(f, system).load()
+    except Exception as e:
+        system.msg('incremental', f'could not load the snapshot of the system from {path}: {e}')
+        return None
+    return header, payload
+
+def affected_modules(changed: Iterable[str], objects: Mapping[str, 'model.Documentable']) -> Set[str]:
+    """
+    Compute the full names of the modules that need to be processed again:
+    the changed modules and the modules that depend on them, transitively.
+    """
+    # Workaround cyclic import issue.
+    from pydoctor import model
+
+    dependents: Dict[str, Set[str]] = {}
+    for ob in objects.values():
+        if isinstance(ob, model.Module):
+            for dep in ob._dependencies:
+                dependents.setdefault(dep, set()).add(ob.fullName())
+
+    affected: Set[str] = set()
+    stack = list(changed)
+    while stack:
+        name = stack.pop()
+        if name in affected:
+            continue
+        affected.add(name)
+        stack.extend(dependents.get(name, ()))
+    return affected
+
+def restore(system: 'model.System', payload: Dict[str, Any], affected: Set[str]) -> None:
+    """
+    Replace the freshly discovered modules of the system by the
+    processed modules of the snapshot, except the affected modules.
+
+    The affected modules are left in the L{System.unprocessed_modules} list.
+    """
+    # Workaround cyclic import issue.
+    from pydoctor import model
+
+    old_objects: Dict[str, model.Documentable] = payload['allobjects']
+    fresh: Dict[str, model.Module] = {m.fullName():m for m in system.unprocessed_modules}
+
+    def final(name: str) -> model.Module:
+        mod = fresh[name] if name in affected else old_objects[name]
+        assert isinstance(mod, model.Module)
+        return mod
+
+    # Rebuild the modules tree with the restored modules and the fresh affected modules.
+    for name, mod in fresh.items():
+        new = final(name)
+        if mod.parent is not None:
+            new.parent = final(mod.parent.fullName())
+        for key, ob in list(new.contents.items()):
+            if isinstance(ob, model.Module):
+                new.contents[key] = final(ob.fullName())
+
+    allobjects: Dict[str, model.Documentable] = {name: final(name) for name in fresh}
+    for name, ob in old_objects.items():
+        if not isinstance(ob, model.Module) and ob.module.fullName() not in affected:
+            allobjects[name] = ob
+
+    for name in list(system.allobjects):
+        system._delObject(name)
+    for name, ob in allobjects.items():
+        system._setObject(name, ob)
+    system.rootobjects[:] = [final(m.fullName()) for m in system.rootobjects]
+    system.unprocessed_modules[:] = [m for m in system.unprocessed_modules if m.fullName() in affected]
+
+    for section, names in payload['parse_errors'].items():
+        system.parse_errors[section].update(n for n in names
+            if n in system.allobjects and n not in affected)
+
+    # Repeat the messages issued while processing the restored modules.
+    for name in fresh:
+        if name not in affected:
+            for args in final(name)._messages:
+                system.msg(*args)
+
+def processIncrementally(system: 'model.System') -> None:
+    """
+    Process the system's modules, re-using the processed modules of
+    the previous build when possible, then save the new snapshot.
+
+    This does not post-process the system.
+    """
+    modules = discovered_modules(system)
+    if modules is None:
+        system.msg('incremental', 'incremental builds do not support C-extensions or modules created from strings, processing all modules')
+        system.processModules()
+        return
+
+    path = snapshot_path(system.options)
+    loaded = load(system, path, modules)
+    if loaded is None:
+        system.processModules()
+        save(system, path, modules)
+        return
+
+    header, payload = loaded
+    changed = [new[0] for old, new in zip(header['modules'], modules) if old[3] != new[3]]
+    affected = affected_modules(changed, payload['allobjects'])
+
+    # Workaround cyclic import issue.
+    from pydoctor import model
+
+    # The module names recorded in the header should match the objects,
+    # unless a module has been moved by a re-export.
+    for name, *_ in modules:
+        if not isinstance(payload['allobjects'].get(name), model.Module):
+            system.msg('incremental', 'the previous build moved modules, processing all modules')
+            system.processModules()
+            save(system, path, modules)
+            return
+
+    system.msg('incremental', f'{len(changed)} changed modules, '
+               f'processing {len(affected)} of {len(modules)} modules')
+    restore(system, payload, affected)
+    system.processModules()
+    if affected:
+        save(system, path, modules)
+
+def _model_fingerprint(system: 'model.System') -> Tuple[Any, ...]:
+    return (_SNAPSHOT_FORMAT, __version__, sys.version_info[:2],
+            f'{type(system).__module__}.{type(system).__qualname__}',
+            tuple(system.extensions), tuple(system.custom_extensions),)
+
+def save_model(system: 'model.System', path: Path) -> None:
+    """
+    Save a post-processed system, such that it can be rendered again without processing the modules.
+
+    @raises Exception: If the model can't be written.
+    """
+    assert not system.unprocessed_modules
+    header = {'fingerprint': _model_fingerprint(system)}
+    payload = {'allobjects': system.allobjects,
+               'rootobjects': system.rootobjects,
+               'projectname': system.projectname,
+               'violations': system.violations,
+               'parse_errors': {k:set(v) for k,v in system.parse_errors.items()}}
+    _dump(system, path, header, payload)
+
+def load_model(system: 'model.System', path: Path) -> None:
+    """
+    Load a system saved with L{save_model} into a fresh system.
+
+    The modules are neither processed nor post-processed again. The options that alter
+    the processing of the modules have no effect, the options of the build that saved the model
+    apply instead.
+
+    @raises ValueError: If the model has been saved by another version of pydoctor or Python,
+        or with another system class or other extensions.
+    @raises Exception: If the model can't be read.
+    """
+    assert not system.allobjects, "the model can only be loaded in an empty system"
+    with path.open('rb') as f, _pickling():
+        header = pickle.load(f)
+        if header['fingerprint'] != _model_fingerprint(system):
+            raise ValueError(f'{path} has been saved with another version of pydoctor or Python, '
+                             'or with another system class or other extensions')
+        payload = _SystemUnpickler(f, system).load()
+    for name, ob in payload['allobjects'].items():
+        system._setObject(name, ob)
+    system.rootobjects.extend(payload['rootobjects'])
+    system.projectname = payload['projectname']
+    system.violations += payload['violations']
+    for section, names in payload['parse_errors'].items():
+        system.parse_errors[section].update(names)
+    # The model is post-processed, so names can be cached right away.
+    system._resetNameCaches(enable=True)
+    system.computeVisibility()
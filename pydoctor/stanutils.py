@@ -1,16 +1,28 @@
 """
 Utilities related to Stan tree building and HTML flattening.
 """
+from __future__ import annotations
+
 import re
+from inspect import iscoroutine
+from traceback import extract_tb
 from types import GeneratorType
-from typing import Union, List, TYPE_CHECKING
+from typing import Any, Callable, Generator, Iterable, List, Mapping, Optional, Tuple, Union, TYPE_CHECKING
 
-from twisted.web.template import Tag, XMLString, flattenString
+from twisted.internet.defer import Deferred, ensureDeferred, fail, succeed
+from twisted.web.template import CDATA, CharRef, Comment, Tag, XMLString, slot
+from twisted.web.error import FlattenerError, UnfilledSlot, UnsupportedType
+from twisted.web.iweb import IRenderable
 from twisted.python.failure import Failure
 
 if TYPE_CHECKING:
     from twisted.web.template import Flattenable
 
+# The tags that twisted's flattener writes as <tag /> when they have no children, 
+# the stan trees must be flattened the same way. This includes its 'wbs' misspelling.
+_VOID_ELEMENTS = frozenset(('img', 'br', 'hr', 'base', 'meta', 'link', 'param', 'area', 'input', 'col', 
+                            'basefont', 'isindex', 'frame', 'command', 'embed', 'keygen', 'source', 'track', 'wbs'))
+
 _RE_CONTROL = re.compile((
     '[' + ''.join(
     ch for ch in map(chr, range(0, 32)) if ch not in '\r\n\t\f'
@@ -50,11 +62,311 @@ def flatten(stan: "Flattenable") -> str:
     """
     ret: List[bytes] = []
     err: List[Failure] = []
-    flattenString(None, stan).addCallback(ret.append).addErrback(err.append)
+    flatten_to(stan, ret.append).addErrback(err.append)
     if err:
         raise err[0].value
     else:
-        return ret[0].decode()
+        return b''.join(ret).decode()
+
+BUFFER_SIZE = 2**16
+"""
+The number of bytes that L{flatten_to} accumulates before writing them.
+"""
+
+def flatten_to(stan: "Flattenable", write: Callable[[bytes], object]) -> Deferred[None]:
+    """
+    Write the HTML of a Stan tree in chunks of about L{BUFFER_SIZE} bytes.
+
+    This gives the same output as L{twisted.web.template.flatten}, but the tree is flattened 
+    synchronously, without going through L{Deferred} callbacks for each element. 
+    Only when a renderer returns a L{Deferred} (or a coroutine) that has not fired yet, 
+    the rest of the tree is flattened once it fires.
+
+    @param stan: The tree to flatten.
+    @param write: Called with the HTML bytes.
+    @return: A L{Deferred} fired once the whole tree has been written, 
+        failed with a L{FlattenerError} if the flattening fails.
+    """
+    buffer: List[bytes] = []
+    size = 0
+    def buffered_write(data: bytes) -> None:
+        nonlocal size
+        buffer.append(data)
+        size += len(data)
+        if size >= BUFFER_SIZE:
+            flush()
+    def flush() -> None:
+        nonlocal size
+        if buffer:
+            write(b''.join(buffer))
+            del buffer[:]
+            size = 0
+
+    flattening = _flatten(stan, buffered_write, [], None, False)
+    try:
+        waiting = flattening.send(None)
+    except StopIteration:
+        flush()
+        return succeed(None)
+    except Exception as e:
+        return fail(_flattener_error(e, stan))
+    
+    async def resume(waiting: Deferred[Any]) -> None:
+        while True:
+            flush()
+            try:
+                result = await waiting
+                waiting = flattening.send(result)
+            except StopIteration:
+                flush()
+                return
+            except Exception as e:
+                raise _flattener_error(e, stan)
+
+    return ensureDeferred(resume(waiting))
+
+def _flattener_error(e: Exception, stan: "Flattenable") -> FlattenerError:
+    if isinstance(e, FlattenerError):
+        return e
+    return FlattenerError(e, [stan], extract_tb(e.__traceback__))
+
+def _escape(data: Union[str, bytes]) -> bytes:
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return data.replace(b"&", b"&amp;").replace(b"<", b"&lt;").replace(b">", b"&gt;")
+
+def _attribute_write(write: Callable[[bytes], object]) -> Callable[[bytes], object]:
+    def attribute_write(data: bytes) -> None:
+        write(_escape(data).replace(b'"', b"&quot;"))
+    return attribute_write
+
+_Flattening = Generator['Deferred[Any]', Any, None]
+
+def _flatten(root: "Flattenable", 
+             write: Callable[[bytes], object], 
+             slot_data: List[Optional[Mapping[str, "Flattenable"]]], 
+             render_factory: Optional[IRenderable], 
+             in_attribute: bool) -> _Flattening:
+    """
+    Write the HTML of C{root}, like L{twisted.web._flatten._flattenElement} does.
+
+    The L{Deferred}s found in the tree are yielded, their results are sent back.
+    The text in attributes is not escaped since C{write} does it. 
+    """
+    if isinstance(root, (str, bytes)):
+        if not in_attribute:
+            write(_escape(root))
+        elif isinstance(root, str):
+            write(root.encode('utf-8'))
+        else:
+            write(root)
+    elif isinstance(root, Tag):
+        if type(root) is _CompiledTag and not in_attribute:
+            yield from _flatten_children((root,), write, slot_data, render_factory, in_attribute)
+            return
+        # Like twisted, the slot data of the tags is only removed after rendering.
+        slot_data.append(root.slotData)
+        if root.render is not None:
+            if render_factory is None:
+                raise ValueError(
+                    f'Tag wants to be rendered by method "{root.render}" '
+                    f"but is not contained in any IRenderable"
+                )
+            clone = root.clone(False)
+            clone.render = None
+            result = render_factory.lookupRenderMethod(root.render)(None, clone)
+            yield from _flatten(result, write, slot_data, render_factory, in_attribute)
+            slot_data.pop()
+            return
+        if not root.tagName:
+            yield from _flatten_children(root.children, write, slot_data, render_factory, in_attribute)
+            return
+        tagname = root.tagName.encode('ascii') if isinstance(root.tagName, str) else root.tagName
+        start = [b"<", tagname]
+        for name, value in root.attributes.items():
+            start.append(b" " + (name.encode('ascii') if isinstance(name, str) else name) + b'="')
+            if type(value) is str:
+                start.append(_escape(value).replace(b'"', b"&quot;"))
+            else:
+                write(b"".join(start))
+                start = []
+                yield from _flatten(value, _attribute_write(write), slot_data, render_factory, True)
+            start.append(b'"')
+        if root.children or tagname.decode('ascii') not in _VOID_ELEMENTS:
+            start.append(b">")
+            write(b"".join(start))
+            yield from _flatten_children(root.children, write, slot_data, render_factory, False)
+            write(b"</" + tagname + b">")
+        else:
+            start.append(b" />")
+            write(b"".join(start))
+    elif isinstance(root, (tuple, list, GeneratorType)):
+        yield from _flatten_children(root, write, slot_data, render_factory, in_attribute)
+    elif isinstance(root, slot):
+        for data in reversed(slot_data):
+            if data is not None and root.name in data:
+                value = data[root.name]
+                break
+        else:
+            if root.default is None:
+                raise UnfilledSlot(root.name)
+            value = root.default
+        yield from _flatten(value, write, slot_data, render_factory, in_attribute)
+    elif isinstance(root, CDATA):
+        write(b"<![CDATA[")
+        write(root.data.encode('utf-8').replace(b"]]>", b"]]]]><![CDATA[>"))
+        write(b"]]>")
+    elif isinstance(root, Comment):
+        comment = root.data.encode('utf-8').replace(b"-->", b"--&gt;")
+        write(b"<!--")
+        write(comment + b" " if comment[-1:] == b"-" else comment)
+        write(b"-->")
+    elif isinstance(root, CharRef):
+        write(b"&#%d;" % (root.ordinal,))
+    elif isinstance(root, Deferred):
+        result = yield _fork(root)
+        yield from _flatten(result, write, slot_data, render_factory, in_attribute)
+    elif iscoroutine(root):
+        result = yield Deferred.fromCoroutine(root)
+        yield from _flatten(result, write, slot_data, render_factory, in_attribute)
+    elif IRenderable.providedBy(root):
+        result = root.render(None)
+        yield from _flatten(result, write, slot_data, root, in_attribute)
+    else:
+        raise UnsupportedType(root)
+
+def _flatten_children(children: Iterable["Flattenable"], 
+                      write: Callable[[bytes], object], 
+                      slot_data: List[Optional[Mapping[str, "Flattenable"]]], 
+                      render_factory: Optional[IRenderable], 
+                      in_attribute: bool) -> _Flattening:
+    for child in children:
+        if in_attribute:
+            yield from _flatten(child, write, slot_data, render_factory, in_attribute)
+        elif type(child) is str:
+            # Fast path for the text.
+            write(child.encode('utf-8').replace(b"&", b"&amp;").replace(b"<", b"&lt;").replace(b">", b"&gt;"))
+        elif type(child) is _Text:
+            write(child.html)
+        elif type(child) is _CompiledTag:
+            slot_data.extend(child.slot_frames)
+            if child.html is not None:
+                write(child.html)
+            else:
+                write(child.start)
+                yield from _flatten_children(child.children, write, slot_data, render_factory, False)
+                write(child.end)
+        else:
+            yield from _flatten(child, write, slot_data, render_factory, in_attribute)
+
+class _Text(str):
+    """
+    Text of a compiled template, with its HTML.
+    """
+    html: bytes
+
+class _CompiledTag(Tag):
+    """
+    Tag of a compiled template, with the HTML of its start and end tags.
+    
+    @ivar html: The HTML of the whole tag if nothing in it is rendered, else C{None}.
+    @ivar slot_frames: The empty slot data that is pushed when flattening the tag, 
+        one for each tag written with L{html}.
+    """
+    start: bytes
+    end: bytes
+    html: Optional[bytes]
+    slot_frames: Tuple[None, ...]
+
+def compile_template(document: List["Flattenable"]) -> List["Flattenable"]:
+    """
+    Compile a loaded template, such that L{flatten_to} writes the parts 
+    that do not depend on the renderers and the slots without walking them.
+
+    The compiled template has the same structure as C{document}: the text and the 
+    tags without renderer are copied as L{str} and L{Tag} subclasses that hold their HTML.
+    So the renderers get the same tags as before, and the compiled template can 
+    also be flattened with L{twisted.web.template.flatten}.
+
+    @note: The compiled tags must not be changed afterwards, 
+        the renderers should change the copy of the tag they receive. 
+        The attributes are not compiled.
+    """
+    return [_compile(node) for node in document]
+
+def _compile(node: "Flattenable") -> "Flattenable":
+    if type(node) is str:
+        text = _Text(node)
+        text.html = _escape(node)
+        return text
+    if type(node) is not Tag or node.slotData:
+        return node
+    children = [_compile(child) for child in node.children]
+    attributes = [b" " + name.encode('ascii') + b'="' + _escape(value).replace(b'"', b"&quot;") + b'"'
+                  for name, value in node.attributes.items() if type(name) is str and type(value) is str]
+    if node.render is not None or len(attributes) != len(node.attributes) or type(node.tagName) is not str:
+        # The renderers get a copy of the tag, so it stays a plain Tag.
+        return Tag(node.tagName, attributes=node.attributes, children=children, render=node.render,
+                   filename=node.filename, lineNumber=node.lineNumber, columnNumber=node.columnNumber)
+    tag = _CompiledTag(node.tagName, attributes=node.attributes, children=children, 
+                       filename=node.filename, lineNumber=node.lineNumber, columnNumber=node.columnNumber)
+    if node.tagName:
+        tagname = node.tagName.encode('ascii')
+        tag.start = b"<" + tagname + b"".join(attributes) + b">"
+        tag.end = b"</" + tagname + b">"
+    else:
+        tag.start = tag.end = b""
+    if all(type(child) is _Text or isinstance(child, Comment) or 
+           (type(child) is _CompiledTag and child.html is not None) for child in children):
+        tag.html = flatten(node).encode('utf-8')
+        # Like twisted, each tag pushes its slot data when it's flattened.
+        tag.slot_frames = (None,) + tuple(frame for child in children if type(child) is _CompiledTag 
+                                          for frame in child.slot_frames)
+    else:
+        tag.html = None
+        tag.slot_frames = (None,)
+    return tag
+
+def render_once(stan: "Flattenable", slots: Mapping[str, "Flattenable"]) -> Optional[Tuple[bytes, int]]:
+    """
+    Flatten C{stan} with the given slots filled, such that its HTML can be written 
+    again with L{prerendered}.
+
+    @returns: The HTML and the number of slot data that flattening C{stan} leaves behind 
+        (like twisted, the slot data of the tags is only removed after rendering), 
+        or C{None} if C{stan} cannot be flattened synchronously.
+    """
+    html: List[bytes] = []
+    slot_data: List[Optional[Mapping[str, "Flattenable"]]] = [slots]
+    for _ in _flatten(stan, html.append, slot_data, None, False):
+        # A renderer returned a Deferred.
+        return None
+    return b"".join(html), len(slot_data) - 1
+
+def prerendered(stan: "Flattenable", html: bytes, slot_frames: int) -> Tag:
+    """
+    Wrap C{stan} in a tag that L{flatten_to} writes as the given HTML, 
+    as returned by L{render_once}. 
+    
+    L{twisted.web.template.flatten} still flattens C{stan}.
+    """
+    tag = _CompiledTag('', children=[stan])
+    tag.start = tag.end = b""
+    tag.html = html
+    tag.slot_frames = (None,) * (slot_frames + 1)
+    return tag
+
+def _fork(d: Deferred[Any]) -> Deferred[Any]:
+    # Like twisted, do not change the result of the renderer's deferred.
+    forked: Deferred[Any] = Deferred(lambda _: d.cancel())
+    def callback(result: Any) -> Any:
+        forked.callback(result)
+        return result
+    def errback(failure: Failure) -> Failure:
+        forked.errback(failure)
+        return failure
+    d.addCallbacks(callback, errback)
+    return forked
 
 def flatten_text(stan: 'Flattenable') -> str:
     """
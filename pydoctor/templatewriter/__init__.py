@@ -1,9 +1,10 @@
 """Render pydoctor data as HTML."""
 from __future__ import annotations
 
-from typing import Any, Iterable, Iterator, Optional, Union, TYPE_CHECKING
+from typing import Any, Iterable, Iterator, List, Optional, Union, TYPE_CHECKING
 if TYPE_CHECKING:
     from typing_extensions import Protocol, runtime_checkable
+    from twisted.web.template import Flattenable
 else:
     Protocol = object
     def runtime_checkable(f):
@@ -25,7 +26,9 @@ else:
 
 from twisted.web.iweb import ITemplateLoader
 from twisted.web.template import TagLoader, XMLString, Element, tags
+from zope.interface import implementer
 
+from pydoctor.stanutils import compile_template
 from pydoctor.templatewriter.util import CaseInsensitiveDict
 from pydoctor.model import System, Documentable
 
@@ -212,7 +215,7 @@ class HtmlTemplate(Template):
     @ivar loader: Object used to render the final HTML file 
         with the Twisted templating system.
 
-        This is a L{ITemplateLoader}.
+        This is a L{ITemplateLoader}, the template is compiled with L{compile_template}.
     """
     def __init__(self, name: str, text: str):
         super().__init__(name=name)
@@ -224,7 +227,7 @@ class HtmlTemplate(Template):
         else:
             self._dom = parse_xml(self.text)
             self.version = self._extract_version(self._dom, self.name)
-            self.loader = XMLString(self._dom.toxml())
+            self.loader = CompiledLoader(XMLString(self._dom.toxml()))
 
     @staticmethod
     def _extract_version(dom: minidom.Document, template_name: str) -> int:
@@ -255,6 +258,22 @@ class HtmlTemplate(Template):
 
         return version
 
+@implementer(ITemplateLoader)
+class CompiledLoader:
+    """
+    L{ITemplateLoader} of a compiled template.
+
+    @see: L{compile_template}
+    """
+    def __init__(self, loader: ITemplateLoader) -> None:
+        """
+        @param loader: The loader of the template to compile. 
+        """
+        self._document = compile_template(loader.load())
+    
+    def load(self) -> List["Flattenable"]:
+        return self._document
+
 class TemplateLookup:
     """
     The L{TemplateLookup} handles the HTML template files locations.
@@ -0,0 +1,363 @@
+"""
+Page invalidation graph, used to render again only the outdated pages when building incrementally.
+
+The graph records, for each page written by the L{TemplateWriter}, the full names of the
+L{Documentable}s that the page depends on, together with a fingerprint of each of these objects.
+A page is outdated when one of its dependencies fingerprint changed, or when the
+options, the templates or the intersphinx inventories changed.
+
+The dependencies of a page are:
+    - the documented object, its ancestors and the members rendered in the page,
+    - the inherited members and the subclasses of the documented class,
+    - the objects listed in the sidebar,
+    - the objects referenced by the rendered objects (base classes, subclasses, interfaces, etc),
+    - the names looked up by the linkers when rendering the docstrings, whether they could be resolved or not.
+"""
+from __future__ import annotations
+
+import ast
+import collections.abc
+import enum
+import hashlib
+import inspect
+import json
+from pathlib import Path, PurePath
+from typing import Any, Collection, Dict, Iterable, Iterator, List, Optional, Set
+from urllib.parse import unquote
+
+from pydoctor import __version__, model
+from pydoctor.epydoc.markup import ParsedDocstring
+from pydoctor.extensions import zopeinterface
+from pydoctor.linker import _EpydocLinker
+from pydoctor.snapshot import cache_directory
+from pydoctor.templatewriter import HtmlTemplate, TemplateLookup
+
+PAGES_FILENAME = 'pages.json'
+
+_PAGES_FORMAT = 2
+
+ALL_MODULES = ''
+"""
+Special dependency name standing for the names defined in all modules of the system,
+recorded when the linker looks up a name in every module.
+"""
+
+# Options that does not change the content of the individual pages.
+# The build time is ignored as well, so pages that are not rendered again keep
+# the build time of the build that wrote them.
+_IGNORED_OPTIONS = frozenset(('testing', 'pdb', 'makehtml', 'makeintersphinx', 'htmlsubjects', 'htmlsummarypages',
+                    'htmloutput', 'buildtime', 'warnings_as_errors', 'verbosity', 'quietness',
+                    'enable_intersphinx_cache', 'intersphinx_cache_path', 'clear_intersphinx_cache',
+                    'intersphinx_cache_max_age', 'incremental', 'incremental_cache_path', 'watch', 'serve',
+                    'savemodel', 'loadmodel', 'jobs'))
+
+# Attributes that are not fingerprinted, either because they are covered otherwise or because
+# they are caches populated while rendering.
+_IGNORED_ATTRIBUTES = frozenset(('system', 'parent', 'parentMod', 'contents', 'state',
+                    'parsed_docstring', 'parsed_summary', 'parsed_type',
+                    '_linker', '_messages', '_dependencies', '_py_mod', '_visibility',
+                    '_members'))
+
+def _digest(value: Any) -> str:
+    return hashlib.blake2b(repr(value).encode(), digest_size=16).hexdigest()
+
+def _summarize(value: Any, seen: Set[int]) -> Any:
+    """
+    Summarize a value as a structure of builtins, that has a stable C{repr()}.
+    Documentables are summarized by their full name.
+    """
+    if value is None or isinstance(value, (str, bytes, int, float, bool)):
+        return value
+    if isinstance(value, model.Documentable):
+        return ('@', value.fullName())
+    if isinstance(value, enum.Enum):
+        return str(value)
+    if isinstance(value, ast.AST):
+        return ast.dump(value)
+    if isinstance(value, ParsedDocstring):
+        try:
+            return value.to_node().pformat()
+        except NotImplementedError:
+            return type(value).__name__
+    if isinstance(value, _EpydocLinker):
+        return None
+    if isinstance(value, type):
+        return f'{value.__module__}.{value.__qualname__}'
+    if isinstance(value, PurePath):
+        return str(value)
+    if id(value) in seen:
+        return '...'
+    seen.add(id(value))
+    try:
+        if isinstance(value, collections.abc.Mapping):
+            return sorted(((_summarize(k, seen), _summarize(v, seen)) for k, v in value.items()), key=repr)
+        if isinstance(value, (list, tuple)):
+            return [_summarize(v, seen) for v in value]
+        if isinstance(value, (set, frozenset)):
+            return sorted((_summarize(v, seen) for v in value), key=repr)
+        if isinstance(value, inspect.Signature):
+            # Never call str() on a signature: the default values are rendered with the linker.
+            return [(p.name, str(p.kind), _summarize(p.default, seen), _summarize(p.annotation, seen))
+                    for p in value.parameters.values()] + [_summarize(value.return_annotation, seen)]
+        if hasattr(value, '__dict__'):
+            return (type(value).__name__, _summarize(vars(value), seen))
+        # The repr() of other objects may include their address, which changes with each process.
+        return type(value).__name__
+    finally:
+        seen.discard(id(value))
+
+def object_fingerprint(ob: model.Documentable) -> str:
+    """
+    Fingerprint everything about a documentable that can be rendered in a page, but its members.
+    """
+    state = {k:v for k,v in vars(ob).items() if k not in _IGNORED_ATTRIBUTES}
+    return _digest((type(ob).__name__, str(ob.kind), str(ob.privacyClass), ob.isVisible,
+                    str(ob.documentation_location), ob.url, list(ob.contents),
+                    _summarize(state, set())))
+
+def _all_modules_fingerprint(system: model.System) -> str:
+    return _digest(sorted((m.fullName(), list(m.contents))
+                   for m in system.objectsOfType(model.Module)))
+
+def name_fingerprint(system: model.System, name: str) -> str:
+    """
+    Fingerprint a dependency of a page.
+    """
+    if name == ALL_MODULES:
+        return _all_modules_fingerprint(system)
+    ob = system.objForFullName(name)
+    if ob is None:
+        return 'missing'
+    return object_fingerprint(ob)
+
+def global_fingerprint(system: model.System, template_lookup: TemplateLookup) -> str:
+    """
+    Fingerprint everything, but the documentables, that can change the individual pages.
+    """
+    options = {k:v for k,v in vars(system.options).items() if k not in _IGNORED_OPTIONS}
+    templates = sorted((t.name, t.text if isinstance(t, HtmlTemplate) else None)
+                       for t in template_lookup.templates)
+    return _digest((_PAGES_FORMAT, __version__, type(system).__qualname__,
+                    sorted(system.extensions), sorted(system.custom_extensions),
+                    system.projectname, _summarize(options, set()), templates,
+                    sorted(system.intersphinx._links.items())))
+
+def _sidebar_objects(ob: model.Documentable, depth: int, level: int = 1) -> Iterator[model.Documentable]:
+    # Mirror of sidebar.ObjContent.
+    yield ob
+    children = list(ob.contents.values())
+    if isinstance(ob, model.Class):
+        for base in ob.mro(include_self=False):
+            yield base
+            children.extend(base.contents.values())
+    for child in children:
+        if level < depth and isinstance(child, (model.Class, model.Module)):
+            yield from _sidebar_objects(child, depth, level + 1)
+        else:
+            yield child
+
+def _page_objects(ob: model.Documentable) -> Iterator[model.Documentable]:
+    # The object and the members rendered in its page.
+    yield ob
+    for child in ob.contents.values():
+        if child.documentation_location is model.DocLocation.OWN_PAGE:
+            yield child
+        else:
+            yield from _page_objects(child)
+
+def page_dependencies(ob: model.Documentable) -> Set[str]:
+    """
+    Compute the full names of the objects that the page of C{ob} depends on.
+
+    Must be called after the page has been rendered, since it includes
+    the names looked up by the linkers while rendering the page.
+    """
+    objects: Set[model.Documentable] = set()
+    names: Set[str] = set()
+
+    parent = ob.parent
+    while parent is not None:
+        objects.add(parent)
+        parent = parent.parent
+
+    objects.update(_page_objects(ob))
+
+    if isinstance(ob, model.Class):
+        for base in ob.mro(include_self=False):
+            objects.add(base)
+            objects.update(base.contents.values())
+        stack = list(ob.subclasses)
+        while stack:
+            subclass = stack.pop()
+            if subclass not in objects:
+                objects.add(subclass)
+                stack.extend(subclass.subclasses)
+        if isinstance(ob, zopeinterface.ZopeInterfaceClass):
+            names.update(ob.allImplementedInterfaces)
+
+    depth = ob.system.options.sidebarexpanddepth
+    objects.update(_sidebar_objects(ob, depth))
+    section = ob.parent if isinstance(ob, model.Module) else ob.module
+    # With --sidebar-js, the listing of the section is not part of the page.
+    if section is not None and not ob.system.options.sidebarjs:
+        objects.update(_sidebar_objects(section, depth))
+
+    for o in list(objects):
+        objects.update(o.docsources())
+        # The objects referenced directly, links to them are rendered.
+        for value in vars(o).values():
+            if isinstance(value, model.Documentable):
+                objects.add(value)
+            elif isinstance(value, list):
+                objects.update(v for v in value if isinstance(v, model.Documentable))
+
+    for o in list(objects):
+        for linked in (o, o.parent, o.module):
+            linker = getattr(linked, '_linker', None)
+            if isinstance(linker, _EpydocLinker):
+                names.update(linker.dependencies)
+
+    names.update(o.fullName() for o in objects)
+    return names
+
+class PageGraph:
+    """
+    The page invalidation graph: pages URLs to the full names of their dependencies,
+    and the fingerprints of theses dependencies at the time the pages were written.
+    """
+
+    def __init__(self, system: model.System, fingerprint: str) -> None:
+        self.system = system
+        self.fingerprint = fingerprint
+        self.pages: Dict[str, Set[str]] = {}
+        self.fingerprints: Dict[str, str] = {}
+        self.previous_pages: Set[str] = set()
+        """
+        The pages written by the previous build, even if the fingerprint changed since then.
+        """
+        self.stale_pages: Set[str] = set()
+        """
+        The pages in the build directory that are outdated but that have not been written 
+        again, because they were not part of the builds of a subset of the objects since then.
+        """
+        self._current: Dict[str, str] = {}
+        self._outdated: Dict[str, bool] = {}
+
+    @staticmethod
+    def path(options: model.Options) -> Path:
+        return cache_directory(options) / PAGES_FILENAME
+
+    @classmethod
+    def load(cls, system: model.System, fingerprint: str) -> 'PageGraph':
+        """
+        Load the page graph of the previous build.
+        The graph is empty if it does not exist or if the fingerprint changed.
+        """
+        graph = cls(system, fingerprint)
+        path = cls.path(system.options)
+        if not path.is_file():
+            return graph
+        try:
+            with path.open('r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data['format'] == _PAGES_FORMAT:
+                # The pages of the previous build are pruned even when they are all written again.
+                graph.previous_pages = set(data['pages']).union(data['stale'])
+                graph.stale_pages = set(data['stale'])
+            if data['format'] != _PAGES_FORMAT or data['fingerprint'] != fingerprint:
+                system.msg('incremental', 'options, templates or pydoctor version changed since the previous build, writing all pages')
+                return graph
+            names: List[str] = data['names']
+            graph.fingerprints = dict(zip(names, data['fingerprints']))
+            graph.pages = {url:{names[i] for i in deps} for url, deps in data['pages'].items()}
+        except Exception as e:
+            system.msg('incremental', f'could not load the page graph from {path}: {e}')
+            return cls(system, fingerprint)
+        return graph
+
+    def save(self) -> None:
+        """
+        Save the page graph with the current fingerprints of the dependencies.
+        """
+        names = sorted(set().union(*self.pages.values()))
+        index = {name:i for i, name in enumerate(names)}
+        data = {'format': _PAGES_FORMAT,
+                'fingerprint': self.fingerprint,
+                'names': names,
+                'fingerprints': [self._fingerprint(name) for name in names],
+                'pages': {url:sorted(index[n] for n in deps) for url, deps in sorted(self.pages.items())},
+                'stale': sorted(self.stale_pages)}
+        path = self.path(self.system.options)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix('.tmp')
+        try:
+            with tmp.open('w', encoding='utf-8') as f:
+                json.dump(data, f, separators=(',', ':'))
+            tmp.replace(path)
+        except OSError as e:
+            self.system.msg('incremental', f'could not save the page graph to {path}: {e}')
+
+    def _fingerprint(self, name: str) -> str:
+        try:
+            return self._current[name]
+        except KeyError:
+            fp = self._current[name] = name_fingerprint(self.system, name)
+            return fp
+
+    def outdated(self, ob: model.Documentable, build_directory: Path) -> bool:
+        """
+        Whether the page of C{ob} needs to be rendered.
+        """
+        url = ob.url
+        try:
+            return self._outdated[url]
+        except KeyError:
+            pass
+        deps = self.pages.get(url)
+        outdated = (deps is None or not build_directory.joinpath(url).is_file() or
+            any(self.fingerprints.get(name) != self._fingerprint(name) for name in deps))
+        self._outdated[url] = outdated
+        return outdated
+
+    def update(self, obs: Iterable[model.Documentable]) -> None:
+        """
+        Record the dependencies of the pages of C{obs}, that have just been rendered.
+        """
+        for ob in obs:
+            self.pages[ob.url] = page_dependencies(ob)
+            self.stale_pages.discard(ob.url)
+
+    def _up_to_date(self, url: str) -> bool:
+        deps = self.pages.get(url)
+        return deps is not None and all(
+            self.fingerprints.get(name) == self._fingerprint(name) for name in deps)
+
+    def prune(self, build_directory: Path, urls: Set[str], 
+              subjects: Optional[Collection[str]] = None) -> None:
+        """
+        Forget the pages of the previous build that are not part of this build 
+        and remove them from the build directory.
+
+        @param urls: The pages of this build, whether they are written again or up to date.
+        @param subjects: The full names of the objects whose pages, and the pages of their members, 
+            are the only ones built, or C{None} if all pages are built. The other pages are kept, 
+            those whose dependencies changed are recorded as stale.
+        """
+        for url in self.previous_pages - urls:
+            if subjects is None or _page_in_subjects(url, subjects):
+                self.pages.pop(url, None)
+                self.stale_pages.discard(url)
+                try:
+                    build_directory.joinpath(url).unlink()
+                except FileNotFoundError:
+                    pass
+            elif not self._up_to_date(url):
+                self.pages.pop(url, None)
+                self.stale_pages.add(url)
+
+def _page_in_subjects(url: str, subjects: Collection[str]) -> bool:
+    """
+    Whether the page at C{url} is the page of one of the C{subjects} or of one of their members.
+    """
+    name = unquote(url[:-len('.html')])
+    return any(name == s or name.startswith(s + '.') for s in subjects)
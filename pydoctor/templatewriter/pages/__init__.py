@@ -3,16 +3,19 @@ from __future__ import annotations
 
 from typing import (
     TYPE_CHECKING, Dict, Iterator, List, Optional, Mapping, Sequence,
-    Type, Union
+    Tuple, Type, Union
 )
 import ast
 import abc
+import uuid
+from weakref import WeakKeyDictionary
+from xml.sax.saxutils import escape
 
-from twisted.web.iweb import IRenderable, ITemplateLoader, IRequest
-from twisted.web.template import Element, Tag, renderer, tags
+from twisted.web.iweb import ITemplateLoader, IRequest
+from twisted.web.template import Element, Tag, renderer, slot, tags
 from pydoctor.extensions import zopeinterface
 
-from pydoctor.stanutils import html2stan
+from pydoctor.stanutils import flatten, html2stan, prerendered, render_once
 from pydoctor import epydoc2stan, model, linker, __version__
 from pydoctor.astbuilder import node2fullname
 from pydoctor.templatewriter import util, TemplateLookup, TemplateElement
@@ -154,6 +157,49 @@ class Head(TemplateElement):
     def title(self, request: IRequest, tag: Tag) -> str:
         return self._title
 
+_TITLE = f'pydoctor-title-{uuid.uuid4().hex}'
+"""
+Placeholder for the title of the L{Head} fragments that are rendered once.
+"""
+
+class _Fragment:
+    """
+    The HTML of a page fragment rendered once, split around the title.
+    """
+    def __init__(self, html: bytes, slot_frames: int) -> None:
+        self.parts = html.split(_TITLE.encode())
+        self.slot_frames = slot_frames
+
+_fragments: 'WeakKeyDictionary[ITemplateLoader, Dict[Tuple[Tuple[str, str], ...], Optional[_Fragment]]]' = WeakKeyDictionary()
+"""
+The fragments rendered once, by template loader and common slots values. 
+C{None} if the fragment cannot be rendered once.
+"""
+
+def _slot_names(stan: "Flattenable") -> Iterator[str]:
+    if isinstance(stan, slot):
+        yield stan.name
+    elif isinstance(stan, Tag):
+        for child in (*stan.attributes.values(), *stan.children):
+            yield from _slot_names(child)
+    elif isinstance(stan, (list, tuple)):
+        for child in stan:
+            yield from _slot_names(child)
+
+def _render_fragment(element: Element, slots: Mapping[str, "Flattenable"]) -> Optional[_Fragment]:
+    assert element.loader is not None
+    if not set(_slot_names(element.loader.load())).issubset(slots):
+        # The fragment might use the other slots of the page.
+        return None
+    if isinstance(element, Head):
+        element = Head(_TITLE, element.loader)
+    try:
+        rendered = render_once(element, slots)
+    except Exception:
+        # The error is reported when the page is rendered.
+        return None
+    return _Fragment(*rendered) if rendered else None
+
 
 class Page(TemplateElement):
     """
@@ -177,6 +223,18 @@ class Page(TemplateElement):
 
     @property
     def slot_map(self) -> Dict[str, "Flattenable"]:
+        return dict(self.common_slot_map)
+
+    @property
+    def common_slot_map(self) -> Mapping[str, "Flattenable"]:
+        """
+        The slots that are filled the same way in all pages.
+        """
+        try:
+            return self._common_slot_map
+        except AttributeError:
+            pass
+
         system = self.system
 
         if system.options.projecturl:
@@ -185,35 +243,67 @@ class Page(TemplateElement):
             project_tag = tags.transparent
         project_tag(system.projectname)
 
-        return dict(
+        self._common_slot_map: Mapping[str, "Flattenable"] = dict(
             project=project_tag,
             pydoctor_version=__version__,
             buildtime=system.buildtime.strftime("%Y-%m-%d %H:%M:%S"),
         )
+        return self._common_slot_map
+
+    def fragment(self, element: Element) -> "Flattenable":
+        """
+        Render a fragment of the page that only depends on the L{common_slot_map}, 
+        and on the title if it's the L{Head}. 
+
+        The fragment is rendered once for each template, its HTML is then 
+        written as is in the other pages, with the title replaced.
+        """
+        assert element.loader is not None
+        slots = self.common_slot_map
+        try:
+            key = self._fragment_key
+        except AttributeError:
+            key = tuple((name, flatten(value)) for name, value in slots.items())
+            self._fragment_key: Tuple[Tuple[str, str], ...] = key
+        cached = _fragments.setdefault(element.loader, {})
+        try:
+            fragment = cached[key]
+        except KeyError:
+            fragment = cached[key] = _render_fragment(element, slots)
+        if fragment is None:
+            return element
+        if isinstance(element, Head):
+            if '"' in element._title:
+                # The title would not be escaped the same way inside attributes.
+                return element
+            html = escape(element._title).encode().join(fragment.parts)
+        else:
+            html = b''.join(fragment.parts)
+        return prerendered(element, html, fragment.slot_frames)
 
     @abc.abstractmethod
     def title(self) -> str:
         raise NotImplementedError()
 
     @renderer
-    def head(self, request: IRequest, tag: Tag) -> IRenderable:
-        return Head(self.title(), Head.lookup_loader(self.template_lookup))
+    def head(self, request: IRequest, tag: Tag) -> "Flattenable":
+        return self.fragment(Head(self.title(), Head.lookup_loader(self.template_lookup)))
 
     @renderer
-    def nav(self, request: IRequest, tag: Tag) -> IRenderable:
-        return Nav(Nav.lookup_loader(self.template_lookup))
+    def nav(self, request: IRequest, tag: Tag) -> "Flattenable":
+        return self.fragment(Nav(Nav.lookup_loader(self.template_lookup)))
 
     @renderer
-    def header(self, request: IRequest, tag: Tag) -> IRenderable:
-        return Element(self.template_lookup.get_loader('header.html'))
+    def header(self, request: IRequest, tag: Tag) -> "Flattenable":
+        return self.fragment(Element(self.template_lookup.get_loader('header.html')))
 
     @renderer
-    def subheader(self, request: IRequest, tag: Tag) -> IRenderable:
-        return Element(self.template_lookup.get_loader('subheader.html'))
+    def subheader(self, request: IRequest, tag: Tag) -> "Flattenable":
+        return self.fragment(Element(self.template_lookup.get_loader('subheader.html')))
 
     @renderer
-    def footer(self, request: IRequest, tag: Tag) -> IRenderable:
-        return Element(self.template_lookup.get_loader('footer.html'))
+    def footer(self, request: IRequest, tag: Tag) -> "Flattenable":
+        return self.fragment(Element(self.template_lookup.get_loader('footer.html')))
 
 
 class CommonPage(Page):
@@ -516,15 +606,14 @@ class ClassPage(CommonPage):
 
 def get_override_info(cls:model.Class, member_name:str, page_url:Optional[str]=None) -> Iterator["Flattenable"]:
     page_url = page_url or cls.page_object.url
-    for b in cls.mro(include_self=False):
-        if member_name not in b.contents:
+    for overridden in cls._member_table().get(member_name, ()):
+        if overridden.parent is cls:
             continue
-        overridden = b.contents[member_name]
         yield tags.div(class_="interfaceinfo")(
             'overrides ', tags.code(epydoc2stan.taglink(overridden, page_url)))
         break
     
-    ocs = sorted(util.overriding_subclasses(cls, member_name), key=util.alphabetical_order_func)
+    ocs = sorted(cls.system._overridingSubclasses(cls, member_name), key=util.alphabetical_order_func)
     if ocs:
         l = assembleList(cls.system, 'overridden in ',
                             [o.fullName() for o in ocs], page_url)
@@ -3,12 +3,16 @@ Classes for the sidebar generation.
 """
 from __future__ import annotations
 
-from typing import Any, Iterator, List, Optional, Sequence, Tuple, Type, Union
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Type, Union
+from urllib.parse import quote
+
 from twisted.web.iweb import IRequest, ITemplateLoader
 from twisted.web.template import TagLoader, renderer, Tag, Element, tags
 
 from pydoctor import epydoc2stan
-from pydoctor.model import Attribute, Class, Function, Documentable, Module
+from pydoctor.model import Attribute, Class, Function, Documentable, Module, System
 from pydoctor.templatewriter import util, TemplateLookup, TemplateElement
 
 from pydoctor.napoleon.iterators import peek_iter
@@ -98,8 +102,15 @@ class SideBarSection(Element):
                     if self.ob in [self.documented_ob.parent, self.documented_ob.module.parent] else "")
 
     @renderer
-    def content(self, request: IRequest, tag: Tag) -> 'ObjContent':
+    def content(self, request: IRequest, tag: Tag) -> Union[Tag, 'ObjContent']:
         
+        if self.ob.system.options.sidebarjs and not self._represents_documented_ob:
+            # The listing of the parent module is the same for all its members,
+            # it's rendered in the browser from the script written by write_sidebar_data().
+            return tag.clear()(tags.script(src='sidebar.js'), tags.script(src=sidebar_data_url(self.ob)), 
+                **{'data-this-object': self.documented_ob.fullName(), 
+                   'data-page-url': self.documented_ob.page_object.url})
+
         return ObjContent(ob=self.ob,
                     loader=TagLoader(tag), 
                     documented_ob=self.documented_ob,
@@ -417,3 +428,74 @@ class ExpandableItem(LinkOnlyItem):
     @renderer
     def labelForExpandableItemId(self, request: IRequest, tag: Tag) -> str:
         return f"expandableItemId{self._id}" if not self._do_not_expand else ""
+
+def sidebar_data_url(ob: Documentable) -> str:
+    """
+    The URL of the script listing the contents of C{ob} in the sidebar, with option C{--sidebar-js}.
+    """
+    return f'sidebar/{quote(ob.fullName())}.js'
+
+def _name_parts(name: str) -> List[str]:
+    # The parts of the name separated by the break points of epydoc2stan.insert_break_points().
+    parts: List[str] = []
+    for i, t in enumerate(name.split('.')):
+        _parts = epydoc2stan._split_indentifier_parts_on_case(t)
+        if i:
+            _parts[0] = '.' + _parts[0]
+        parts += _parts
+    return parts
+
+def _content_data(ob: Documentable, depth: int, level: int = 1) -> List[Tuple[str, List[Dict[str, Any]]]]:
+    """
+    Mirror of L{ObjContent}: the titles and the items of the lists of children of C{ob}, 
+    the items of the expandable lists have their own C{contents}.
+    """
+    order = ob.system.membersOrder(ob)
+    children = sorted((o for o in ob.contents.values() if o.isVisible), key=order)
+    lists: List[Tuple[str, List[Documentable], Type[Documentable]]] = [
+        ('Modules', children, Module), ('Classes', children, Class)]
+    if isinstance(ob, Class):
+        inherited = sorted((o for o in util.inherited_members(ob) if o.isVisible), key=order)
+        lists += [('Methods', children, Function), ('Inherited Methods', inherited, Function), 
+                  ('Attributes', children, Attribute), ('Inherited Attributes', inherited, Attribute)]
+    else:
+        lists += [('Functions', children, Function), ('Variables', children, Attribute)]
+    
+    data = []
+    for title, things, type_ in lists:
+        expand = level < depth and issubclass(type_, (Class, Module))
+        items = []
+        for child in things:
+            if not isinstance(child, type_):
+                continue
+            item: Dict[str, Any] = {'name': _name_parts(child.name), 
+                                    'fullName': child.fullName(), 'url': child.url}
+            if child.isPrivate:
+                item['private'] = True
+            if expand:
+                item['contents'] = _content_data(child, depth, level + 1)
+            items.append(item)
+        if items:
+            data.append((title, items))
+    return data
+
+def sidebar_data(ob: Module) -> str:
+    """
+    Get the script listing the contents of the module C{ob} in the sidebar of the pages of its members,
+    with option C{--sidebar-js}. The listing is rendered by C{sidebar.js}.
+    """
+    data = json.dumps(_content_data(ob, ob.system.options.sidebarexpanddepth), separators=(',', ':'))
+    return f'insertSideBarData({data});\n'
+
+def write_sidebar_data(output_dir: Path, system: System) -> None:
+    """
+    Write the script listing the contents of each module, in the C{sidebar} directory.
+
+    @arg output_dir: Output directory.
+    @arg system: System.
+    """
+    output_dir.joinpath('sidebar').mkdir(exist_ok=True)
+    for ob in system.objectsOfType(Module):
+        if ob.isVisible:
+            with output_dir.joinpath(sidebar_data_url(ob)).open('w', encoding='utf-8') as fobj:
+                fobj.write(sidebar_data(ob))
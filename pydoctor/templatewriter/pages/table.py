@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import threading
 from typing import TYPE_CHECKING, Collection
 
 from twisted.web.iweb import ITemplateLoader
@@ -57,9 +58,15 @@ class TableRow(Element):
         return tag.clear()(self.docgetter.get(self.child, summary=True))
 
 
+class _TableIds(threading.local):
+    last_id = 0
+
 class ChildTable(TemplateElement):
 
-    last_id = 0
+    _ids = _TableIds()
+    """
+    The number of the last table created, counted separately by each thread.
+    """
 
     filename = 'table.html'
 
@@ -71,11 +78,18 @@ class ChildTable(TemplateElement):
             ):
         super().__init__(loader)
         self.children = children
-        ChildTable.last_id += 1
-        self._id = ChildTable.last_id
+        ChildTable._ids.last_id += 1
+        self._id = ChildTable._ids.last_id
         self.ob = ob
         self.docgetter = docgetter
 
+    @staticmethod
+    def reset_ids() -> None:
+        """
+        Number the next tables created by this thread from the start.
+        """
+        ChildTable._ids.last_id = 0
+
     @renderer
     def id(self, request: object, tag: Tag) -> str:
         return f'id{self._id}'
@@ -0,0 +1,150 @@
+"""
+Preview server, that renders the pages on demand instead of writing the whole documentation.
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from io import BytesIO
+from pathlib import Path
+import mimetypes
+import tempfile
+from typing import Callable, Dict, Optional, Type
+from urllib.parse import unquote, urlsplit
+
+from pydoctor import model
+from pydoctor.templatewriter import StaticTemplate, TemplateLookup, search, summary
+from pydoctor.templatewriter.pages import Page
+from pydoctor.templatewriter.pages.sidebar import sidebar_data, sidebar_data_url
+from pydoctor.templatewriter.writer import TemplateWriter, flattenToFile
+
+CACHE_SIZE = 256
+"""
+Maximum number of rendered pages kept in memory by the preview server.
+"""
+
+class PageCache:
+    """
+    Bounded cache of rendered pages, the least recently used pages are discarded first.
+    """
+
+    def __init__(self, maxsize: int = CACHE_SIZE) -> None:
+        self.maxsize = maxsize
+        self._pages: OrderedDict[str, bytes] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+    def get(self, path: str, render: Callable[[], Optional[bytes]]) -> Optional[bytes]:
+        """
+        Get the cached page at C{path}, or render it and keep it in the cache.
+
+        @param render: Called when the page is not in the cache, returns C{None} if there is no such page.
+        """
+        try:
+            cached = self._pages[path]
+        except KeyError:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._pages.move_to_end(path)
+            return cached
+        data = render()
+        if data is not None:
+            self._pages[path] = data
+            if len(self._pages) > self.maxsize:
+                self._pages.popitem(last=False)
+        return data
+
+class PageRenderer:
+    """
+    Render the pages of the documentation on demand, by path relative to the documentation root.
+    """
+
+    def __init__(self, system: model.System, template_lookup: TemplateLookup, cache_size: int = CACHE_SIZE) -> None:
+        self.system = system
+        self.template_lookup = template_lookup
+        self.cache = PageCache(cache_size)
+
+        self._tmpdir = tempfile.TemporaryDirectory(prefix='pydoctor-serve-')
+        self._writer = TemplateWriter(Path(self._tmpdir.name), template_lookup)
+
+        self._static: Dict[str, bytes] = {t.name: t.data for t in template_lookup.templates
+                                          if isinstance(t, StaticTemplate)}
+        self._summary_pages: Dict[str, Type[Page]] = {p.filename: p for p in
+                                    (*summary.summaryPages(system), *search.searchpages)}
+        self._objects: Dict[str, model.Documentable] = {}
+        for ob in system.allobjects.values():
+            if ob.isVisible and ob.documentation_location is model.DocLocation.OWN_PAGE:
+                self._objects[ob.url] = ob
+        self._sidebar_data: Dict[str, model.Module] = {}
+        if system.options.sidebarjs:
+            self._sidebar_data = {sidebar_data_url(ob): ob for ob in system.objectsOfType(model.Module)
+                                  if ob.isVisible}
+        if len(system.root_names) == 1 and 'index.html' in self._objects:
+            # Mirror the symlink created by TemplateWriter.writeSummaryPages().
+            # There is no such page when the root module is hidden.
+            self._objects[f'{list(system.root_names)[0]}.html'] = self._objects['index.html']
+
+    def close(self) -> None:
+        self._tmpdir.cleanup()
+
+    def render(self, path: str) -> Optional[bytes]:
+        """
+        Get the contents of the file at C{path}, C{None} if there is no such file.
+        """
+        if path in self._static:
+            return self._static[path]
+        return self.cache.get(path, lambda: self._render(path))
+
+    def _render(self, path: str) -> Optional[bytes]:
+        fobj = BytesIO()
+        if path in self._objects:
+            return self._writer.renderPage(self._objects[path])
+        elif path in self._summary_pages:
+            pclass = self._summary_pages[path]
+            flattenToFile(fobj, pclass(system=self.system, template_lookup=self.template_lookup))
+        elif path in ('searchindex.json', 'fullsearchindex.json'):
+            output = Path(self._tmpdir.name)
+            if not output.joinpath(path).is_file():
+                search.write_lunr_index(output, system=self.system)
+            return output.joinpath(path).read_bytes()
+        elif path in self._sidebar_data:
+            return sidebar_data(self._sidebar_data[path]).encode('utf-8')
+        else:
+            return None
+        return fobj.getvalue()
+
+class _RequestHandler(BaseHTTPRequestHandler):
+
+    renderer: PageRenderer
+
+    def do_GET(self) -> None:
+        path = unquote(urlsplit(self.path).path).lstrip('/') or 'index.html'
+        try:
+            data = self.renderer.render(path)
+        except Exception as e:
+            self.send_error(500, f'Failed to render {path}: {e}')
+            raise
+        if data is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', mimetypes.guess_type(path)[0] or 'application/octet-stream')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: object) -> None:
+        self.renderer.system.msg('serve', format % args, thresh=1)
+
+def make_server(renderer: PageRenderer, port: int, host: str = 'localhost') -> HTTPServer:
+    """
+    Create a HTTP server serving the pages of the renderer.
+
+    The requests are handled one at a time, since rendering is not thread-safe.
+    """
+    handler = type('RequestHandler', (_RequestHandler,), {'renderer': renderer})
+    return HTTPServer((host, port), handler)
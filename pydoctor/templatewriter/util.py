@@ -3,7 +3,7 @@ from __future__ import annotations
 
 import warnings
 from typing import (Any, Callable, Dict, Generic, Iterable, Iterator, List, Mapping, 
-                    Optional, MutableMapping, Tuple, TypeVar, Union, Sequence, TYPE_CHECKING)
+                    Optional, MutableMapping, Set, Tuple, TypeVar, Union, Sequence, TYPE_CHECKING)
 from pydoctor import epydoc2stan
 import collections.abc
 from pydoctor import model
@@ -137,11 +137,21 @@ def class_members(cls: model.Class) -> List[Tuple[Tuple[model.Class, ...], Seque
 
     @returns: Tuples of tuple: C{inherited_via:Tuple[model.Class, ...], attributes:Sequence[model.Documentable]}.
     """
-    baselists = []
-    for baselist in nested_bases(cls):
-        attrs = unmasked_attrs(baselist)
+    # Same as calling unmasked_attrs() on each of the nested_bases(), but a member is 
+    # not masked only if it's the one resolved in the member table of the class.
+    table = cls._member_table()
+    _mro = cls.mro()
+    seen: Set[model.Class] = set()
+    baselists: List[Tuple[Tuple[model.Class, ...], Sequence[model.Documentable]]] = []
+    for i, base in enumerate(_mro):
+        # The MRO can contain duplicates if it could not be computed.
+        if base in seen:
+            continue
+        seen.add(base)
+        attrs = [o for name, o in base.contents.items() 
+                 if table[name][0] is o and o.isVisible]
         if attrs:
-            baselists.append((baselist, attrs))
+            baselists.append((tuple(reversed(_mro[:(i+1)])), attrs))
     return baselists
 
 def inherited_members(cls: model.Class) -> List[model.Documentable]:
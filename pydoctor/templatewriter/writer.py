@@ -1,34 +1,51 @@
 """Badly named module that contains the driving code for the rendering."""
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
+import gc
 import itertools
+from io import BytesIO
+import os
 from pathlib import Path
-from typing import IO, Iterable, Type, TYPE_CHECKING
+import pickle
+import sys
+import traceback
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Type, TYPE_CHECKING
 
-from pydoctor import model
+from pydoctor import epydoc2stan, model
 from pydoctor.extensions import zopeinterface
 from pydoctor.templatewriter import (
     DOCTYPE, pages, summary, search, TemplateLookup, IWriter, StaticTemplate
 )
+from pydoctor.templatewriter.incremental import PageGraph, global_fingerprint
+from pydoctor.templatewriter.pages.sidebar import write_sidebar_data
+from pydoctor.templatewriter.pages.table import ChildTable
+from pydoctor.stanutils import flatten_to
 
 from twisted.python.failure import Failure
-from twisted.web.template import flattenString
 
 if TYPE_CHECKING:
     from twisted.web.template import Flattenable
 
+_Messages = List[Tuple[str, str, int, int, bool, bool, bool]]
+
+def _gil_enabled() -> bool:
+    # sys._is_gil_enabled() is only defined by Python 3.13 and later.
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    return is_gil_enabled is None or bool(is_gil_enabled())
+
 
 def flattenToFile(fobj: IO[bytes], elem: "Flattenable") -> None:
     """
     This method writes a page to a HTML file.
-    @raises Exception: If the L{twisted.web.template.flatten} call fails.
+    @raises Exception: If the L{flatten_to} call fails.
     """
     fobj.write(DOCTYPE)
     err = None
     def e(r: Failure) -> None:
         nonlocal err
         err = r.value
-    flattenString(None, elem).addCallback(fobj.write).addErrback(e)
+    flatten_to(elem, fobj.write).addErrback(e)
     if err:
         raise err
 
@@ -60,6 +77,21 @@ class TemplateWriter(IWriter):
         self.written_pages: int = 0
         self.total_pages: int = 0
         self.dry_run: bool = False
+
+        self.page_graph: Optional[PageGraph] = None
+        """
+        When building incrementally, the page invalidation graph used to
+        skip the pages that are up to date.
+        """
+        self.threads: bool = not hasattr(os, 'fork') or not _gil_enabled()
+        """
+        Whether the pages are written by threads instead of forked processes, with C{--jobs}.
+        Defaults to C{True} on free-threaded Python builds, and on platforms that can't fork.
+        """
+
+        self._rendered: List[model.Documentable] = []
+        self._pending: List[model.Documentable] = []
+        self._urls: Set[str] = set()
         
 
     def prepOutputDirectory(self) -> None:
@@ -74,13 +106,44 @@ class TemplateWriter(IWriter):
     def writeIndividualFiles(self, obs: Iterable[model.Documentable]) -> None:
         """
         Iterate through C{obs} and call L{_writeDocsFor} method for each L{Documentable}.
+
+        When building incrementally, only the pages that are outdated according
+        to the page graph of the previous build are written.
         """
+        obs = list(obs)
+        if obs and obs[0].system.options.sidebarjs:
+            # All the pages include the listing of their parent module, written once.
+            write_sidebar_data(self.build_directory, obs[0].system)
+        if obs and obs[0].system.options.incremental:
+            system = obs[0].system
+            self.page_graph = PageGraph.load(system, global_fingerprint(system, self.template_lookup))
         self.dry_run = True
+        self._pending = []
+        self._urls = set()
         for ob in obs:
             self._writeDocsFor(ob)
         self.dry_run = False
-        for ob in obs:
-            self._writeDocsFor(ob)
+        jobs = obs[0].system.options.jobs if obs else 1
+        if jobs > 1 and (self.threads or self.page_graph is not None):
+            # The page graph needs the pages rendered in this process.
+            self._writeInThreads(obs[0].system, jobs)
+        elif jobs > 1:
+            self._writeInWorkers(obs[0].system, jobs)
+        else:
+            for ob in obs:
+                self._writeDocsFor(ob)
+        if self.page_graph is not None:
+            # The dependencies are computed once all pages are rendered, because
+            # the docstrings are only rendered once, by the first page that needs them.
+            self.page_graph.update(self._rendered)
+            roots = {o.fullName() for o in self.page_graph.system.rootobjects}
+            subjects = {o.fullName() for o in obs}
+            # When only some subjects are built, the pages of the other objects are kept.
+            self.page_graph.prune(self.build_directory, self._urls, 
+                                  None if roots <= subjects else subjects)
+            self.page_graph.save()
+            self.page_graph.system.msg('incremental', 
+                f'{self.written_pages} outdated pages written')
 
     def writeSummaryPages(self, system: model.System) -> None:
         import time
@@ -113,18 +176,208 @@ class TemplateWriter(IWriter):
     def _writeDocsFor(self, ob: model.Documentable) -> None:
         if not ob.isVisible:
             return
-        if ob.documentation_location is model.DocLocation.OWN_PAGE:
+        if self.dry_run and self.page_graph is not None and (
+                ob.documentation_location is model.DocLocation.OWN_PAGE):
+            self._urls.add(ob.url)
+        if ob.documentation_location is model.DocLocation.OWN_PAGE and (
+                self.page_graph is None or self.page_graph.outdated(ob, self.build_directory)):
             if self.dry_run:
                 self.total_pages += 1
+                self._pending.append(ob)
             else:
                 with self.build_directory.joinpath(ob.url).open('wb') as fobj:
                     self._writeDocsForOne(ob, fobj)
+                if self.page_graph is not None:
+                    self._rendered.append(ob)
         for o in ob.contents.values():
             self._writeDocsFor(o)
 
+    def _takePending(self) -> List[Tuple[int, model.Documentable]]:
+        """
+        Get the numbered pages found by the dry run.
+        """
+        pending = list(enumerate(self._pending))
+        self._pending = []
+        return pending
+
+    @staticmethod
+    def _docstringsOf(ob: model.Documentable) -> Iterator[model.Documentable]:
+        """
+        Get the objects whose docstrings are rendered in the page of C{ob}.
+        """
+        members: Iterable[model.Documentable] = ob.contents.values()
+        if isinstance(ob, model.Class):
+            members = itertools.chain(members, *ob._member_table().values())
+        for o in itertools.chain((ob,), members):
+            if o.isVisible:
+                yield o
+
+    def _parseDocstrings(self, pending: Iterable[Tuple[int, model.Documentable]]) -> None:
+        """
+        Parse the docstrings needed by the pages, once, by the first page that needs them. 
+
+        Parsing them before writing the pages in threads means their parse errors are reported 
+        once and first, and the threads don't wait for one another to parse them.
+        """
+        for _, ob in pending:
+            for o in self._docstringsOf(ob):
+                epydoc2stan.ensure_parsed_docstring(o)
+
+    def _writePage(self, system: model.System, i: int, ob: model.Documentable, 
+                   docstrings: Iterable[model.Documentable] = ()) -> Tuple[int, _Messages]:
+        """
+        Write the page of C{ob} and capture the messages issued by this thread meanwhile.
+
+        @param docstrings: Objects whose docstrings are parsed before writing the page, 
+            their parse errors are reported with the messages of the page.
+        """
+        capture = system._messageCapture
+        messages: _Messages = []
+        capture.messages = messages
+        try:
+            for o in docstrings:
+                epydoc2stan.ensure_parsed_docstring(o)
+            with self.build_directory.joinpath(ob.url).open('wb') as fobj:
+                self._writeDocsForOne(ob, fobj)
+        finally:
+            capture.messages = None
+        return (i, messages)
+
+    def _reportMessages(self, system: model.System, pages_messages: Iterable[Tuple[int, _Messages]]) -> None:
+        """
+        Report the messages captured while writing the pages, in the order of the pages.
+        """
+        for _, messages in sorted(pages_messages, key=lambda m: m[0]):
+            for m in messages:
+                system.msg(*m)
+            self.written_pages += 1
+            system.progress('html', self.written_pages, self.total_pages, 'pages written')
+
+    def _writeInThreads(self, system: model.System, jobs: int) -> None:
+        """
+        Write the pages found by the dry run with a pool of C{jobs} threads.
+
+        The threads capture their messages, which are reported in the order of the pages 
+        once all pages are written, like with L{_writeInWorkers}.
+        """
+        pending = self._takePending()
+        self._parseDocstrings(pending)
+        written = self.written_pages
+        with ThreadPoolExecutor(jobs, thread_name_prefix='pydoctor-html') as executor:
+            pages_messages = list(executor.map(lambda p: self._writePage(system, *p), pending))
+        # The pages are counted as their messages are reported.
+        self.written_pages = written
+        self._reportMessages(system, pages_messages)
+        if self.page_graph is not None:
+            self._rendered.extend(ob for _, ob in pending)
+
+    def _writeInWorkers(self, system: model.System, jobs: int) -> None:
+        """
+        Write the pages found by the dry run in C{jobs} forked processes, 
+        the page number C{i} is written by the worker number C{i % jobs}.
+
+        The workers capture their messages, the main process reports them in the order of the pages 
+        once all pages are written, such that the counts of warnings and parse errors are the same 
+        as when the pages are written by a single process. The docstrings are parsed by the workers: 
+        the parse errors of each docstring are reported by the first page that needs it, like when 
+        the pages are written by a single process.
+        """
+        pending: List[Tuple[int, model.Documentable, List[model.Documentable]]] = []
+        parsed: Set[int] = set()
+        for i, ob in self._takePending():
+            docstrings = [o for o in self._docstringsOf(ob) if id(o) not in parsed]
+            parsed.update(map(id, docstrings))
+            pending.append((i, ob, docstrings))
+        # Keep the objects of the model out of the garbage collector, such that 
+        # the memory pages are shared with the workers instead of being copied.
+        gc.freeze()
+        sys.stdout.flush()
+        try:
+            workers: List[Tuple[int, int]] = []
+            for n in range(jobs):
+                rfd, wfd = os.pipe()
+                pid = os.fork()
+                if pid == 0:
+                    os.close(rfd)
+                    self._renderInWorker(system, pending[n::jobs], wfd)
+                os.close(wfd)
+                workers.append((pid, rfd))
+            results = []
+            errors = []
+            for pid, rfd in workers:
+                with os.fdopen(rfd, 'rb') as fobj:
+                    try:
+                        result = pickle.load(fobj)
+                    except EOFError:
+                        result = ('error', f'worker {pid} exited unexpectedly')
+                os.waitpid(pid, 0)
+                if result[0] == 'error':
+                    errors.append(result[1])
+                else:
+                    results.append(result[1])
+        finally:
+            gc.unfreeze()
+        if errors:
+            raise RuntimeError('Failed to write the HTML pages:\n' + '\n'.join(errors))
+        
+        pages_messages: List[Tuple[int, _Messages]] = []
+        for messages, parse_errors in results:
+            pages_messages.extend(messages)
+            for k, v in parse_errors.items():
+                system.parse_errors[k].update(v)
+        self._reportMessages(system, pages_messages)
+
+    def _renderInWorker(self, system: model.System, 
+                        pending: Sequence[Tuple[int, model.Documentable, Sequence[model.Documentable]]], 
+                        wfd: int) -> None:
+        """
+        Write the given pages and send the captured messages and 
+        the parse errors to the main process, then exit.
+
+        The docstrings that are not parsed by one of the given pages 
+        are parsed first, their messages are reported by another worker.
+        """
+        result: object
+        code = 0
+        try:
+            reported = {id(o) for _, _, docstrings in pending for o in docstrings}
+            system._messageCapture.messages = []
+            for _, ob, _ in pending:
+                for o in self._docstringsOf(ob):
+                    if id(o) not in reported:
+                        epydoc2stan.ensure_parsed_docstring(o)
+            system._messageCapture.messages = None
+            messages = [self._writePage(system, i, ob, docstrings) for i, ob, docstrings in pending]
+            parse_errors: Dict[str, Set[str]] = {k: set(v) for k, v in system.parse_errors.items()}
+            result = ('ok', (messages, parse_errors))
+        except BaseException:
+            result = ('error', traceback.format_exc())
+            code = 1
+        try:
+            with os.fdopen(wfd, 'wb') as fobj:
+                pickle.dump(result, fobj)
+        finally:
+            os._exit(code)
+
+    def renderPage(self, ob: model.Documentable) -> bytes:
+        """
+        Render the page of C{ob}, without writing it to the build directory.
+
+        @param ob: A visible object that has its own page.
+        """
+        fobj = BytesIO()
+        flattenToFile(fobj, self._pageFor(ob))
+        return fobj.getvalue()
+
     def _writeDocsForOne(self, ob: model.Documentable, fobj: IO[bytes]) -> None:
         if not ob.isVisible:
             return
+        page = self._pageFor(ob)
+        self.written_pages += 1
+        ob.system.progress('html', self.written_pages, self.total_pages, 'pages written')
+        flattenToFile(fobj, page)
+
+    def _pageFor(self, ob: model.Documentable) -> pages.CommonPage:
         pclass: Type[pages.CommonPage] = pages.CommonPage
         class_name = ob.__class__.__name__
         
@@ -145,7 +398,7 @@ class TemplateWriter(IWriter):
                 once=True, thresh=-2)
         
         ob.system.msg('html', str(ob), thresh=1)
-        page = pclass(ob=ob, template_lookup=self.template_lookup)
-        self.written_pages += 1
-        ob.system.progress('html', self.written_pages, self.total_pages, 'pages written')
-        flattenToFile(fobj, page)
+        # Number the tables from the start of each page, such that a page does not depend 
+        # on the pages rendered before, which matters for incremental and parallel builds.
+        ChildTable.reset_ids()
+        return pclass(ob=ob, template_lookup=self.template_lookup)
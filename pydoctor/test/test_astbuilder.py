@@ -491,9 +491,11 @@ def test_more_aliasing(systemcls: Type[model.System]) -> None:
     addsrc(system)
     D = system.allobjects['d.D']
     assert isinstance(D, model.Class)
-    # An older version of this test expected a.A as the result.
-    # Read the comment in test_aliasing() to learn why this was changed.
-    assert D.bases == ['c.C']
+    # An older version of this test expected c.C as the result, because
+    # aliases of aliases could not be resolved. Now that the chain of
+    # re-exports is collapsed in post-processing, the base class is found.
+    assert D.bases == ['a.A']
+    assert D.baseobjects == [system.allobjects['a.A']]
 
 @systemcls_param
 def test_aliasing_recursion(systemcls: Type[model.System]) -> None:
@@ -2720,3 +2722,48 @@ def test_typealias_unstring(systemcls: Type[model.System]) -> None:
         # there is not Constant nodes in the type alias anymore
         next(n for n in ast.walk(typealias.value) if isinstance(n, ast.Constant))
 
+
+def test_parse_restores_gc_state() -> None:
+    """
+    The garbage collector is paused while parsing, and left in its previous state afterwards, 
+    even when the source cannot be parsed.
+    """
+    import gc
+    assert gc.isenabled()
+    try:
+        assert isinstance(astbuilder._parse('x = 1'), ast.Module)
+        assert gc.isenabled()
+        with pytest.raises(SyntaxError):
+            astbuilder._parse('x = ')
+        assert gc.isenabled()
+        
+        gc.disable()
+        astbuilder._parse('x = 1')
+        assert not gc.isenabled()
+    finally:
+        gc.enable()
+
+@systemcls_param
+def test_processed_expressions_do_not_keep_module_alive(systemcls: Type[model.System]) -> None:
+    """
+    The expressions kept in the model have no parents outside of the expression,
+    such that the module tree can be freed once processed.
+    """
+    mod = fromText('''
+    class C:
+        @staticmethod
+        def f(x: int = 1 + 2) -> None:
+            ...
+    a = [(1 + 2) * 3, 4]
+    ''', systemcls=systemcls)
+    a = mod.contents['a']
+    assert isinstance(a, model.Attribute)
+    assert a.value is not None
+    assert list(astutils.get_parents(a.value)) == []
+    f = mod.contents['C'].contents['f']
+    assert isinstance(f, model.Function)
+    assert f.decorators is not None
+    assert list(astutils.get_parents(f.decorators[0])) == []
+    # Parents within the expressions are kept.
+    binop, = [n for n in ast.walk(a.value) if isinstance(n, ast.BinOp) and isinstance(n.op, ast.Add)]
+    assert [type(p) for p in astutils.get_parents(binop)] == [ast.BinOp, ast.List]
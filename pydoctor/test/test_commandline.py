@@ -3,6 +3,9 @@ from io import StringIO
 from pathlib import Path
 import re
 import sys
+from typing import Any
+
+import pytest
 
 from pydoctor.options import Options
 from pydoctor import driver
@@ -272,3 +275,120 @@ def test_make_intersphix(tmp_path: Path) -> None:
     assert [p.name for p in tmp_path.iterdir()] == ['objects.inv']
     assert inventory.is_file()
     assert b'Project: acme-lib\n# Version: 20.12.0-dev123\n' in inventory.read_bytes()
+
+def test_main_watch(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: CapSys) -> None:
+    """
+    With --watch, the documentation is built again when a source file changes.
+    """
+    pkg = tmp_path / 'pkg'
+    pkg.mkdir()
+    (pkg / '__init__.py').write_text('')
+    (pkg / 'mod.py').write_text('def f():\n    "Old docstring."\n')
+    out = tmp_path / 'out'
+
+    sleeps = []
+    def sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        if len(sleeps) == 1:
+            # No change.
+            return
+        if len(sleeps) == 2:
+            (pkg / 'mod.py').write_text('def f():\n    "New docstring."\n')
+            return
+        raise KeyboardInterrupt()
+    monkeypatch.setattr(driver.time, 'sleep', sleep)
+    # Do not use the configuration of the current directory.
+    monkeypatch.chdir(tmp_path)
+
+    # The status messages are not warnings, they don't fail the build with -W.
+    exit_code = driver.main(args=['--watch', '-W', '--html-output', str(out), 
+        '--incremental-cache-path', str(tmp_path / 'cache'), str(pkg)])
+    assert exit_code == 0
+    assert len(sleeps) == 3
+    output = capsys.readouterr().out
+    assert output.count('sources changed, building again') == 1
+    assert '1 changed modules, processing 1 of 2 modules' in output
+    assert 'New docstring.' in (out / 'pkg.mod.html').read_text()
+
+def test_main_watch_module_files_only(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: CapSys) -> None:
+    """
+    With --watch, only the changes of the module files start a build. The HTML output and 
+    the cache are not watched, even inside of a source path, and the intersphinx inventories 
+    are fetched once.
+    """
+    pkg = tmp_path / 'pkg'
+    pkg.mkdir()
+    (pkg / '__init__.py').write_text('')
+    (pkg / 'mod.py').write_text('def f():\n    "Old docstring."\n')
+    out = pkg / 'out'
+
+    sleeps = []
+    def sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        if len(sleeps) == 1:
+            (pkg / 'notes.txt').write_text('Not a module.')
+            (pkg / 'mod.pyc').write_bytes(b'')
+        elif len(sleeps) == 2:
+            (pkg / 'mod.py').write_text('def f():\n    "New docstring."\n')
+        elif len(sleeps) == 4:
+            raise KeyboardInterrupt()
+    monkeypatch.setattr(driver.time, 'sleep', sleep)
+
+    caches = []
+    def prepareCache(**kwargs: Any) -> Any:
+        caches.append(kwargs)
+        return prepare_cache(**kwargs)
+    prepare_cache = driver.prepareCache
+    monkeypatch.setattr(driver, 'prepareCache', prepareCache)
+    monkeypatch.chdir(tmp_path)
+
+    exit_code = driver.main(args=['--watch', '-W', '--html-output', str(out), 
+        '--incremental-cache-path', str(pkg / 'cache'), str(pkg)])
+    assert exit_code == 0
+    assert len(sleeps) == 4
+    assert capsys.readouterr().out.count('sources changed, building again') == 1
+    assert 'New docstring.' in (out / 'pkg.mod.html').read_text()
+    assert len(caches) == 1
+
+def test_main_serve(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: CapSys) -> None:
+    """
+    With --serve, the documentation is served until interrupted, the status message is not a warning.
+    """
+    from pydoctor.templatewriter import server
+
+    class FakeServer:
+        server_port = 8000
+        def __enter__(self) -> 'FakeServer':
+            return self
+        def __exit__(self, *args: object) -> None:
+            pass
+        def serve_forever(self) -> None:
+            raise KeyboardInterrupt()
+
+    monkeypatch.setattr(server, 'make_server', lambda renderer, port: FakeServer())
+    monkeypatch.chdir(tmp_path)
+    pkg = tmp_path / 'pkg'
+    pkg.mkdir()
+    (pkg / '__init__.py').write_text('')
+
+    assert driver.main(args=['--serve=0', '-W', str(pkg)]) == 0
+    assert 'serving the documentation at http://localhost:8000/' in capsys.readouterr().out
+
+def test_main_save_load_model(tmp_path: Path) -> None:
+    """
+    The model saved with --save-model can be rendered with another theme with --load-model.
+    """
+    model = tmp_path / 'model.pickle'
+    assert driver.main(args=['--save-model', str(model), '--theme=base',
+        '--html-output', str(tmp_path / 'saved'), 'pydoctor/test/testpackages/basic/']) == 0
+    assert model.is_file()
+    assert driver.main(args=['--load-model', str(model), '--theme=base',
+        '--html-output', str(tmp_path / 'loaded')]) == 0
+
+    saved = sorted(p.name for p in (tmp_path / 'saved').iterdir())
+    assert sorted(p.name for p in (tmp_path / 'loaded').iterdir()) == saved
+    assert 'basic.mod.C.html' in saved
+
+def test_main_load_model_missing(tmp_path: Path) -> None:
+    err = geterrtext('--load-model', str(tmp_path / 'nope.pickle'))
+    assert 'Could not load the model from' in err
@@ -1059,6 +1059,55 @@ def test_EpydocLinker_switch_context_is_reentrant(linkercls:Type[linker._EpydocL
     
     assert capsys.readouterr().out.strip().splitlines() == warnings
     
+def test_EpydocLinker_switch_context_per_thread() -> None:
+    """
+    Each thread switches the context of a linker independently, 
+    and the linker can be pickled whatever its context.
+    """
+    import io
+    import threading
+    from pydoctor.snapshot import _SystemPickler, _SystemUnpickler
+    mod = fromText('''
+    v=0
+    class Klass:
+        ...
+    ''', modname='test')
+    Klass = mod.contents['Klass']
+    _linker = mod.docstring_linker
+    assert isinstance(_linker, linker._EpydocLinker)
+
+    switched = threading.Event()
+    done = threading.Event()
+    seen = []
+    def other_thread() -> None:
+        with _linker.switch_context(Klass):
+            switched.set()
+            done.wait(5)
+            seen.append(_linker.reporting_obj)
+
+    t = threading.Thread(target=other_thread)
+    t.start()
+    assert switched.wait(5)
+    assert _linker.reporting_obj is mod
+    assert 'href="#v"' in flatten(_linker.link_to('v', 'v'))
+
+    # In a function, since mypy would otherwise keep the type of reporting_obj narrowed to Module.
+    def check_switched_to_none() -> None:
+        with _linker.switch_context(None):
+            assert _linker.reporting_obj is None
+            f = io.BytesIO()
+            _SystemPickler(f, mod.system).dump(_linker)
+            f.seek(0)
+            unpickled = _SystemUnpickler(f, mod.system).load()
+            assert isinstance(unpickled, linker._EpydocLinker)
+            assert unpickled.reporting_obj is not None
+            done.set()
+            t.join()
+
+    check_switched_to_none()
+    assert seen == [Klass]
+    assert _linker.reporting_obj is mod
+
 def test_EpydocLinker_look_for_intersphinx_no_link() -> None:
     """
     Return None if inventory had no link for our markup.
@@ -1241,6 +1290,61 @@ def test_EpydocLinker_resolve_identifier_xref_internal_full_name() -> None:
     assert "internal_module.C.html" == url
     assert int_mod.contents['C'] is xref
 
+def test_EpydocLinker_resolve_identifier_xref_all_modules(capsys: CapSys) -> None:
+    """
+    Names that are not found in the context are looked up in all modules of the system, 
+    and ambiguous references are reported.
+    """
+    system = model.System()
+    fromText('''
+    class C:
+        def f(self): ...
+    class D: ...
+    ''', modname='a', system=system)
+    fromText('class D: ...', modname='b', system=system)
+    mod = fromText('', modname='c', system=system)
+    sut = mod.docstring_linker
+    assert isinstance(sut, linker._EpydocLinker)
+
+    assert sut._resolve_identifier_xref('C.f', 0) is system.allobjects['a.C.f']
+    capsys.readouterr()
+    with pytest.raises(LookupError):
+        sut._resolve_identifier_xref('D', 3)
+    assert capsys.readouterr().out == ('c:3: ambiguous ref to D, could be a.D, b.D\n'
+                                       'c:3: Cannot find link target for "D"\n')
+
+    # The modules added later are looked up as well.
+    fromText('class E: ...', modname='d', system=system)
+    assert sut._resolve_identifier_xref('E', 0) is system.allobjects['d.E']
+
+def test_EpydocLinker_resolve_identifier_xref_not_found_cached(capsys: CapSys) -> None:
+    """
+    The lookups of the cross-references that can't be resolved are cached 
+    for the objects that share the same scope, the warnings are still reported for each location.
+    """
+    system = model.System()
+    fromText('class D: ...', modname='a', system=system)
+    fromText('class D: ...', modname='b', system=system)
+    mod = fromText('''
+    class C:
+        def f(self): ...
+        def g(self): ...
+    ''', modname='c', system=system)
+    capsys.readouterr()
+    C = mod.contents['C']
+
+    for ob in [C.contents['f'], C.contents['g'], C.contents['f']]:
+        sut = ob.docstring_linker
+        assert isinstance(sut, linker._EpydocLinker)
+        with pytest.raises(LookupError):
+            sut._resolve_identifier_xref('D', 0)
+        assert sut.dependencies == {'D', ob.fullName(), 'c.C', 'c', '', 'c.C.f', 'c.C.g'}
+    assert list(system._unresolvedXrefCache or ()) == [(C, 'D')]
+
+    assert capsys.readouterr().out == ''.join(
+        f'c:{lineno}: ambiguous ref to D, could be a.D, b.D\n'
+        f'c:{lineno}: Cannot find link target for "D"\n' for lineno in (3, 4, 3))
+
 def test_EpydocLinker_None_context() -> None:
     """
     The linker will create URLs with only the anchor
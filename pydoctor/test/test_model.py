@@ -463,6 +463,39 @@ def test_privacy_switch(privacy:object) -> None:
     assert allobjs['m.tests.test2'].privacyClass == model.PrivacyClass.HIDDEN
     assert allobjs['m.tests.test3'].privacyClass == model.PrivacyClass.HIDDEN
 
+def test_computeVisibility(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    The privacy and visibility of all objects are computed once the system is post-processed,
+    and computed again when the tree of objects changes.
+    """
+    system = model.System()
+    system.options.privacy = [parse_privacy_tuple('hidden:m._Hidden', '--privacy')]
+    mod = fromText('''
+    class _Hidden:
+        def f(self): ...
+    class _Private:
+        def f(self): ...
+    class Public:
+        def f(self): ...
+    ''', modname='m', system=system)
+    assert system.privacy_counts == {model.PrivacyClass.HIDDEN: 1, 
+                                     model.PrivacyClass.PRIVATE: 1, 
+                                     model.PrivacyClass.PUBLIC: 5}
+
+    def privacyClass(ob: model.Documentable) -> model.PrivacyClass:
+        raise AssertionError('the visibility should be computed already')
+    with monkeypatch.context() as m:
+        m.setattr(system, 'privacyClass', privacyClass)
+        hidden_f = mod.contents['_Hidden'].contents['f']
+        assert hidden_f.privacyClass is model.PrivacyClass.PUBLIC
+        assert not hidden_f.isVisible
+        assert mod.contents['_Private'].privacyClass is model.PrivacyClass.PRIVATE
+        assert mod.contents['_Private'].contents['f'].isVisible
+
+    other = fromText('', modname='other', system=system)
+    mod.contents['Public'].reparent(other, '_Public')
+    assert other.contents['_Public'].privacyClass is model.PrivacyClass.PRIVATE
+
 def test_privacy_reparented() -> None:
     """
     Test that the privacy of an object changes if 
@@ -491,6 +524,119 @@ def test_privacy_reparented() -> None:
 
     assert base.privacyClass == model.PrivacyClass.PUBLIC
 
+def test_fullName_reparented() -> None:
+    """
+    The cached full names of an object and its members are updated when the object is reparented.
+    """
+    system = model.System()
+    mod_private = fromText('''
+    class _MyClass:
+        class Inner:
+            def f(self): ...
+    ''', modname='private', system=system)
+    mod_export = fromText('', modname='public', system=system)
+
+    base = mod_private.contents['_MyClass']
+    f = base.contents['Inner'].contents['f']
+    assert f.fullName() == 'private._MyClass.Inner.f'
+
+    base.reparent(mod_export, 'MyClass')
+    assert f.fullName() == 'public.MyClass.Inner.f'
+    assert system.allobjects['public.MyClass.Inner.f'] is f
+    assert 'private._MyClass.Inner.f' not in system.allobjects
+
+def test_fullName_duplicate() -> None:
+    """
+    The cached full names of a duplicate object and its members are updated when it's renamed.
+    """
+    mod = fromText('''
+    class C:
+        def f(self): ...
+    class C:
+        def g(self): ...
+    ''')
+    system = mod.system
+    new = mod.contents['C']
+    old = system.allobjects['<test>.C 0']
+    assert old is not new
+    assert old.fullName() == '<test>.C 0'
+    assert [o.fullName() for o in old.contents.values()] == ['<test>.C 0.f']
+    assert system.allobjects['<test>.C 0.f'] is old.contents['f']
+
+def test_expandName_import_alias_chain() -> None:
+    """
+    Names imported from a module that itself imports them are resolved to the final target.
+    """
+    system = model.System()
+    fromText('''
+    class X:
+        class Y: ...
+    ''', modname='b', system=system)
+    fromText('from b import X', modname='a', system=system)
+    mod = fromText('''
+    from a import X
+    import a as alias
+    from a import Z
+    class C:
+        def f(self): ...
+    ''', modname='c', system=system)
+
+    X = system.allobjects['b.X']
+    assert mod.expandName('X') == 'b.X'
+    assert mod.resolveName('X') is X
+    assert mod.resolveName('X.Y') is X.contents['Y']
+    assert mod.resolveName('alias.X') is X
+    assert mod.contents['C'].contents['f'].resolveName('X') is X
+    # Unresolvable names are left alone.
+    assert mod.expandName('Z') == 'a.Z'
+
+def test_expandName_import_alias_cycle() -> None:
+    """
+    Cyclic re-exports don't prevent post-processing.
+    """
+    system = model.System()
+    fromText('from b import X', modname='a', system=system)
+    mod = fromText('from a import X', modname='b', system=system)
+    assert mod.resolveName('X') is None
+
+def test_expandName_cache() -> None:
+    """
+    The results of expandName() are cached once the system is post-processed, 
+    and forgotten when new objects are added.
+    """
+    system = model.System()
+    mod = fromText('''
+    class C:
+        def f(self): ...
+        a = 1
+    ''', modname='m', system=system)
+    cls = mod.contents['C']
+    assert cls.contents['f'].expandName('a') == 'm.C.a'
+    assert system._expandNameCache == {(cls, 'a'): 'm.C.a'}
+    assert cls.contents['a'].expandName('a') == 'm.C.a'
+    assert len(system._expandNameCache) == 1
+
+    assert mod.expandName('D') == 'D'
+    other = fromText('', modname='D', system=system)
+    assert mod.resolveName('D') is other
+
+@pytest.mark.parametrize('modname', ['reparenting_follows_aliases', 'reparented_module', 'allgames'])
+def test_objectsOfType(modname: str) -> None:
+    """
+    The objects of a given type are listed in the same order as the allobjects dict,
+    even after moving objects around.
+    """
+    system = processPackage(modname)
+    fromText('''
+    class C:
+        def f(self): ...
+    class C:
+        def f(self): ...
+    ''', modname='dup', system=system)
+    for cls in (model.Documentable, model.Module, model.Package, model.Class, 
+                model.Function, model.Attribute, model.Inheritable):
+        assert list(system.objectsOfType(cls)) == [o for o in system.allobjects.values() if isinstance(o, cls)]
+
 def test_name_defined() -> None:
     src = '''
     # module 'm'
@@ -1,7 +1,7 @@
-from typing import List, Optional, Type
+from typing import Dict, List, Optional, Type
 import pytest
 
-from pydoctor import model, stanutils
+from pydoctor import model, mro, stanutils
 from pydoctor.templatewriter import pages, util
 from pydoctor.test.test_astbuilder import fromText, systemcls_param
 from pydoctor.test import CapSys
@@ -243,3 +243,117 @@ def test_inherited_members() -> None:
     assert len(util.inherited_members(dimond.contents['C']))==3 # type:ignore
     assert len(util.inherited_members(dimond.contents['A']))==0 # type:ignore
     assert len(util.inherited_members(dimond.contents['_MyBase']))==0 # type:ignore
+
+def _deep_diamonds(depth: int, width: int) -> List[type]:
+    """
+    Create layers of classes, each class inherits from all classes of the layer above.
+    """
+    layers: List[List[type]] = [[object]]
+    for d in range(depth):
+        layers.append([type(f'C{d}_{w}', tuple(layers[-1]), {}) 
+                       for w in range(width)])
+    return [c for layer in layers[1:] for c in layer]
+
+def test_mro_deep_diamonds() -> None:
+    """
+    The C3 linearization gives the same result as Python, with or without a shared cache.
+    """
+    classes = _deep_diamonds(8, 4)
+    cache: Dict[type, List[type]] = {}
+    for klass in reversed(classes):
+        expected = list(klass.__mro__)
+        assert mro.mro(klass, lambda c: list(c.__bases__)) == expected
+        assert mro.mro(klass, lambda c: list(c.__bases__), cache) == expected
+    assert len(cache) == len(classes) + 1
+
+def test_member_table() -> None:
+    """
+    The member table of a class lists the definitions of each name in method resolution order, 
+    it's computed once the system is post-processed and recomputed when the tree of objects changes.
+    """
+    dimond = fromText("""\
+    class _MyBase:
+        def z():...
+        def _h():...
+    class A(_MyBase):
+        def a():...
+        def z():...
+    class B(_MyBase):
+        def b():...
+        def z():...
+    class C(A,B): 
+        def _h():...
+    """, modname='diamond')
+    base, A, B, C = (dimond.contents[n] for n in ('_MyBase', 'A', 'B', 'C'))
+    assert isinstance(C, model.Class)
+
+    table = C._member_table()
+    assert C._member_table(cached_only=True) is table
+    assert {name: [o.fullName() for o in defs] for name, defs in table.items()} == {
+        '_h': ['diamond.C._h', 'diamond._MyBase._h'],
+        'a': ['diamond.A.a'],
+        'b': ['diamond.B.b'],
+        'z': ['diamond.A.z', 'diamond.B.z', 'diamond._MyBase.z'],
+    }
+    assert C.find('z') is A.contents['z']
+    assert C.find('nope') is None
+    assert list(C.contents['_h'].docsources()) == [C.contents['_h'], base.contents['_h']]
+    assert [(tuple(o.name for o in via), [o.name for o in attrs]) 
+            for via, attrs in util.class_members(C)] == [
+        (('C',), ['_h']), (('A', 'C'), ['a', 'z']), (('B', 'A', 'C'), ['b']), ]
+
+    # The table is recomputed when the tree changes.
+    c = model.Function(C.system, 'z', C)
+    C.system.addObject(c)
+    assert C._member_table() is not table
+    assert C.find('z') is c
+    assert list(c.docsources()) == [c, A.contents['z'], B.contents['z'], base.contents['z']]
+    assert C._member_table(cached_only=True) is C._member_table()
+
+def test_overriding_subclasses_index() -> None:
+    """
+    The index of the overriding subclasses agrees with the recursive overriding_subclasses() helper, 
+    without duplicates, and skips the hidden subclasses.
+    """
+    mod = fromText("""\
+    class Base:
+        def a():...
+        def b():...
+        def c():...
+    class A(Base):
+        def a():...
+    class B(Base):
+        def new():...
+    class C(A, B):
+        def a():...
+        def b():...
+    class D(C):
+        def c():...
+        def new():...
+    class _Hidden(Base):
+        def a():...
+    class E(_Hidden):
+        def a():...
+    """, modname='mod')
+    mod.system.options.privacy = [(model.PrivacyClass.HIDDEN, 'mod._Hidden')]
+    mod.system._privacyClassCache.clear()
+    mod.system._resetNameCaches(enable=True)
+    mod.system.computeVisibility()
+
+    classes = list(mod.system.objectsOfType(model.Class))
+    for klass in classes:
+        for name in klass._member_table():
+            expected = list(dict.fromkeys(util.overriding_subclasses(klass, name)))
+            assert sorted(mod.system._overridingSubclasses(klass, name), key=model.Class.fullName) == \
+                sorted(expected, key=model.Class.fullName), (klass, name)
+
+    base = mod.contents['Base']
+    assert isinstance(base, model.Class)
+    b = mod.contents['B']
+    assert isinstance(b, model.Class)
+    # C overrides Base.a through B.
+    assert sorted(o.name for o in mod.system._overridingSubclasses(base, 'a')) == ['A', 'C']
+    assert [o.name for o in mod.system._overridingSubclasses(base, 'b')] == ['C']
+    assert [o.name for o in mod.system._overridingSubclasses(base, 'c')] == ['D']
+    assert [o.name for o in mod.system._overridingSubclasses(b, 'new')] == ['D']
+    assert mod.system._overridingSubclasses(base, 'new') == ()
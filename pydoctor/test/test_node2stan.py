@@ -9,8 +9,14 @@ from pydoctor.test import CapSys
 from pydoctor.test.epydoc.test_epytext2html import epytext2node
 from pydoctor.test.epydoc.test_restructuredtext import rst2node, parse_rst
 
-from pydoctor.node2stan import gettext
+from pydoctor import node2stan as node2stan_module
+from pydoctor.node2stan import gettext, node2html, node2stan
+from pydoctor.stanutils import flatten, html2stan
+from pydoctor.test import NotFoundLinker
 from docutils import nodes
+from xml.sax import SAXParseException
+import pytest
+from textwrap import dedent
 
 def test_gettext() -> None:
     doc = '''
@@ -154,3 +160,95 @@ bla blab balba.
     parsed_doc.fields[0].body().to_node().walk(TitleReferenceDump(doc))
     assert capsys.readouterr().out == r'''||title_reference line: None, get_lineno: 28, rawsource: `link <notfound>`
 '''
+
+def _check_same_as_html2stan(node: nodes.document) -> None:
+    html = ''.join(node2html(node.deepcopy(), NotFoundLinker()))
+    assert flatten(node2stan(node, NotFoundLinker())) == flatten(html2stan(html))
+
+def test_node2stan_same_as_html2stan(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    L{node2stan} builds the same stan tree as the one parsed from the L{node2html} output, 
+    without parsing HTML.
+    """
+    def html2stan_not_called(html: str) -> None:
+        assert False, html
+    monkeypatch.setattr(node2stan_module, 'html2stan', html2stan_not_called)
+
+    _check_same_as_html2stan(rst2node(dedent('''
+        Fizz
+        ====
+
+        Lorem *ipsum* **dolor** ``sit`` ``--amet`` ``foo().bar`` `notfound`
+        and `a link <notfound>` to https://example.org/?a=1&b=<2>.
+
+        - One "item".
+        - Two
+          items, with `notfound`.
+
+        1. First
+
+           Nested paragraph.
+
+        Term
+           Definition @ 'here'.
+
+        .. note:: Some note
+
+           >>> print(1 < 2)
+           True
+
+        Buzz
+        ----
+
+        .. code-block:: python
+
+            x = 0
+
+        | Line block
+        | with ``literal``
+        ''')))
+
+    _check_same_as_html2stan(epytext2node('''
+        I{B{Inline markup} may be nested} and C{my_dict={1:2, 3:4}} with
+        L{notfound} and U{The epydoc homepage<http://epydoc.sourceforge.net>}.
+
+          - I{Italicized text}
+          - B{Bold-faced text}
+
+        Section
+        =======
+          Some code::
+
+            x = 1 < 2
+        '''))
+
+def test_node2stan_fallback_html2stan() -> None:
+    """
+    The HTML that is not emitted as tags by the translator is parsed with L{html2stan}, 
+    including when it fails.
+    """
+    _check_same_as_html2stan(rst2node(dedent('''
+        See target_.
+
+        .. _target:
+
+        Buzz
+        ----
+
+        ===== =====
+        A     B
+        ===== =====
+        1     2
+        ===== =====
+        ''')))
+    _check_same_as_html2stan(epytext2node('Math: M{m*x+b}'))
+
+    node = rst2node('Multiple ``spaces  in`` literal.')
+    with pytest.raises(SAXParseException):
+        node2stan(node, NotFoundLinker())
+
+    node = rst2node('Control character.')
+    paragraph = node[0]
+    assert isinstance(paragraph, nodes.paragraph)
+    paragraph[0] = nodes.Text('Control \x0b character.')
+    assert flatten(node2stan(node, NotFoundLinker())) == 'Control \\x0b character.'
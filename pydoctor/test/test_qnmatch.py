@@ -1,6 +1,8 @@
 import unittest
 
-from pydoctor.qnmatch import qnmatch, translate
+from typing import List, Optional, Tuple
+
+from pydoctor.qnmatch import compile_rules, qnmatch, translate
 
 def test_qnmatch() -> None:
 
@@ -53,6 +55,38 @@ def test_qnmatch() -> None:
     assert(not qnmatch('site.yml_.Class.property', '**._*.**'))
     assert(not qnmatch('site.yml.Class._property', '**._*.**'))
 
+def test_compile_rules() -> None:
+    """
+    The compiled rules give the same results as matching the rules one by one, 
+    the exact matches first, in reverse order.
+    """
+    rules = [(1, '**'), (2, 'pkg.**'), (3, 'pkg.mod.*'), (4, 'pkg.mod'), 
+             (5, '**._*'), (6, 'pkg.mod.**'), (7, 'pkg.[!m]*'), (8, 'pkg.mod'), (9, '**._*'), 
+             (10, 'pkg.*'), (11, 'pkg.mod.C.**'), (12, 'pkg.mod.C'), (13, 'p?g.*.C.*')]
+
+    def naive(rules: List[Tuple[int, str]], name: str) -> Optional[int]:
+        for value, pattern in reversed(rules):
+            if name == pattern:
+                return value
+        for value, pattern in reversed(rules):
+            if qnmatch(name, pattern):
+                return value
+        return None
+    
+    for i in range(len(rules) + 1):
+        matcher = compile_rules(rules[:i])
+        for name in ['pkg', 'pkg.mod', 'pkg.mod.C', 'pkg.mod.C.f', 'pkg.mod.C.f.g', 'pkg._mod', 'pkg.other', 
+                     'pkg.other._f', 'other', 'other.pkg.mod', 'pkg.mod.**', '**']:
+            assert matcher(name) == naive(rules[:i], name), (name, rules[:i])
+
+    assert matcher('pkg.mod') == 8
+    assert matcher('pkg.mod.C.f') == 13
+    assert matcher('pkg.mod.C.f.g') == 11
+    assert matcher('pkg.mod._f') == 9
+    assert compile_rules([])('pkg') is None
+    assert compile_rules([(1, 'pkg.*')])('pkg') is None
+
+
 class TranslateTestCase(unittest.TestCase):
     def test_translate(self) -> None:
         self.assertEqual(translate('*'), r'(?s:[^\.]*?)\Z')
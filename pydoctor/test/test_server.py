@@ -0,0 +1,104 @@
+from pathlib import Path
+import threading
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pytest
+
+from pydoctor import model
+from pydoctor.options import Options
+from pydoctor.templatewriter import TemplateLookup, writer
+from pydoctor.templatewriter.server import PageCache, PageRenderer, make_server
+from pydoctor.test.test_astbuilder import fromText
+from pydoctor.test.test_packages import processPackage
+from pydoctor.test.test_templatewriter import template_dir
+
+
+def test_page_cache_lru() -> None:
+    cache = PageCache(2)
+    rendered = []
+    def render(path: str) -> bytes:
+        rendered.append(path)
+        return path.encode()
+
+    assert cache.get('a', lambda: render('a')) == b'a'
+    assert cache.get('b', lambda: render('b')) == b'b'
+    assert cache.get('a', lambda: render('a')) == b'a'
+    # 'b' is the least recently used page.
+    assert cache.get('c', lambda: render('c')) == b'c'
+    assert len(cache) == 2
+    assert cache.get('a', lambda: render('a')) == b'a'
+    assert cache.get('b', lambda: render('b')) == b'b'
+    assert rendered == ['a', 'b', 'c', 'b']
+    assert (cache.hits, cache.misses) == (2, 4)
+
+def test_page_cache_missing() -> None:
+    cache = PageCache()
+    assert cache.get('nope', lambda: None) is None
+    assert len(cache) == 0
+
+@pytest.mark.parametrize('sidebarjs', [False, True])
+def test_renderer_same_as_writer(tmp_path: Path, sidebarjs: bool) -> None:
+    """
+    The pages rendered on demand are the same as the pages written by the L{writer.TemplateWriter}.
+    """
+    system = processPackage('basic')
+    system.options.sidebarjs = sidebarjs
+    w = writer.TemplateWriter(tmp_path, TemplateLookup(template_dir))
+    w.prepOutputDirectory()
+    w.writeSummaryPages(system)
+    w.writeIndividualFiles(system.rootobjects)
+
+    renderer = PageRenderer(system, TemplateLookup(template_dir))
+    try:
+        for path in sorted(tmp_path.rglob('*')):
+            if path.is_file():
+                name = path.relative_to(tmp_path).as_posix()
+                assert renderer.render(name) == path.read_bytes(), name
+        assert renderer.render('basic.mod.html') is renderer.render('basic.mod.html')
+        assert renderer.render('basic.nope.html') is None
+        assert renderer.render('basic._private_mod.html') is not None
+    finally:
+        renderer.close()
+
+def test_renderer_hidden_root() -> None:
+    """
+    When the only root module is hidden, it has no page but the other pages are served.
+    """
+    system = model.System(Options.from_args(['--privacy=HIDDEN:mod']))
+    fromText('''
+    class C:
+        "Class."
+    ''', modname='mod', system=system)
+    renderer = PageRenderer(system, TemplateLookup(template_dir))
+    try:
+        assert renderer.render('index.html') is None
+        assert renderer.render('mod.html') is None
+        assert renderer.render('moduleIndex.html') is not None
+    finally:
+        renderer.close()
+
+def test_server(capsys: pytest.CaptureFixture[str]) -> None:
+    system = processPackage('basic')
+    renderer = PageRenderer(system, TemplateLookup(template_dir), cache_size=1)
+    with make_server(renderer, 0) as server:
+        url = f'http://localhost:{server.server_port}'
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        try:
+            with urlopen(f'{url}/') as response:
+                assert response.headers['Content-Type'] == 'text/html'
+                assert b'Package docstring' in response.read()
+            with urlopen(f'{url}/basic.mod.C.html?q=1') as response:
+                assert b'basic.mod.C' in response.read()
+            with urlopen(f'{url}/apidocs.css') as response:
+                assert response.headers['Content-Type'] == 'text/css'
+            with pytest.raises(HTTPError) as e:
+                urlopen(f'{url}/nope.html')
+            assert e.value.code == 404
+            e.value.close()
+        finally:
+            server.shutdown()
+            thread.join()
+            renderer.close()
+    assert len(renderer.cache) == 1
@@ -0,0 +1,412 @@
+import datetime
+from pathlib import Path
+import textwrap
+from typing import Any, Dict, List, Tuple
+
+import pytest
+
+from pydoctor import model
+from pydoctor.options import Options
+from pydoctor.test import CapSys
+from pydoctor.test.test_packages import testpackages
+
+SOURCES = {
+    '__init__.py': '''
+        """The package."""
+        from ._impl import Impl, helper
+        __all__ = ['Impl']
+        ''',
+    '_impl.py': '''
+        class Impl:
+            """The implementation."""
+            def run(self) -> None:
+                """Run it."""
+        def helper() -> None:
+            ...
+        ''',
+    'base.py': '''
+        class Base:
+            """A base class."""
+            attr: int = 1
+            """The attribute."""
+            def method(self) -> None:
+                """Documented in the base class."""
+        ''',
+    'sub.py': '''
+        from pkg.base import Base
+        from pkg import Impl
+        class Sub(Base):
+            def method(self) -> None:
+                ...
+        class Other(Impl):
+            ...
+        ''',
+    'leaf.py': '''
+        def f() -> None:
+            """A function."""
+        ''',
+    'user.py': '''
+        import pkg.leaf
+        pkg.leaf.f.__doc__ = "Changed."
+        ''',
+}
+
+def _write_package(path: Path, sources: Dict[str, str]) -> Path:
+    pkg = path / 'pkg'
+    pkg.mkdir(exist_ok=True)
+    for name, text in sources.items():
+        (pkg / name).write_text(textwrap.dedent(text))
+    return pkg
+
+def _cache(out: Path) -> Path:
+    return out.with_name(out.name + '-cache')
+
+def _build(pkg: Path, out: Path, *args: str) -> model.System:
+    options = Options.from_args(['--html-output', str(out), 
+                                 '--incremental-cache-path', str(_cache(out)), *args])
+    system = model.System(options)
+    builder = system.systemBuilder(system)
+    builder.addModule(pkg)
+    builder.buildModules()
+    return system
+
+def _describe(system: model.System) -> List[Tuple[Any, ...]]:
+    """
+    Describe the system such that the descriptions of equal systems are equal.
+    """
+    description = []
+    for name, ob in sorted(system.allobjects.items()):
+        info: Tuple[Any, ...] = (name, type(ob).__name__, ob.kind, ob.docstring,
+                ob.linenumber, ob.privacyClass, list(ob.contents),
+                ob.parent.fullName() if ob.parent else None,)
+        if isinstance(ob, model.Class):
+            info += (ob.bases, [b.fullName() if b else None for b in ob.baseobjects],
+                     [s.fullName() for s in ob.subclasses], [c.fullName() for c in ob.mro()])
+        if isinstance(ob, model.Module):
+            info += (ob.all, dict(ob._localNameToFullName_map), sorted(ob._dependencies))
+        description.append(info)
+    return description
+
+@pytest.mark.parametrize('changed', sorted(SOURCES))
+def test_incremental_build_equals_clean_build(changed: str, tmp_path: Path) -> None:
+    """
+    A system built incrementally after changing a module is equal to a system built from scratch.
+    """
+    pkg = _write_package(tmp_path, SOURCES)
+    out = tmp_path / 'out'
+    _build(pkg, out, '--incremental')
+
+    # Alter the docstring, the line numbers and add a new name.
+    modified = dict(SOURCES)
+    modified[changed] = '"""New docstring."""\n\n' + modified[changed] + '\n\nNEW = 1\n'
+    _write_package(tmp_path, modified)
+
+    incremental = _build(pkg, out, '--incremental')
+    clean = _build(pkg, tmp_path / 'clean')
+
+    assert _describe(incremental) == _describe(clean)
+    assert incremental.parse_errors == clean.parse_errors
+    assert incremental.violations == clean.violations
+
+def test_incremental_build_unchanged(tmp_path: Path, capsys: CapSys) -> None:
+    pkg = _write_package(tmp_path, SOURCES)
+    out = tmp_path / 'out'
+    first = _build(pkg, out, '--incremental')
+    assert (_cache(out) / 'model.pickle').is_file()
+    capsys.readouterr()
+
+    second = _build(pkg, out, '--incremental')
+    assert '0 changed modules, processing 0 of 6 modules' in capsys.readouterr().out
+    assert _describe(first) == _describe(second)
+    assert all(ob.system is second for ob in second.allobjects.values())
+
+def test_incremental_build_only_processes_dependents(tmp_path: Path, capsys: CapSys) -> None:
+    pkg = _write_package(tmp_path, SOURCES)
+    out = tmp_path / 'out'
+    _build(pkg, out, '--incremental')
+    capsys.readouterr()
+
+    (pkg / 'base.py').write_text('class Base:\n    """Changed."""\n')
+    system = _build(pkg, out, '--incremental')
+    # base.py and sub.py
+    assert '1 changed modules, processing 2 of 6 modules' in capsys.readouterr().out
+    sub = system.allobjects['pkg.sub.Sub']
+    assert isinstance(sub, model.Class)
+    assert sub.baseobjects == [system.allobjects['pkg.base.Base']]
+
+def test_incremental_build_warnings_repeated(tmp_path: Path, capsys: CapSys) -> None:
+    sources = dict(SOURCES, **{'leaf.py': 'unknown.__doc__ = "Docstring."\n'})
+    pkg = _write_package(tmp_path, sources)
+    out = tmp_path / 'out'
+    first = _build(pkg, out, '--incremental')
+    first_out = capsys.readouterr().out
+    assert 'Unable to figure out target for __doc__ assignment' in first_out
+
+    (pkg / 'base.py').write_text('class Base:\n    """Changed."""\n')
+    second = _build(pkg, out, '--incremental')
+    assert 'Unable to figure out target for __doc__ assignment' in capsys.readouterr().out
+    assert first.violations == second.violations > 0
+
+def test_incremental_build_options_changed(tmp_path: Path, capsys: CapSys) -> None:
+    pkg = _write_package(tmp_path, SOURCES)
+    out = tmp_path / 'out'
+    _build(pkg, out, '--incremental')
+    capsys.readouterr()
+
+    _build(pkg, out, '--incremental', '--docformat=restructuredtext')
+    assert 'options or pydoctor version changed' in capsys.readouterr().out
+
+    (pkg / 'new.py').write_text('')
+    _build(pkg, out, '--incremental', '--docformat=restructuredtext')
+    assert 'modules have been added or removed' in capsys.readouterr().out
+
+def _write_pages(system: model.System, out: Path) -> Dict[str, str]:
+    from pydoctor.templatewriter import TemplateLookup, TemplateWriter
+    from pydoctor.test.test_templatewriter import template_dir
+    # The build time is not part of the page dependencies.
+    system.buildtime = datetime.datetime(2023, 1, 1)
+    writer = TemplateWriter(out, TemplateLookup(template_dir))
+    writer.prepOutputDirectory()
+    subjects = system.options.htmlsubjects
+    writer.writeIndividualFiles([system.allobjects[name] for name in subjects] if subjects else system.rootobjects)
+    return {p.name: p.read_text() for p in out.glob('*.html')}
+
+def _render(pkg: Path, out: Path, *args: str) -> Tuple[Dict[str, str], Dict[str, int]]:
+    pages = _write_pages(_build(pkg, out, '--incremental', *args), out)
+    return pages, {p.name: p.stat().st_mtime_ns for p in out.glob('*.html')}
+
+def test_incremental_pages_only_outdated_written(tmp_path: Path, capsys: CapSys) -> None:
+    pkg = _write_package(tmp_path, SOURCES)
+    out = tmp_path / 'out'
+    _, first = _render(pkg, out)
+    assert (_cache(out) / 'pages.json').is_file()
+    # The incremental build state is not published with the documentation.
+    assert not [p for p in out.rglob('*') if p.suffix in ('.pickle', '.json')]
+    capsys.readouterr()
+
+    _, second = _render(pkg, out)
+    assert '0 outdated pages written' in capsys.readouterr().out
+    assert first == second
+
+    (pkg / 'leaf.py').write_text('def f(other: int) -> None:\n    ...\n')
+    pages, third = _render(pkg, out)
+    assert '1 outdated pages written' in capsys.readouterr().out
+    assert {name for name in third if third[name] != second[name]} == {'pkg.leaf.html'}
+    assert 'other' in pages['pkg.leaf.html']
+
+def test_incremental_pages_inherited_members(tmp_path: Path, capsys: CapSys) -> None:
+    """
+    The pages of the subclasses are written again when an inherited member changes.
+    """
+    pkg = _write_package(tmp_path, SOURCES)
+    out = tmp_path / 'out'
+    _, first = _render(pkg, out)
+
+    modified = dict(SOURCES)
+    modified['base.py'] = modified['base.py'].replace('The attribute.', 'Changed attribute.')
+    _write_package(tmp_path, modified)
+    pages, second = _render(pkg, out)
+    changed = {name for name in second if second[name] != first[name]}
+    assert {'pkg.base.Base.html', 'pkg.sub.Sub.html'} <= changed
+    assert 'pkg.sub.Other.html' not in changed
+    assert 'Changed attribute.' in pages['pkg.sub.Sub.html']
+
+@pytest.mark.parametrize('changed', sorted(SOURCES))
+def test_incremental_pages_equal_clean_pages(changed: str, tmp_path: Path) -> None:
+    pkg = _write_package(tmp_path, SOURCES)
+    out = tmp_path / 'out'
+    _render(pkg, out)
+
+    modified = dict(SOURCES)
+    modified[changed] = '"""New docstring, see L{pkg.leaf.f}."""\n\n' + textwrap.dedent(modified[changed]) + '\n\nNEW = 1\n'
+    _write_package(tmp_path, modified)
+
+    incremental, _ = _render(pkg, out)
+    clean = _write_pages(_build(pkg, tmp_path / 'clean'), tmp_path / 'clean')
+    assert incremental == clean
+
+def test_incremental_pages_options_changed(tmp_path: Path, capsys: CapSys) -> None:
+    pkg = _write_package(tmp_path, SOURCES)
+    out = tmp_path / 'out'
+    _render(pkg, out)
+    capsys.readouterr()
+
+    _render(pkg, out, '--privacy=HIDDEN:pkg.leaf')
+    assert 'writing all pages' in capsys.readouterr().out
+
+def test_incremental_pages_pruned(tmp_path: Path) -> None:
+    """
+    The pages of the objects that are still in the system but that have no page anymore 
+    are removed, even when the options changed since the previous build.
+    """
+    pkg = _write_package(tmp_path, SOURCES)
+    out = tmp_path / 'out'
+    first, _ = _render(pkg, out)
+    assert 'pkg.leaf.html' in first
+
+    pages, _ = _render(pkg, out, '--privacy=HIDDEN:pkg.leaf')
+    assert 'pkg.leaf.html' not in pages
+    assert 'pkg.leaf.html' not in (_cache(out) / 'pages.json').read_text()
+    clean = _write_pages(_build(pkg, tmp_path / 'clean', '--privacy=HIDDEN:pkg.leaf'), tmp_path / 'clean')
+    assert pages == clean
+
+def test_incremental_pages_subjects(tmp_path: Path, capsys: CapSys) -> None:
+    """
+    Building the pages of some subjects keeps the other pages, and the pages that became 
+    outdated meanwhile are written by the next build that includes them.
+    """
+    pkg = _write_package(tmp_path, SOURCES)
+    out = tmp_path / 'out'
+    first, _ = _render(pkg, out)
+
+    modified = dict(SOURCES)
+    modified['leaf.py'] = 'def f(other: int) -> None:\n    """Changed function."""\n'
+    _write_package(tmp_path, modified)
+    pages, _ = _render(pkg, out, '--html-subject=pkg.base')
+    assert set(pages) == set(first)
+    assert pages['pkg.leaf.html'] == first['pkg.leaf.html']
+    capsys.readouterr()
+
+    pages, _ = _render(pkg, out)
+    assert '1 outdated pages written' in capsys.readouterr().out
+    assert pages == _write_pages(_build(pkg, tmp_path / 'clean'), tmp_path / 'clean')
+
+    # The pages of the members of the subjects that are gone are removed.
+    modified['sub.py'] = modified['sub.py'].replace('class Other(Impl):', 'def Other() -> None:')
+    _write_package(tmp_path, modified)
+    pages, _ = _render(pkg, out, '--html-subject=pkg.sub')
+    assert 'pkg.sub.Other.html' not in pages
+    assert {'pkg.sub.Sub.html', 'pkg.leaf.html', 'index.html'} <= set(pages)
+
+def test_fingerprint_independent_of_address() -> None:
+    """
+    The values that are not summarized otherwise are summarized by their type, 
+    not by their C{repr()}, which may include their address.
+    """
+    from pydoctor.templatewriter.incremental import _summarize
+    class Slotted:
+        __slots__ = ('x',)
+    assert repr(Slotted()) != repr(Slotted())
+    assert _summarize({'k': [Slotted()]}, set()) == _summarize({'k': [Slotted()]}, set())
+
+RST_SOURCES = {
+    '__init__.py': '''
+        """
+        A package documented with reStructuredText.
+
+        Usage
+        -----
+
+        Call `pkg.mod.Thing.run`, with ``times`` greater than zero.
+        """
+        __docformat__ = 'restructuredtext'
+        ''',
+    'mod.py': '''
+        """
+        The module.
+
+        Section
+        -------
+
+        Some ``literal`` text.
+        """
+        __docformat__ = 'restructuredtext'
+        class Thing:
+            """
+            A thing.
+
+            :ivar count: The number of runs.
+            """
+            def run(self, times: int) -> bool:
+                """
+                Run the thing.
+
+                :param times: How many times.
+                :returns: Whether it worked.
+                """
+            @property
+            def name(self) -> str:
+                """
+                :returns: The name.
+                """
+        CONSTANT = {'a': [1, 2]}
+        """A constant."""
+        ''',
+}
+
+def test_incremental_pages_restructuredtext(tmp_path: Path) -> None:
+    """
+    The reStructuredText docstrings parsed before the snapshot was saved render the same pages
+    when the system is restored from the snapshot.
+    """
+    pkg = _write_package(tmp_path, RST_SOURCES)
+    out = tmp_path / 'out'
+    first, _ = _render(pkg, out)
+    assert 'Usage' in first['index.html']
+
+    # Write all pages again, from the restored system.
+    (_cache(out) / 'pages.json').unlink()
+    system = _build(pkg, out, '--incremental')
+    assert not system.unprocessed_modules
+    assert _write_pages(system, out) == first
+    assert system.violations == 0
+
+def test_incremental_cache_directory(tmp_path: Path) -> None:
+    """
+    By default, each HTML output directory has its own cache, outside of the output directory.
+    """
+    from pydoctor.snapshot import USER_INCREMENTAL_CACHE, cache_directory
+    first = cache_directory(Options.from_args(['--html-output', str(tmp_path / 'first')]))
+    second = cache_directory(Options.from_args(['--html-output', str(tmp_path / 'second')]))
+    assert first.parent == second.parent == USER_INCREMENTAL_CACHE
+    assert first != second
+    assert cache_directory(Options.from_args(['--html-output', str(tmp_path / 'first'),
+        '--incremental-cache-path', str(tmp_path / 'cache')])) == tmp_path / 'cache'
+
+def test_save_load_model(tmp_path: Path) -> None:
+    """
+    A loaded model is equal to the saved model and renders the same pages.
+    """
+    from pydoctor.snapshot import load_model, save_model
+    pkg = _write_package(tmp_path, SOURCES)
+    system = _build(pkg, tmp_path / 'out')
+    save_model(system, tmp_path / 'model.pickle')
+
+    loaded = model.System(system.options)
+    load_model(loaded, tmp_path / 'model.pickle')
+
+    assert _describe(loaded) == _describe(system)
+    assert [m.fullName() for m in loaded.rootobjects] == ['pkg']
+    assert loaded.projectname == system.projectname
+    assert loaded.violations == system.violations
+    assert all(ob.system is loaded for ob in loaded.allobjects.values())
+    assert (_write_pages(loaded, tmp_path / 'loaded') ==
+            _write_pages(system, tmp_path / 'saved'))
+
+def test_save_load_model_restructuredtext(tmp_path: Path) -> None:
+    """
+    The reStructuredText docstrings of a loaded model render the same pages as the saved model.
+    """
+    from pydoctor.snapshot import load_model, save_model
+    system = _build(testpackages / 'restructuredtext_docstrings', tmp_path / 'out')
+    # Like the driver, save the model before rendering it.
+    save_model(system, tmp_path / 'model.pickle')
+    saved = _write_pages(system, tmp_path / 'saved')
+    assert 'Usage' in saved['index.html']
+
+    loaded = model.System(system.options)
+    load_model(loaded, tmp_path / 'model.pickle')
+    assert _write_pages(loaded, tmp_path / 'loaded') == saved
+    assert loaded.violations == system.violations == 0
+
+def test_load_model_incompatible(tmp_path: Path) -> None:
+    from pydoctor.snapshot import load_model, save_model
+    pkg = _write_package(tmp_path, SOURCES)
+    system = _build(pkg, tmp_path / 'out')
+    save_model(system, tmp_path / 'model.pickle')
+
+    class OtherSystem(model.System):
+        extensions = ['pydoctor.extensions.zopeinterface']
+
+    with pytest.raises(ValueError, match='other extensions'):
+        load_model(OtherSystem(system.options), tmp_path / 'model.pickle')
@@ -1,6 +1,8 @@
 from io import BytesIO
+import datetime
+import json
 import re
-from typing import Callable, Union, Any, cast, Type, TYPE_CHECKING
+from typing import Callable, List, Union, Any, cast, Type, TYPE_CHECKING
 import pytest
 import warnings
 import sys
@@ -64,6 +66,157 @@ def getHTMLOfAttribute(ob: model.Attribute) -> str:
         AttributeChild.lookup_loader(tlookup),)
     return flatten(stan)
 
+def test_flatten_to_same_as_flattenString() -> None:
+    """
+    L{stanutils.flatten_to} writes the same HTML as L{twisted.web.template.flattenString}.
+    """
+    from twisted.web.template import flattenString, tags, Comment, CDATA, CharRef, slot, Tag
+    mod = fromText('''
+    """
+    Module docstring with ``code`` & a U{link<https://example.org/?a=1&b=2>}.
+    """
+    class C:
+        """
+        Class.
+        """
+        def f(self, x:int=0, y="<&>") -> bytes:
+            "Method."
+    v = {'a': [1, 2, b'"']}
+    ''', modname='mod')
+    roots: List["Flattenable"] = [
+        tags.div(tags.p('a<&>"b', class_='x"<y'), tags.br, tags.wbr, Comment('x-'), 
+                 CDATA('a]]>b'), CharRef(160), [b'raw&', ('t',)], tags.a(href=tags.b('x"'))('q'), 
+                 Tag('')('transparent'), tags.span(slot('s'), slot('d', default='d')).fillSlots(s='s')), 
+        tags.div(*(Tag(name) for name in sorted(stanutils._VOID_ELEMENTS)), tags.wbr, tags.p, tags.img('x')), 
+        pages.ModulePage(mod, TemplateLookup(template_dir)),
+        pages.ClassPage(mod.contents['C'], TemplateLookup(template_dir)),
+    ]
+    for root in roots:
+        ChildTable.reset_ids()
+        expected: List[bytes] = []
+        flattenString(None, root).addCallback(expected.append)
+        ChildTable.reset_ids()
+        written: List[bytes] = []
+        stanutils.flatten_to(root, written.append)
+        assert b''.join(written) == expected[0]
+
+def test_compile_template() -> None:
+    """
+    A compiled template gives the same HTML as the template, and the renderers get the same tags.
+    """
+    from twisted.web.template import Element, XMLString, flattenString, renderer, tags, Tag
+    from twisted.web.iweb import ITemplateLoader
+
+    template = XMLString('''<div xmlns:t="http://twistedmatrix.com/ns/twisted.web.template/0.1" class="a&amp;b">
+      <!-- comment -->
+      <p class="static">Some <b>static</b> text &amp; <br /><span><i>nested</i></span></p>
+      <ul t:render="fill"><li t:render="items"><span class="item"><t:slot name="item" /></span> <i>item</i></li></ul>
+      <p><t:slot name="item" default="leaked?" /></p>
+      <a class="link"><t:attr name="title" t:render="title">title</t:attr>link</a>
+      <t:transparent><b>transparent</b><t:transparent t:render="title" /></t:transparent>
+    </div>''')
+    received: List[Tag] = []
+
+    class Page(Element):
+        @renderer
+        def fill(self, request: object, tag: Tag) -> Tag:
+            return tag.fillSlots(item='filled')
+        @renderer
+        def items(self, request: object, tag: Tag) -> "Flattenable":
+            received.append(tag)
+            return [tag.clone().fillSlots(item=f'<{i}>') for i in range(2)]
+        @renderer
+        def title(self, request: object, tag: Tag) -> "Flattenable":
+            assert all(isinstance(child, str) for child in tag.children)
+            return tags.transparent('"title"', *tag.children)
+
+    def render(loader: ITemplateLoader) -> List[bytes]:
+        html: List[bytes] = []
+        flattenString(None, Page(loader)).addCallback(html.append)
+        stanutils.flatten_to(Page(loader), html.append)
+        return html
+
+    expected = render(template)
+    compiled = render(templatewriter.CompiledLoader(template))
+    assert compiled == [expected[0], expected[0]]
+    # Like twisted, the slots filled by the last rendered item are still filled after the list.
+    assert b'<p>&lt;1&gt;</p>' in expected[0]
+    assert repr(received[0]) == repr(received[-1])
+
+def test_page_fragments_rendered_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    The fragments of the pages that only depend on the common slots and the title are rendered once,
+    the fragments that use other slots are rendered for each page.
+    """
+    from twisted.web.template import flattenString
+    mod = fromText('''
+    class C:
+        "Class."
+    def f():
+        "Function."
+    ''', modname='mod')
+    lookup = TemplateLookup(template_dir)
+    lookup.add_template(HtmlTemplate('subheader.html',
+        '<div xmlns:t="http://twistedmatrix.com/ns/twisted.web.template/0.1">'
+        '<t:slot name="category" /> of <t:slot name="project" /></div>'))
+
+    rendered: List[Any] = []
+    render_fragment = pages._render_fragment
+    def _render_fragment(element: Any, slots: Any) -> Any:
+        assert element.loader is not None
+        rendered.append(element.loader)
+        return render_fragment(element, slots)
+    monkeypatch.setattr(pages, '_render_fragment', _render_fragment)
+
+    for ob, title in [(mod, None), (mod.contents['C'], None), (mod, 'a <b> & c'), (mod, 'a "b"')]:
+        page = pages.ClassPage(ob, lookup) if isinstance(ob, model.Class) else pages.ModulePage(ob, lookup)
+        if title:
+            monkeypatch.setattr(page, 'title', lambda: title)
+        ChildTable.reset_ids()
+        expected: List[bytes] = []
+        flattenString(None, page).addCallback(expected.append)
+        ChildTable.reset_ids()
+        written: List[bytes] = []
+        stanutils.flatten_to(page, written.append)
+        html = b''.join(written).decode()
+        assert html == expected[0].decode()
+        assert f'<title>{title or ob.fullName()}</title>'.replace('<b>', '&lt;b&gt;').replace(' & ', ' &amp; ') in html
+        assert f'>{page.category()} of {mod.system.projectname}</div>' in html
+
+    assert len(rendered) == len(set(rendered)) == 5
+    assert lookup.get_loader('subheader.html') in rendered
+    assert pages._fragments[lookup.get_loader('subheader.html')] == {
+        tuple((name, stanutils.flatten(value)) for name, value in page.common_slot_map.items()): None}
+
+def test_flatten_to_chunks_and_deferred() -> None:
+    """
+    L{stanutils.flatten_to} writes bounded chunks, and waits for the L{Deferred}s returned by renderers.
+    """
+    from twisted.internet.defer import Deferred
+    from twisted.web.template import Element, XMLString, renderer, tags
+
+    written: List[bytes] = []
+    stanutils.flatten_to(tags.div(['x' * 1000] * 1000), written.append)
+    assert len(b''.join(written)) == 1000 * 1000 + len('<div></div>')
+    assert len(written) > 1
+    assert all(len(chunk) < stanutils.BUFFER_SIZE + 1000 for chunk in written)
+
+    later: Deferred[Any] = Deferred()
+    class Later(Element):
+        loader = XMLString('<div xmlns:t="http://twistedmatrix.com/ns/twisted.web.template/0.1">'
+                           'before<t:transparent t:render="later" />after</div>')
+        @renderer
+        def later(self, request: object, tag: Any) -> Deferred[Any]:
+            return later
+
+    written = []
+    d = stanutils.flatten_to(Later(), written.append)
+    assert b''.join(written) == b'<div>before'
+    assert not d.called
+    later.callback(tags.b('later'))
+    assert b''.join(written) == b'<div>before<b>later</b>after</div>'
+    assert d.called
+
 def test_sidebar() -> None:
     src = '''
     class C:
@@ -94,6 +247,46 @@ def test_sidebar() -> None:
         assert p in mod_html, f"{p!r} not found in HTML: {mod_html}"
    
 
+def test_sidebar_js(tmp_path: Path) -> None:
+    """
+    With option C{--sidebar-js}, the listing of the parent module is written once
+    and the pages of its members include it instead of repeating it.
+    """
+    src = '''
+    class C:
+        def f(): ...
+        class D: ...
+    def g(): ...
+    '''
+    system = model.System(model.Options.from_args(
+        ['--sidebar-js', '--sidebar-expand-depth=2']))
+    mod = fromText(src, modname='mod', system=system)
+    w = writer.TemplateWriter(tmp_path, TemplateLookup(template_dir))
+    w.prepOutputDirectory()
+    w.writeIndividualFiles([mod])
+
+    data = (tmp_path / 'sidebar' / 'mod.js').read_text(encoding='utf-8')
+    assert data.startswith('insertSideBarData(') and data.endswith(');\n')
+    assert json.loads(data[len('insertSideBarData('):-len(');\n')]) == [
+        ['Classes', [{'name': ['C'], 'fullName': 'mod.C', 'url': 'mod.C.html', 'contents': [
+            ['Classes', [{'name': ['D'], 'fullName': 'mod.C.D', 'url': 'mod.C.D.html'}]], 
+            ['Methods', [{'name': ['f'], 'fullName': 'mod.C.f', 'url': 'mod.C.html#f'}]]]}]],
+        ['Functions', [{'name': ['g'], 'fullName': 'mod.g', 'url': 'index.html#g'}]]]
+    assert (tmp_path / 'sidebar.js').is_file()
+
+    class_html = (tmp_path / 'mod.C.html').read_text(encoding='utf-8')
+    # The section of the class itself is still rendered.
+    assert '<a href="#f"' in class_html
+    assert ('<div data-this-object="mod.C" data-page-url="mod.C.html"><script src="sidebar.js"></script>'
+            '<script src="sidebar/mod.js"></script></div>') in class_html
+    assert 'index.html#g' not in class_html
+
+    # The module page has no parent section.
+    mod_html = (tmp_path / 'index.html').read_text(encoding='utf-8')
+    assert '<a href="#g"' in mod_html
+    assert 'data-this-object' not in mod_html
+
+
 def test_simple() -> None:
     src = '''
     def f():
@@ -147,6 +340,93 @@ def test_basic_package(tmp_path: Path) -> None:
     with open(tmp_path / 'basic.html', encoding='utf-8') as f:
         assert 'Package docstring' in f.read()
 
+def _write_pages(packname: Union[str, Callable[[], model.System]], build_directory: Path, capsys: CapSys, 
+                 jobs: int = 1, threads: bool = False) -> Any:
+    """
+    Write the pages of a test package, or of the system returned by a callable, 
+    and return the pages with what's been reported.
+    """
+    system = processPackage(packname) if isinstance(packname, str) else packname()
+    system.options.jobs = jobs
+    system.buildtime = datetime.datetime(2000, 1, 1)
+    capsys.readouterr()
+    w = writer.TemplateWriter(build_directory, TemplateLookup(template_dir))
+    w.threads = threads
+    w.build_directory.mkdir()
+    w.writeIndividualFiles(system.rootobjects)
+    # The rendered objects are only kept for the page graph of incremental builds.
+    assert not w._rendered
+    files = {p.relative_to(w.build_directory).as_posix(): p.read_bytes() 
+             for p in w.build_directory.rglob('*.html')}
+    assert files
+    return (files, w.written_pages, system.violations, dict(system.parse_errors), 
+            sorted(capsys.readouterr().out.splitlines()))
+
+@pytest.mark.parametrize('threads', [
+    pytest.param(False, marks=pytest.mark.skipif(not hasattr(os, 'fork'), reason="Requires os.fork().")), 
+    True])
+@pytest.mark.parametrize('packname', ['allgames', 'basic', 'multipleinheritance', 'report_trigger'])
+def test_write_pages_in_parallel(tmp_path: Path, capsys: CapSys, packname: str, threads: bool) -> None:
+    """
+    Writing the pages in several processes or threads gives the same pages, 
+    warnings and parse errors than writing them one after the other.
+    """
+    assert _write_pages(packname, tmp_path / 'serial', capsys) == \
+        _write_pages(packname, tmp_path / 'parallel', capsys, jobs=3, threads=threads)
+
+@pytest.mark.parametrize('threads', [
+    pytest.param(False, marks=pytest.mark.skipif(not hasattr(os, 'fork'), reason="Requires os.fork().")), 
+    True])
+def test_write_pages_in_parallel_parse_errors_once(tmp_path: Path, capsys: CapSys, threads: bool) -> None:
+    """
+    The parse errors of a docstring rendered in pages written by different workers are reported once.
+    """
+    def system() -> model.System:
+        return fromText('''
+        class A:
+            def f(self):
+                """
+                Unbalanced B{braces.
+                """
+        class B(A):
+            ...
+        class C(A):
+            ...
+        ''', modname='mod').system
+    serial = _write_pages(system, tmp_path / 'serial', capsys)
+    assert [line for line in serial[-1] if 'braces' in line or 'bad docstring' in line]
+    assert _write_pages(system, tmp_path / 'parallel', capsys, jobs=2, threads=threads) == serial
+
+def test_write_pages_in_threads_stress(tmp_path: Path, capsys: CapSys) -> None:
+    """
+    The pages of the test packages written by many threads at once are the same as 
+    the pages written by a single thread, byte for byte.
+    """
+    for packname in ['allgames', 'basic', 'codeininit', 'cyclic_imports_base_classes', 
+                     'interfaceallgames', 'multipleinheritance', 'nestedconfusion', 
+                     'reparenting_follows_aliases', 'report_trigger']:
+        expected = _write_pages(packname, tmp_path / packname, capsys)
+        for n in range(3):
+            assert _write_pages(packname, tmp_path / f'{packname}-{n}', capsys, 
+                                jobs=16, threads=True) == expected, packname
+
+def test_table_ids_numbered_per_page(tmp_path: Path) -> None:
+    """
+    The ids of the tables of members are numbered from the start of each page, 
+    such that a page does not depend on the pages written before it.
+    """
+    system = fromText('''
+    class A:
+        def f(self): ...
+    class B:
+        def g(self): ...
+    ''', modname='mod').system
+    w = writer.TemplateWriter(tmp_path, TemplateLookup(template_dir))
+    w.writeIndividualFiles(system.rootobjects)
+    for name in ['index.html', 'mod.A.html', 'mod.B.html']:
+        html = (tmp_path / name).read_text()
+        assert re.findall(r'<table[^>]* id="(id\d+)"', html) == ['id1'], name
+
 def test_hasdocstring() -> None:
     system = processPackage("basic")
     from pydoctor.templatewriter.summary import hasdocstring
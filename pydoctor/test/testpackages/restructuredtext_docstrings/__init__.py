@@ -0,0 +1,10 @@
+"""
+A package documented with reStructuredText.
+
+Usage
+-----
+
+Create a `restructuredtext_docstrings.mod.Thing` and call its
+`restructuredtext_docstrings.mod.Thing.run` method.
+"""
+__docformat__ = 'restructuredtext'
@@ -0,0 +1,39 @@
+"""
+The module.
+
+Contents
+--------
+
+Some ``literal`` text and a list:
+
+- one
+- two
+"""
+__docformat__ = 'restructuredtext'
+
+class Thing:
+    """
+    A thing.
+
+    :ivar count: The number of runs.
+    :type count: int
+    """
+
+    def run(self, times: int) -> bool:
+        """
+        Run the thing.
+
+        :param times: How many times.
+        :returns: Whether it worked.
+        """
+        return True
+
+    @property
+    def name(self) -> str:
+        """
+        :returns: The name.
+        """
+        return 'thing'
+
+CONSTANT = {'a': [1, 2]}
+"""A constant."""
@@ -0,0 +1,86 @@
+// Render the sidebar listing of a module, with option --sidebar-js.
+// The listing of each module is written once, in a script calling insertSideBarData(),
+// which is included by the sidebar of the pages of all the module members.
+
+var lastSideBarItemId = 0;
+
+function insertSideBarData(data) {
+    var container = document.currentScript.parentNode;
+    var thisObject = container.getAttribute("data-this-object");
+    var pageUrl = container.getAttribute("data-page-url");
+    container.textContent = "";
+    appendSideBarLists(container, data, thisObject, pageUrl);
+}
+
+function appendSideBarLists(parent, lists, thisObject, pageUrl) {
+    lists.forEach(function (list) {
+        var title = document.createElement("div");
+        title.className = "childrenKindTitle";
+        title.textContent = list[0];
+        parent.appendChild(title);
+
+        var ul = document.createElement("ul");
+        list[1].forEach(function (item) {
+            ul.appendChild(createSideBarItem(item, thisObject, pageUrl));
+        });
+        parent.appendChild(ul);
+    });
+}
+
+function createSideBarItem(item, thisObject, pageUrl) {
+    var isThisObject = item.fullName == thisObject;
+    var li = document.createElement("li");
+    li.className = (item.private ? "private" : "") + (isThisObject ? " thisobject" : "");
+
+    var itemName = document.createElement("div");
+    itemName.className = "itemName";
+    li.appendChild(itemName);
+
+    var expandable = item.contents !== undefined;
+    if (expandable) {
+        // Same markup as the expandable items of sidebar-list.html.
+        var expand = !isThisObject && item.contents.length > 0;
+        var id = "sideBarItemId" + (++lastSideBarItemId);
+        itemName.classList.add("expandableItem");
+
+        var input = document.createElement("input");
+        input.className = "tocChildrenToggle";
+        input.type = "checkbox";
+        input.id = id;
+        itemName.appendChild(input);
+
+        var label = document.createElement("label");
+        label.className = expand ? "lbl-toggle" : "lbl-toggle notExpandable";
+        label.htmlFor = expand ? id : "";
+        itemName.appendChild(label);
+    }
+
+    // When linking to an item on the same page, omit the path.
+    var url = item.url;
+    if (pageUrl && url.indexOf(pageUrl + "#") == 0) {
+        url = url.substring(pageUrl.length);
+    }
+    var link = document.createElement("a");
+    link.href = url;
+    link.className = "internal-link";
+    link.title = item.fullName;
+    item.name.forEach(function (part, i) {
+        if (i) {
+            link.appendChild(document.createElement("wbr"));
+        }
+        link.appendChild(document.createTextNode(part));
+    });
+    var code = document.createElement("code");
+    code.appendChild(link);
+    itemName.appendChild(code);
+
+    if (expandable) {
+        var contents = document.createElement("div");
+        contents.className = "expandableContent";
+        var nested = document.createElement("div");
+        appendSideBarLists(nested, item.contents, thisObject, pageUrl);
+        contents.appendChild(nested);
+        itemName.appendChild(contents);
+    }
+    return li;
+}